@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark cold CLI start-up against a warm uploader daemon
+
+Cold: a fresh Python process imports the uploader stack, starts Playwright,
+launches the platform browser and opens a blank page - the fixed cost every
+upload_video.py run pays before doing useful work.
+Warm: the same page open served by uploader_daemon.py, measured both as an
+in-process socket round-trip and through the upload_client.py CLI.
+"""
+import asyncio
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from upload_client import send_request
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+async def cold_once(platform: str):
+    """Executed in a child process: full import + launch + blank page"""
+    import uploader_daemon  # noqa: F401  (import cost is part of the cold path)
+    from utils.browser_factory import platform_context
+    async with platform_context(platform) as context:
+        page = await context.new_page()
+        await page.goto('about:blank')
+
+
+def time_subprocess(cmd: list) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(name: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(len(samples) * 0.95)) - 1)]
+    print(f"{name:<28} n={len(samples):<4} mean={statistics.mean(samples):8.1f}ms "
+          f"p50={statistics.median(samples):8.1f}ms p95={p95:8.1f}ms")
+
+
+async def wait_for_daemon(socket_path: str, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            await send_request({'action': 'ping'}, socket_path=socket_path)
+            return
+        except (ConnectionError, FileNotFoundError, OSError):
+            await asyncio.sleep(0.2)
+    raise TimeoutError("Uploader daemon did not start in time")
+
+
+async def run_benchmark(platform: str, iterations: int):
+    print(f"\n📊 Cold CLI vs warm daemon ({platform}, {iterations} iterations)\n")
+
+    cold = [time_subprocess([sys.executable, __file__, '--cold-once', '--platform', platform])
+            for _ in range(iterations)]
+
+    socket_path = os.path.join(tempfile.mkdtemp(), 'bench_daemon.sock')
+    daemon = subprocess.Popen([sys.executable, 'uploader_daemon.py', '--socket', socket_path, '--warm', platform],
+                              cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL)
+    try:
+        await wait_for_daemon(socket_path)
+        warm_socket = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await send_request({'action': 'probe', 'platform': platform}, socket_path=socket_path)
+            warm_socket.append((time.perf_counter() - start) * 1000)
+        warm_cli = [time_subprocess([sys.executable, 'upload_client.py', '--action', 'probe',
+                                     '--platform', platform, '--socket', socket_path])
+                    for _ in range(iterations)]
+        await send_request({'action': 'shutdown'}, socket_path=socket_path)
+    finally:
+        try:
+            daemon.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            daemon.kill()
+
+    summarize("cold CLI", cold)
+    summarize("warm daemon (client CLI)", warm_cli)
+    summarize("warm daemon (socket)", warm_socket)
+    print(f"\nSpeed-up (p50, client CLI): {statistics.median(cold) / statistics.median(warm_cli):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold CLI vs warm uploader daemon')
+    parser.add_argument('--platform', default='douyin', choices=['douyin', 'kuaishou', 'tencent', 'tiktok'])
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--cold-once', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_once:
+        asyncio.run(cold_once(args.platform))
+    else:
+        asyncio.run(run_benchmark(args.platform, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+End-to-end upload benchmark against the local mock platforms
+
+Starts the mock creator-platform server (mock_platform/) in-process, points
+the uploaders at it through UPLOADER_BASE_URL and runs their real upload flow
+with a generated video file:
+- latency: sequential uploads, wall time per upload plus per-stage p50/p95
+- throughput: completed uploads per minute with N uploads in flight
+- memory: peak RSS of the launched browsers, in total and per browser
+
+Stage timings, selector statistics and cookie verdicts of the runs go to a
+scratch directory, not to the files real uploads use. Xiaohongshu uploads
+through a persistent profile under cookies/, so its mock page is served but
+not benchmarked here.
+"""
+import asyncio
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from douyin_uploader.main import DouYinVideo
+from ks_uploader.main import KSVideo
+from mock_platform import MockPlatformServer
+from tencent_uploader.main import TencentVideo
+from tk_uploader.main import TiktokVideo
+from utils import cookie_cache, selector_registry, stage_timer
+from utils.browser_pool import BrowserPool
+from utils.process_tree import browser_rss
+from utils.stage_timer import load_timings, percentile, summarize
+
+PLATFORMS = ['douyin', 'kuaishou', 'tencent', 'tiktok']
+VIDEO_CLASSES = {
+    'douyin': DouYinVideo,
+    'kuaishou': KSVideo,
+    'tencent': TencentVideo,
+    'tiktok': TiktokVideo,
+}
+MB = 1048576
+EMPTY_STORAGE_STATE = json.dumps({'cookies': [], 'origins': []})
+
+
+def redirect_state(scratch: Path):
+    """Keep the benchmark's timings, selector stats and cookie verdicts out of the real files"""
+    stage_timer.STAGE_TIMINGS_PATH = str(scratch / 'stage_timings.jsonl')
+    selector_registry.SELECTOR_STATS_PATH = str(scratch / 'selector_stats.json')
+    cookie_cache.CACHE_FILE = scratch / 'validation_cache.json'
+    cookie_cache.LOCK_FILE = cookie_cache.CACHE_FILE.with_suffix('.lock')
+
+
+def make_video_file(path: Path, size_mb: float):
+    with open(path, 'wb') as f:
+        remaining = int(size_mb * MB)
+        while remaining > 0:
+            f.write(os.urandom(min(MB, remaining)))
+            remaining -= MB
+
+
+class MemorySampler:
+    """Samples the RSS of every browser launched by this process while a run is in progress"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_browsers = 0
+        self.per_browser = []
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            rss = await asyncio.to_thread(browser_rss)
+            if rss:
+                self.peak_total = max(self.peak_total, sum(rss.values()))
+                self.peak_browsers = max(self.peak_browsers, len(rss))
+                self.per_browser.extend(rss.values())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._sample())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> dict:
+        if not self.per_browser:
+            return {'peak_total_mb': 0, 'browsers': 0, 'per_browser_p50_mb': 0, 'per_browser_max_mb': 0}
+        return {
+            'peak_total_mb': round(self.peak_total / MB, 1),
+            'browsers': self.peak_browsers,
+            'per_browser_p50_mb': round(percentile(self.per_browser, 0.5) / MB, 1),
+            'per_browser_max_mb': round(max(self.per_browser) / MB, 1),
+        }
+
+
+async def upload_once(platform: str, video_path: Path, scratch: Path, index: int, browser_pool=None) -> dict:
+    """One full upload through the platform's uploader; returns its outcome and wall time"""
+    account_file = scratch / 'accounts' / f"{platform}_{index}.json"
+    account_file.parent.mkdir(exist_ok=True)
+    account_file.write_text(EMPTY_STORAGE_STATE, encoding='utf-8')
+    video = VIDEO_CLASSES[platform](f"benchmark {platform} #{index}", str(video_path), ['benchmark', 'mock'], 0,
+                                    str(account_file))
+    start = time.perf_counter()
+    try:
+        await video.main(browser_pool=browser_pool)
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e) or type(e).__name__
+    return {'platform': platform, 'ok': ok, 'error': error, 'seconds': time.perf_counter() - start}
+
+
+async def measure_latency(platform: str, video_path: Path, scratch: Path, iterations: int, browser_pool=None):
+    results = []
+    for index in range(iterations):
+        results.append(await upload_once(platform, video_path, scratch, index, browser_pool))
+    seconds = [result['seconds'] for result in results if result['ok']]
+    return {
+        'uploads': len(results),
+        'failed': sum(1 for result in results if not result['ok']),
+        'errors': sorted({result['error'] for result in results if result['error']}),
+        'mean_s': round(statistics.mean(seconds), 2) if seconds else None,
+        'p50_s': round(percentile(seconds, 0.5), 2) if seconds else None,
+        'p95_s': round(percentile(seconds, 0.95), 2) if seconds else None,
+    }
+
+
+async def measure_throughput(platform: str, video_path: Path, scratch: Path, concurrency: int, rounds: int,
+                             browser_pool=None):
+    semaphore = asyncio.Semaphore(concurrency)
+    sampler = MemorySampler()
+
+    async def limited(index):
+        async with semaphore:
+            return await upload_once(platform, video_path, scratch, 1000 * concurrency + index, browser_pool)
+
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(limited(index) for index in range(concurrency * rounds)))
+    finally:
+        await sampler.stop()
+    elapsed = time.perf_counter() - start
+    completed = sum(1 for result in results if result['ok'])
+    return {
+        'concurrency': concurrency,
+        'uploads': len(results),
+        'failed': len(results) - completed,
+        'elapsed_s': round(elapsed, 1),
+        'uploads_per_min': round(completed / elapsed * 60, 2),
+        **sampler.summary(),
+    }
+
+
+def print_platform(platform: str, report: dict):
+    latency = report['latency']
+    print(f"\n📊 {platform}")
+    if latency['p50_s'] is None:
+        print(f"  latency      all {latency['uploads']} upload(s) failed: {'; '.join(latency['errors'])}")
+    else:
+        print(f"  latency      n={latency['uploads']:<3} failed={latency['failed']:<3} mean={latency['mean_s']:6.1f}s "
+              f"p50={latency['p50_s']:6.1f}s p95={latency['p95_s']:6.1f}s")
+    for row in report['stages']:
+        print(f"    {row['stage']:<14} p50={row['p50_s']:6.1f}s p95={row['p95_s']:6.1f}s")
+    for level in report['throughput']:
+        print(f"  N={level['concurrency']:<3}        {level['uploads_per_min']:6.2f} uploads/min "
+              f"({level['uploads']} uploads, {level['failed']} failed, {level['elapsed_s']}s)  "
+              f"browsers={level['browsers']} peak={level['peak_total_mb']}MB "
+              f"per browser p50={level['per_browser_p50_mb']}MB max={level['per_browser_max_mb']}MB")
+
+
+async def run_benchmark(args, scratch: Path) -> dict:
+    server = MockPlatformServer(throughput_mbps=args.throughput, latency_ms=args.latency,
+                                failure_rate=args.failure_rate)
+    os.environ['UPLOADER_BASE_URL'] = server.start()
+    video_path = scratch / 'benchmark.mp4'
+    make_video_file(video_path, args.video_mb)
+    print(f"🧪 Mock platforms on {server.url}, {args.video_mb}MB video, "
+          f"{'pooled' if args.pool else 'one browser per upload'}")
+
+    browser_pool = await BrowserPool().start() if args.pool else None
+    reports = {}
+    try:
+        for platform in args.platform:
+            latency = await measure_latency(platform, video_path, scratch, args.iterations, browser_pool)
+            records = [record for record in load_timings(stage_timer.STAGE_TIMINGS_PATH)
+                       if record.get('platform') == platform]
+            throughput = [await measure_throughput(platform, video_path, scratch, level, args.rounds, browser_pool)
+                          for level in args.concurrency]
+            reports[platform] = {
+                'latency': latency,
+                'stages': [row for row in summarize(records) if row['stage'] != stage_timer.TOTAL],
+                'throughput': throughput,
+            }
+            if not args.json:
+                print_platform(platform, reports[platform])
+    finally:
+        if browser_pool is not None:
+            await browser_pool.close()
+        server.stop()
+    return {'video_mb': args.video_mb, 'pooled': args.pool, 'server': server.stats(), 'platforms': reports}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the uploaders end to end against the mock platforms')
+    parser.add_argument('--platform', action='append', choices=PLATFORMS,
+                        help='Platform to benchmark (repeatable, default: douyin)')
+    parser.add_argument('--iterations', type=int, default=3, help='Sequential uploads for the latency figures')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4],
+                        help='Uploads in flight for the throughput figures (default: 1 2 4)')
+    parser.add_argument('--rounds', type=int, default=2, help='Uploads per concurrency slot (default: 2)')
+    parser.add_argument('--video-mb', type=float, default=16, help='Size of the generated video (default: 16)')
+    parser.add_argument('--throughput', type=float, default=0,
+                        help='Simulated upload bandwidth per chunk request in MB/s (default: unlimited)')
+    parser.add_argument('--latency', type=float, default=0, help='Delay added to every mock API request in ms')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of chunk requests that fail')
+    parser.add_argument('--pool', action='store_true', help='Share browsers through a BrowserPool')
+    parser.add_argument('--headed', action='store_true', help='Show the browsers')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+    args.platform = args.platform or ['douyin']
+    if not args.headed:
+        os.environ['UPLOADER_HEADLESS'] = '1'
+
+    scratch = Path(tempfile.mkdtemp(prefix='bench_uploads_'))
+    redirect_state(scratch)
+    try:
+        results = asyncio.run(run_benchmark(args, scratch))
+    finally:
+        # flush now so the exit hook does not write into the removed scratch directory
+        selector_registry.save_stats()
+        shutil.rmtree(scratch, ignore_errors=True)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(f"\n📦 Server received: {results['server']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,3 +12,102 @@ LOCAL_CHROME_PATH = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrom
 
 # XHS Server (for xiaohongshu signature)
 XHS_SERVER = "http://localhost:5005"
+
+# Creator platform origins the uploaders open. UPLOADER_BASE_URL (every platform) or
+# UPLOADER_BASE_URL_<PLATFORM> (e.g. UPLOADER_BASE_URL_DOUYIN) points them at another server,
+# such as the local stand-in started by mock_platform_server.py
+PLATFORM_BASE_URLS = {
+    "douyin": "https://creator.douyin.com",
+    "kuaishou": "https://cp.kuaishou.com",
+    "tencent": "https://channels.weixin.qq.com",
+    "tiktok": "https://www.tiktok.com",
+    "xhs": "https://creator.xiaohongshu.com",
+}
+
+# Cookie validation cache: seconds a cookie_auth verdict stays valid per platform (0 disables)
+COOKIE_VALIDATION_TTL = {
+    "douyin": 6 * 3600,
+    "kuaishou": 6 * 3600,
+    "tencent": 2 * 3600,
+    "tiktok": 12 * 3600,
+}
+
+# Uploader daemon: Unix socket the daemon listens on and the client connects to
+UPLOADER_DAEMON_SOCKET = str(BASE_DIR / "uploader_daemon.sock")
+
+# Resource blocking (utils/resource_blocking.py): which stages abort images/fonts/media/telemetry requests.
+# "auth" = cookie checks, "upload" = upload flow (only fonts and telemetry are blocked there).
+# UPLOADER_BLOCK_RESOURCES=1 enables blocking during uploads without editing this file.
+RESOURCE_BLOCKING = {
+    "auth": True,
+    "upload": False,
+}
+
+# Concurrent batch uploads: maximum in-flight uploads per platform (the global --concurrency still applies)
+PLATFORM_UPLOAD_CONCURRENCY = {
+    "douyin": 2,
+    "kuaishou": 2,
+    "tencent": 2,
+    "tiktok": 2,
+}
+
+# Pooled browser recycling (utils/browser_pool.py), besides the --browser-max-uses count: a browser is drained and
+# relaunched after BROWSER_MAX_AGE_SECONDS or once its process tree exceeds BROWSER_MAX_RSS_MB (0 disables either),
+# checked every BROWSER_RSS_SAMPLE_INTERVAL seconds
+BROWSER_MAX_AGE_SECONDS = 1800
+BROWSER_MAX_RSS_MB = 1536
+BROWSER_RSS_SAMPLE_INTERVAL = 15
+
+# Batch job store (SQLite): job states for upload_from_config.py --batch / --resume
+JOB_DB_PATH = str(BASE_DIR / "jobs.db")
+# SQLite journal mode of the job store. WAL needs memory shared between the processes of one host:
+# use "DELETE" when workers on several hosts open jobs.db on a network share (upload_worker.py)
+JOB_DB_JOURNAL_MODE = "WAL"
+# --retry-failed: failed jobs are retried on resume until they have used JOB_MAX_ATTEMPTS attempts
+JOB_MAX_ATTEMPTS = 3
+
+# Upload workers (upload_worker.py): a claimed job is leased for WORKER_LEASE_SECONDS and the lease is renewed
+# every WORKER_HEARTBEAT_SECONDS; a job whose lease expired is reclaimed until it has used WORKER_MAX_ATTEMPTS
+WORKER_LEASE_SECONDS = 120
+WORKER_HEARTBEAT_SECONDS = 30
+WORKER_MAX_ATTEMPTS = 3
+WORKER_POLL_INTERVAL = 5
+
+# Inbox watch mode (watch_inbox.py): a video is enqueued once it and its .txt sidecar have not changed for
+# WATCH_SETTLE_SECONDS; WATCH_POLL_INTERVAL is the rescan period when inotify is unavailable
+WATCH_SETTLE_SECONDS = 10
+WATCH_POLL_INTERVAL = 5
+
+# Process-isolated batches (upload_from_config.py --isolate, utils/upload_supervisor.py): a job is killed, together
+# with its worker's browsers, after SUPERVISOR_JOB_TIMEOUT seconds or once the worker's process tree exceeds
+# SUPERVISOR_MAX_RSS_MB; 0 disables a limit
+SUPERVISOR_JOB_TIMEOUT = 2400
+SUPERVISOR_MAX_RSS_MB = 3072
+SUPERVISOR_SAMPLE_INTERVAL = 2
+
+# Selector hit statistics (utils/selector_registry.py), merged on process exit
+SELECTOR_STATS_PATH = str(BASE_DIR / "cookies" / "selector_stats.json")
+
+# Per-stage upload timings, one JSON line per stage (utils/stage_timer.py, summarized by timing_report.py)
+STAGE_TIMINGS_PATH = str(BASE_DIR / "logs" / "stage_timings.jsonl")
+
+# Posting rate limits (token buckets, state shared on disk by every process):
+# platform -> {"account": (max posts, per seconds) for each account, "platform": (max posts, per seconds) in total}
+UPLOAD_RATE_LIMITS = {
+    "douyin": {"account": (5, 3600)},
+    "kuaishou": {"account": (5, 3600)},
+    "tencent": {"account": (3, 3600)},
+    "tiktok": {"account": (4, 3600)},
+}
+# Per-account overrides: cookie file path -> (max posts, per seconds)
+ACCOUNT_RATE_LIMITS = {}
+
+# Upload stage budgets in seconds (utils/retry.py). A stage that does not finish in time fails the job
+# instead of holding its browser slot; "<platform>.<stage>" keys override the default for one platform.
+UPLOAD_STAGE_BUDGETS = {
+    "open_publish_page": 60,
+    "video_upload": 1800,
+    "publish": 180,
+    "cover": 45,
+    "tiktok.publish": 120,
+}
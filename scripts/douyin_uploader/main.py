@@ -1,51 +1,70 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
+import time
 
-from playwright.async_api import Playwright, async_playwright, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import os
 import asyncio
+import tempfile
+from pathlib import Path
 
-from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from utils.browser_factory import platform_context
+from utils.cookie_cache import check_cookie, record_verdict
+from utils.files_times import get_absolute_path
+from utils.locators import locate
 from utils.log import douyin_logger
+from utils.platform_urls import platform_url
+from utils.popup_dismisser import dismiss_popups
+from utils.retry import AuthExpiredError, PlatformRejectedError, StageTimeoutError, poll_until
+from utils.stage_timer import timed_upload
+from utils.upload_monitor import UploadMonitor
+
+# 封面流程的页面元素（预览关闭按钮、AI封面的候选选择器见 utils/selector_registry）；
+# 坐标只在这些选择器失效时兜底使用
+COVER_MODAL_SELECTOR = 'div.dy-creator-content-modal'
+COVER_FILE_INPUT_SELECTOR = "div.dy-creator-content-modal div[class^='semi-upload upload'] >> input.semi-upload-hidden-input"
+COVER_FINISH_SELECTOR = "div.dy-creator-content-modal button:visible:has-text('完成')"
+AI_COVER_CONFIRM_SELECTOR = 'div.semi-modal:has-text("是否确认应用此封面") button:has-text("确定")'
+COVER_COORDINATES = {
+    'close_preview': (940, 215),
+    'ai_cover': (690, 250),
+    'confirm': (815, 396),
+}
+
+
+async def open_upload_page(context):
+    """打开上传页并校验登录态，cookie 有效时返回已加载的页面，失效时返回 None"""
+    # 创建一个新的页面
+    page = await context.new_page()
+    # 访问指定的 URL
+    await page.goto(platform_url('douyin', "/creator-micro/content/upload"))
+    try:
+        await page.wait_for_url(platform_url('douyin', "/creator-micro/content/upload"), timeout=5000)
+    except:
+        print("[+] 等待5秒 cookie 失效")
+        return None
+    # 2024.06.17 抖音创作者中心改版
+    if await page.get_by_text('手机号登录').count() or await page.get_by_text('扫码登录').count():
+        print("[+] 等待5秒 cookie 失效")
+        return None
+    print("[+] cookie 有效")
+    return page
 
 
 async def cookie_auth(account_file):
-    async with async_playwright() as playwright:
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(headless=True, executable_path=LOCAL_CHROME_PATH)
-        else:
-            browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=account_file)
-        context = await set_init_script(context)
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://creator.douyin.com/creator-micro/content/upload")
-        try:
-            await page.wait_for_url("https://creator.douyin.com/creator-micro/content/upload", timeout=5000)
-        except:
-            print("[+] 等待5秒 cookie 失效")
-            await context.close()
-            await browser.close()
-            return False
-        # 2024.06.17 抖音创作者中心改版
-        if await page.get_by_text('手机号登录').count() or await page.get_by_text('扫码登录').count():
-            print("[+] 等待5秒 cookie 失效")
-            return False
-        else:
-            print("[+] cookie 有效")
-            return True
+    async with platform_context('douyin', headless=True, stage='auth',
+                                storage_state=account_file) as context:
+        return await open_upload_page(context) is not None
 
 
-async def douyin_setup(account_file, handle=False):
+async def douyin_setup(account_file, handle=False, revalidate=False):
     # If account_file is an absolute path or contains /, use as-is
     if os.path.isabs(account_file) or "/" in account_file:
         account_path = account_file
     else:
         account_path = get_absolute_path(account_file, "douyin_uploader")
     
-    if not os.path.exists(account_path) or not await cookie_auth(account_path):
+    if not os.path.exists(account_path) or not await check_cookie('douyin', account_path, cookie_auth, revalidate):
         if not handle:
             # Todo alert message
             return False
@@ -55,20 +74,10 @@ async def douyin_setup(account_file, handle=False):
 
 
 async def douyin_cookie_gen(account_file):
-    async with async_playwright() as playwright:
-        options = {
-            'headless': False
-        }
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(executable_path=LOCAL_CHROME_PATH, **options)
-        else:
-            browser = await playwright.chromium.launch(**options)
-        # Setup context however you like.
-        context = await browser.new_context()  # Pass any options
-        context = await set_init_script(context)
+    async with platform_context('douyin', headless=False, stage='login') as context:
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://creator.douyin.com/")
+        await page.goto(platform_url('douyin'))
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -82,8 +91,10 @@ class DouYinVideo(object):
         self.publish_date = publish_date
         self.account_file = account_file
         self.date_format = '%Y年%m月%d日 %H:%M'
-        self.local_executable_path = LOCAL_CHROME_PATH
         self.thumbnail_path = thumbnail_path
+        self.cover_elapsed = None
+        self.upload_monitor = None
+        self.publish_turn = None  # 流水线模式下由 utils/upload_pipeline 设置
         self.productLink = productLink
         self.productTitle = productTitle
 
@@ -105,61 +116,54 @@ class DouYinVideo(object):
 
     async def handle_upload_error(self, page):
         douyin_logger.info('视频出错了，重新上传中')
+        if self.upload_monitor is not None:
+            self.upload_monitor.reset()
         await page.locator('div.progress-div [class^="upload-btn-input"]').set_input_files(self.file_path)
 
-    async def upload(self, playwright: Playwright) -> None:
-        # 使用 Chromium 浏览器启动一个浏览器实例
-        if self.local_executable_path:
-            browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
-        else:
-            browser = await playwright.chromium.launch(headless=False)
-        # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
-        context = await set_init_script(context)
-
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://creator.douyin.com/creator-micro/content/upload")
+    @timed_upload('douyin', douyin_logger)
+    async def upload_in_context(self, context, page=None) -> None:
+        self.stage_timer.stage('navigate')
+        if page is None:
+            # 创建一个新的页面
+            page = await context.new_page()
+            # 访问指定的 URL
+            await page.goto(platform_url('douyin', "/creator-micro/content/upload"))
         douyin_logger.info(f'[+]正在上传-------{self.title}.mp4')
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
         douyin_logger.info(f'[-] 正在打开主页...')
-        await page.wait_for_url("https://creator.douyin.com/creator-micro/content/upload")
-        # 点击 "上传视频" 按钮
+        await page.wait_for_url(platform_url('douyin', "/creator-micro/content/upload"))
+        # 点击 "上传视频" 按钮（先挂上网络监听，分片上传的进度和完成都从响应里看）
+        self.upload_monitor = UploadMonitor(page, 'douyin', self.file_path, logger=douyin_logger).start()
         await page.locator("div[class^='container'] input").set_input_files(self.file_path)
 
         # 等待页面跳转到指定的 URL 2025.01.08修改在原有基础上兼容两种页面
-        while True:
-            try:
-                # 尝试等待第一个 URL
-                await page.wait_for_url(
-                    "https://creator.douyin.com/creator-micro/content/publish?enter_from=publish_page", timeout=3000)
-                douyin_logger.info("[+] 成功进入version_1发布页面!")
-                break  # 成功进入页面后跳出循环
-            except Exception:
+        async def reached_publish_page():
+            for version, url in (
+                    (1, platform_url('douyin', "/creator-micro/content/publish?enter_from=publish_page")),
+                    (2, platform_url('douyin', "/creator-micro/content/post/video?enter_from=publish_page"))):
                 try:
-                    # 如果第一个 URL 超时，再尝试等待第二个 URL
-                    await page.wait_for_url(
-                        "https://creator.douyin.com/creator-micro/content/post/video?enter_from=publish_page",
-                        timeout=3000)
-                    douyin_logger.info("[+] 成功进入version_2发布页面!")
+                    await page.wait_for_url(url, timeout=3000)
+                    douyin_logger.info(f"[+] 成功进入version_{version}发布页面!")
+                    return True
+                except PlaywrightTimeoutError:
+                    continue
+            if await page.get_by_text('扫码登录').count():
+                raise AuthExpiredError("跳转到了登录页")
+            print("  [-] 超时未进入视频发布页面，重新尝试...")
+            return False
 
-                    break  # 成功进入页面后跳出循环
-                except:
-                    print("  [-] 超时未进入视频发布页面，重新尝试...")
-                    await asyncio.sleep(0.5)  # 等待 0.5 秒后重新尝试
+        await poll_until(reached_publish_page, 'open_publish_page', 'douyin', logger=douyin_logger)
+        if self.publish_turn is not None:
+            # 流水线模式：视频已在后台上传，等前面的视频发布完再操作页面
+            self.stage_timer.stage('pipeline_wait')
+            await self.publish_turn(page)
+        self.stage_timer.stage('metadata')
         # 填充标题和话题
         # 检查是否存在包含输入框的元素
         # 这里为了避免页面变化，故使用相对位置定位：作品标题父级右侧第一个元素的input子元素
         await asyncio.sleep(1)
         douyin_logger.info(f'  [-] 正在填充标题和作品简介...')
-        title_selectors = [
-            "input.semi-input[placeholder*='作品标题']",
-            "input.semi-input[placeholder*='填写作品标题']",
-            "input[placeholder*='作品标题']",
-            ".editor-comp-publish-container-d4oeQI input.semi-input",
-        ]
-        title_container = await self.locate_first_visible(page, title_selectors, timeout=15000)
+        title_container = await locate(page, 'douyin', 'title', timeout=15000)
         if title_container:
             await title_container.fill(self.title[:30])
         else:
@@ -171,15 +175,7 @@ class DouYinVideo(object):
             await page.keyboard.type(self.title)
             await page.keyboard.press("Enter")
 
-        description_selectors = [
-            ".editor-kit-editor-container .zone-container.editor[contenteditable='true']",
-            ".zone-container.editor[contenteditable='true']",
-            ".editor-kit-editor-container [contenteditable='true']",
-            ".editor-comp-publish-container-d4oeQI [contenteditable='true']",
-            "[contenteditable='true'][data-placeholder*='作品简介']",
-            "[contenteditable='true'][data-placeholder*='正文']",
-        ]
-        description_editor = await self.locate_first_visible(page, description_selectors, timeout=15000)
+        description_editor = await locate(page, 'douyin', 'description', timeout=15000)
         if description_editor is None:
             raise RuntimeError("未找到抖音作品简介输入框，请检查页面结构是否发生变化。")
         await description_editor.click()
@@ -198,34 +194,39 @@ class DouYinVideo(object):
             await page.wait_for_timeout(200)  # brief pause to let Douyin suggestion panel settle
         await page.wait_for_timeout(1000)  # ensure the editor syncs before proceeding
         douyin_logger.info(f'总共添加{len(self.tags)}个话题')
-        while True:
+        self.stage_timer.stage('file_transfer')
+        upload_errors = 0
+
+        async def video_uploaded():
+            nonlocal upload_errors
             # 判断重新上传按钮是否存在，如果不存在，代表视频正在上传，则等待
-            try:
-                #  新版：定位重新上传
-                number = await page.locator('[class^="long-card"] div:has-text("重新上传")').count()
-                if number > 0:
-                    douyin_logger.success("  [-]视频上传完毕")
-                    break
-                else:
-                    douyin_logger.info("  [-] 正在上传视频中...")
-                    await asyncio.sleep(2)
-
-                    if await page.locator('div.progress-div > div:has-text("上传失败")').count():
-                        douyin_logger.error("  [-] 发现上传出错了... 准备重试")
-                        await self.handle_upload_error(page)
-            except:
-                douyin_logger.info("  [-] 正在上传视频中...")
-                await asyncio.sleep(2)
+            #  新版：定位重新上传
+            if await page.locator('[class^="long-card"] div:has-text("重新上传")').count():
+                douyin_logger.success("  [-]视频上传完毕")
+                return True
+            douyin_logger.info("  [-] 正在上传视频中...")
+            if await page.locator('div.progress-div > div:has-text("上传失败")').count():
+                upload_errors += 1
+                if upload_errors > 3:
+                    raise PlatformRejectedError("视频多次上传失败")
+                douyin_logger.error("  [-] 发现上传出错了... 准备重试")
+                await self.handle_upload_error(page)
+            return False
+
+        await self.upload_monitor.wait_until_uploaded(video_uploaded, interval=2, max_interval=2)
 
         if self.productLink and self.productTitle:
+            self.stage_timer.stage('product_link')
             douyin_logger.info(f'  [-] 正在设置商品链接...')
             await self.set_product_link(page, self.productLink, self.productTitle)
             douyin_logger.info(f'  [+] 完成设置商品链接...')
         
         #上传视频封面
+        self.stage_timer.stage('cover')
         await self.set_thumbnail(page, self.thumbnail_path)
 
         # 更换可见元素
+        self.stage_timer.stage('settings')
         await self.set_location(page, "")
 
 
@@ -240,306 +241,265 @@ class DouYinVideo(object):
         if self.publish_date != 0:
             await self.set_schedule_time_douyin(page, self.publish_date)
 
-        # 【关键】发布前强制关闭所有弹窗
+        self.stage_timer.stage('publish')
+        # 【关键】发布前强制关闭所有弹窗（封面推荐浮层、遮挡的 portal 等，见 utils/popup_dismisser）
         douyin_logger.info('  [-] 强制关闭所有弹窗...')
-        for _ in range(5):
-            await page.keyboard.press("Escape")
-            await page.wait_for_timeout(500)
+        await self.close_popups(page)
         # 刷新页面状态
         await page.evaluate("() => { window.scrollTo(0, 0); }")
-        await page.wait_for_timeout(2000)
-        
-        # 【额外】关闭封面推荐弹窗 - 精确查找并关闭
-        await page.evaluate('''() => {
-            // 查找所有可能包含关闭按钮的元素
-            const allDivs = document.querySelectorAll('div');
-            allDivs.forEach(div => {
-                const style = window.getComputedStyle(div);
-                const text = div.textContent || '';
-                // 找到封面推荐浮层（通常在右侧，有固定定位）
-                if (text.includes('封面推荐') && text.includes('换一换')) {
-                    // 查找×关闭按钮 - 通常在右上角
-                    const closeBtn = Array.from(div.querySelectorAll('button, span, div')).find(el => {
-                        const t = el.textContent?.trim();
-                        return t === '×' || t === '✕';
-                    });
-                    if (closeBtn) {
-                        closeBtn.click();
-                    } else {
-                        // 如果找不到关闭按钮，就隐藏整个元素
-                        div.style.display = 'none';
-                    }
-                }
-            });
-            // 隐藏所有可能遮挡的portal
-            document.querySelectorAll('.dy-creator-content-portal').forEach(p => {
-                p.style.display = 'none';
-            });
-        }''')
-        await page.wait_for_timeout(1500)
-        await page.wait_for_timeout(1000)
-        
+
         # 判断视频是否发布成功
-        max_publish_attempts = 10
         publish_attempt = 0
-        
-        while publish_attempt < max_publish_attempts:
+
+        async def try_publish():
+            nonlocal publish_attempt
             publish_attempt += 1
-            try:
-                # 关闭所有弹窗
-                await self.close_popups(page)
-                await page.wait_for_timeout(500)
-                
-                # 【关键】关闭推荐封面素材弹窗
-                await page.evaluate('''() => {
-                    // 关闭推荐封面素材弹窗
-                    const coverPopups = document.querySelectorAll('[class*="推荐封面"], .dy-creator-content-portal');
-                    coverPopups.forEach(p => p.style.display = 'none');
-                    // 尝试点击弹窗关闭按钮
-                    const closeBtns = document.querySelectorAll('button[class*="close"], [class*="close"]');
-                    closeBtns.forEach(btn => {
-                        if (btn.textContent.includes('×') || btn.textContent.includes('关闭')) {
-                            btn.click();
-                        }
-                    });
-                }''')
-                await page.wait_for_timeout(1000)
-                
-                # 隐藏所有遮挡弹窗
-                await page.evaluate('''() => {
-                    // 隐藏所有 dy-creator-content-portal
-                    const portals = document.querySelectorAll('.dy-creator-content-portal');
-                    portals.forEach(p => p.style.display = 'none');
-                }''')
-                await page.wait_for_timeout(500)
-                
-                # 【关键】使用JavaScript直接点击发布按钮，绕过弹窗遮挡
-                douyin_logger.info(f'  [-] 使用JS点击发布按钮 (尝试 {publish_attempt})')
-                
-                # 方法1: JavaScript直接点击
-                js_clicked = await page.evaluate('''() => {
-                    // 查找所有包含"发布"的按钮
-                    const buttons = Array.from(document.querySelectorAll('button'));
-                    const publishBtn = buttons.find(b => b.textContent.trim() === '发布' && !b.disabled);
-                    if (publishBtn) {
-                        publishBtn.click();
-                        return true;
-                    }
-                    return false;
-                }''')
-                
-                if js_clicked:
-                    douyin_logger.info('  [+] JS点击成功')
-                    await page.wait_for_timeout(5000)
-                    
-                    # 【关键】截图并检查是否成功
-                    await page.screenshot(path='/tmp/publish_result.png')
-                    douyin_logger.info('  [-] 已截图保存')
-                    
-                    # 检查成功提示
-                    success_texts = ["发布成功", "作品已发布", "发布完成", "success"]
-                    for txt in success_texts:
-                        if await page.get_by_text(txt).count() > 0:
-                            douyin_logger.info(f'  [+] 找到成功提示: {txt}')
-                            return True
-                    
-                    # 检查是否有确认对话框
-                    for confirm_text in ["确认发布", "确定", "是", "确认"]:
-                        confirm_button = page.get_by_role('button', name=confirm_text)
-                        if await confirm_button.count():
-                            douyin_logger.info(f'  [-] 找到确认按钮: {confirm_text}')
-                            await confirm_button.click()
-                            await page.wait_for_timeout(5000)
-                            douyin_logger.info('  [+] 视频发布成功！')
-                            return True
-                    
-                    # 如果发布按钮消失了，说明可能成功发布了
-                    publish_btn_count = await page.get_by_role('button', name="发布").count()
-                    if publish_btn_count == 0:
-                        douyin_logger.info('  [+] 发布按钮消失，假定发布成功')
+            # 关闭所有弹窗
+            await self.close_popups(page)
+
+            # 【关键】使用JavaScript直接点击发布按钮，绕过弹窗遮挡
+            douyin_logger.info(f'  [-] 使用JS点击发布按钮 (尝试 {publish_attempt})')
+
+            # 方法1: JavaScript直接点击
+            js_clicked = await page.evaluate('''() => {
+                // 查找所有包含"发布"的按钮
+                const buttons = Array.from(document.querySelectorAll('button'));
+                const publishBtn = buttons.find(b => b.textContent.trim() === '发布' && !b.disabled);
+                if (publishBtn) {
+                    publishBtn.click();
+                    return true;
+                }
+                return false;
+            }''')
+
+            if js_clicked:
+                douyin_logger.info('  [+] JS点击成功')
+                await page.wait_for_timeout(5000)
+
+                # 【关键】截图并检查是否成功（每个标签页单独的文件名，流水线模式下多个标签页同时发布）
+                screenshot_path = os.path.join(tempfile.gettempdir(),
+                                               f'publish_result_{Path(self.file_path).stem}_{id(page):x}.png')
+                await page.screenshot(path=screenshot_path)
+                douyin_logger.info(f'  [-] 已截图保存: {screenshot_path}')
+
+                # 检查成功提示
+                success_texts = ["发布成功", "作品已发布", "发布完成", "success"]
+                for txt in success_texts:
+                    if await page.get_by_text(txt).count() > 0:
+                        douyin_logger.info(f'  [+] 找到成功提示: {txt}')
+                        return True
+
+                # 检查是否有确认对话框
+                for confirm_text in ["确认发布", "确定", "是", "确认"]:
+                    confirm_button = page.get_by_role('button', name=confirm_text)
+                    if await confirm_button.count():
+                        douyin_logger.info(f'  [-] 找到确认按钮: {confirm_text}')
+                        await confirm_button.click()
+                        await page.wait_for_timeout(5000)
+                        douyin_logger.info('  [+] 视频发布成功！')
                         return True
-                    
-                    douyin_logger.info('  [+] 未找到确认对话框，假定发布成功')
+
+                # 如果发布按钮消失了，说明可能成功发布了
+                publish_btn_count = await page.get_by_role('button', name="发布").count()
+                if publish_btn_count == 0:
+                    douyin_logger.info('  [+] 发布按钮消失，假定发布成功')
                     return True
-                
-                # 方法2: Playwright普通点击（备用）
-                publish_button = None
-                
-                # 方法2: 按文本查找
-                if await page.get_by_role('button', name="发布", exact=True).count():
-                    publish_button = page.get_by_role('button', name="发布", exact=True).first
-                # 方法3: 模糊匹配
-                elif await page.locator('button:has-text("发布")').count():
-                    publish_button = page.locator('button:has-text("发布")').first
-                # 方法4: XPath
-                elif await page.locator('//button[contains(text(),"发布")]').count():
-                    publish_button = page.locator('//button[contains(text(),"发布")]').first
-                
-                if publish_button and await publish_button.count():
-                    # 检查按钮是否被禁用
-                    try:
-                        is_disabled = await publish_button.get_attribute("disabled")
-                        if is_disabled is not None:
-                            douyin_logger.info(f'  [!] 发布按钮被禁用，可能需要设置封面')
-                            # 检查封面状态
-                            cover_status = await page.locator('[class*="cover"]').count()
-                            douyin_logger.info(f'  [!] 封面元素数量: {cover_status}')
-                            # 尝试点击选择封面按钮
-                            if await page.get_by_text("选择封面").count() > 0:
-                                douyin_logger.info('  [!] 尝试重新设置封面')
-                                await page.get_by_text("选择封面").first.click()
-                                await page.wait_for_timeout(2000)
-                    except:
-                        pass
-                    
-                    douyin_logger.info(f'  [-] 点击发布按钮 (尝试 {publish_attempt})')
-                    await publish_button.click()
-                    await page.wait_for_timeout(3000)
-                    
-                    # 检查是否有确认对话框
-                    for confirm_text in ["确认发布", "确定", "yes", "确认"]:
-                        confirm_button = page.get_by_role('button', name=confirm_text)
-                        if await confirm_button.count():
-                            douyin_logger.info(f'  [-] 点击确认按钮: {confirm_text}')
-                            await confirm_button.click()
-                            await page.wait_for_timeout(5000)  # 等待发布完成
-                            douyin_logger.info('  [+] 视频发布成功！')
-                            return True  # 直接返回成功
-                
-                # 关闭弹窗后再次尝试
-                await self.close_popups(page)
-                    
-            except Exception as e:
-                douyin_logger.info(f'  [-] 发布出错: {e}')
-            
-            douyin_logger.info(f"  [-] 视频正在发布中... (尝试 {publish_attempt}/{max_publish_attempts})")
-            await page.wait_for_timeout(3000)
-        
-        if publish_attempt >= max_publish_attempts:
-            douyin_logger.error("  [-] 发布超时，请手动检查发布状态")
+
+                douyin_logger.info('  [+] 未找到确认对话框，假定发布成功')
+                return True
+
+            # 方法2: Playwright普通点击（备用），候选选择器见 utils/selector_registry
+            publish_button = await locate(page, 'douyin', 'publish_button', timeout=2000)
+
+            if publish_button and await publish_button.count():
+                # 检查按钮是否被禁用
+                try:
+                    is_disabled = await publish_button.get_attribute("disabled")
+                    if is_disabled is not None:
+                        douyin_logger.info(f'  [!] 发布按钮被禁用，可能需要设置封面')
+                        # 检查封面状态
+                        cover_status = await page.locator('[class*="cover"]').count()
+                        douyin_logger.info(f'  [!] 封面元素数量: {cover_status}')
+                        # 尝试点击选择封面按钮
+                        if await page.get_by_text("选择封面").count() > 0:
+                            douyin_logger.info('  [!] 尝试重新设置封面')
+                            await page.get_by_text("选择封面").first.click()
+                            await page.wait_for_timeout(2000)
+                except:
+                    pass
+
+                douyin_logger.info(f'  [-] 点击发布按钮 (尝试 {publish_attempt})')
+                await publish_button.click()
+                await page.wait_for_timeout(3000)
+
+                # 检查是否有确认对话框
+                for confirm_text in ["确认发布", "确定", "yes", "确认"]:
+                    confirm_button = page.get_by_role('button', name=confirm_text)
+                    if await confirm_button.count():
+                        douyin_logger.info(f'  [-] 点击确认按钮: {confirm_text}')
+                        await confirm_button.click()
+                        await page.wait_for_timeout(5000)  # 等待发布完成
+                        douyin_logger.info('  [+] 视频发布成功！')
+                        return True  # 直接返回成功
+
+            # 关闭弹窗后再次尝试
+            await self.close_popups(page)
+            douyin_logger.info(f"  [-] 视频正在发布中... (尝试 {publish_attempt})")
+            return False
+
+        await poll_until(try_publish, 'publish', 'douyin', interval=3, max_interval=5, logger=douyin_logger)
+        if self.publish_turn is not None:
+            # 流水线模式：同一上下文的多个标签页共用 cookie 文件，整组结束后统一保存
+            return
+        self.stage_timer.stage('save_cookie')
 
         await context.storage_state(path=self.account_file)  # 保存cookie
+        record_verdict('douyin', self.account_file, True)
         douyin_logger.success('  [-]cookie更新完毕！')
         await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
-        # 关闭浏览器上下文和浏览器实例
-        await context.close()
-        await browser.close()
 
     async def close_popups(self, page: Page):
-        """关闭可能弹出的对话框"""
+        """关闭可能弹出的对话框：页面内的 popup_dismisser 做一次全量清理，再按一次 ESC"""
         try:
-            # 尝试多次关闭弹窗
-            for i in range(3):
-                # 按ESC
-                await page.keyboard.press("Escape")
-                await page.wait_for_timeout(500)
-                
-                # 尝试点击任何可见的关闭按钮
-                close_selectors = [
-                    'button[class*="close"]',
-                    'button[aria-label="关闭"]', 
-                    'button[aria-label="Close"]',
-                    'button:has-text("关闭")',
-                    'button:has-text("取消")',
-                    'button:has-text("我知道啦")]'
-                ]
-                
-                for selector in close_selectors:
-                    try:
-                        btn = page.locator(selector).first
-                        if await btn.is_visible():
-                            await btn.click()
-                            await page.wait_for_timeout(500)
-                    except:
-                        pass
-                
-                # 检查是否还有弹窗
-                modal = page.locator("div[class*='modal']").first
-                if await modal.count() > 0:
-                    try:
-                        if await modal.is_visible():
-                            await page.wait_for_timeout(500)
-                    except:
-                        break
-                else:
-                    break
-                    
+            counts = await dismiss_popups(page, 'douyin')
+            await page.keyboard.press("Escape")
+            if counts:
+                douyin_logger.debug(f'  [-] 已关闭弹窗: {counts}')
         except Exception as e:
             pass
-    
-    async def set_thumbnail(self, page: Page, thumbnail_path: str):
-        """按用户提供的坐标流程"""
-        douyin_logger.info('  [-] 开始封面流程...')
-        
-        # 1. 等待视频上传完成
-        await page.wait_for_timeout(10000)
-        
-        # 2. 关闭视频预览 (940, 215)
-        douyin_logger.info('  [-] 关闭视频预览(940, 215)...')
-        await page.evaluate('''() => {
-            const x = 940, y = 215;
+
+    async def click_at(self, page: Page, x: int, y: int):
+        """点击视口坐标处的元素（DOM 信号拿不到时的兜底）"""
+        await page.evaluate('''([x, y]) => {
             const el = document.elementFromPoint(x, y);
             if(el){ el.click(); }
-        }''')
-        await page.wait_for_timeout(2000)
-        
-        # 3. 等待6-10秒让AI封面生成
-        douyin_logger.info('  [-] 等待AI封面生成(10秒)...')
-        await page.wait_for_timeout(10000)
-        
-        # 4. 点击AI智能推荐封面 (690, 250)
+        }''', [x, y])
+
+    async def close_preview(self, page: Page):
+        """关闭上传完成后弹出的视频预览"""
+        close_button = await locate(page, 'douyin', 'preview_close', timeout=2000)
+        if close_button:
+            douyin_logger.info('  [-] 关闭视频预览')
+            await close_button.click()
+        elif await page.locator(COVER_MODAL_SELECTOR).count():
+            douyin_logger.info('  [-] 关闭视频预览(940, 215)...')
+            await self.click_at(page, *COVER_COORDINATES['close_preview'])
+
+    async def upload_custom_cover(self, page: Page, thumbnail_path: str) -> bool:
+        """上传用户提供的竖封面，平台会据此生成横封面"""
+        douyin_logger.info(f'  [-] 上传自定义封面: {thumbnail_path}')
+        try:
+            await page.get_by_text("选择封面").first.click(timeout=10000)
+            await page.wait_for_selector(COVER_MODAL_SELECTOR, timeout=10000)
+            await page.get_by_text("设置竖封面").first.click(timeout=5000)
+            await page.locator(COVER_FILE_INPUT_SELECTOR).first.set_input_files(thumbnail_path)
+            # 图片裁剪区加载完成后"完成"按钮才可点击
+            finish_button = page.locator(COVER_FINISH_SELECTOR).first
+            await finish_button.wait_for(state="visible", timeout=15000)
+            await finish_button.click()
+            await page.wait_for_selector(COVER_MODAL_SELECTOR, state='detached', timeout=15000)
+            douyin_logger.info('  [+] 自定义封面上传完成')
+            return True
+        except PlaywrightTimeoutError as e:
+            douyin_logger.warning(f'  [!] 自定义封面上传失败，改用AI推荐封面: {e}')
+            await page.keyboard.press("Escape")
+            return False
+
+    async def apply_ai_cover(self, page: Page) -> bool:
+        """等AI推荐封面出现后点击，并确认应用此封面"""
+        confirm_dialog = page.get_by_text("是否确认应用此封面")
+
+        async def ai_cover_applied():
+            ai_cover = await locate(page, 'douyin', 'ai_cover', timeout=1000)
+            if ai_cover is None:
+                return False
+            await ai_cover.click()
+            await confirm_dialog.first.wait_for(state="visible", timeout=3000)
+            return True
+
+        try:
+            await poll_until(ai_cover_applied, 'cover', 'douyin', interval=1, max_interval=3)
+        except StageTimeoutError as e:
+            douyin_logger.info(f'  [!] 未检测到AI推荐封面: {e}')
+            return False
+        douyin_logger.info('  [-] 找到确认对话框!')
+        await page.locator(AI_COVER_CONFIRM_SELECTOR).first.click()
+        await confirm_dialog.first.wait_for(state="hidden", timeout=5000)
+        return True
+
+    async def apply_ai_cover_by_coordinates(self, page: Page) -> bool:
+        """旧的坐标流程，只在页面结构对不上时使用"""
         douyin_logger.info('  [-] 点击AI封面(690, 250)...')
+        confirm_dialog = page.get_by_text("是否确认应用此封面")
         for i in range(15):
-            await page.evaluate('''() => {
-                const x = 690, y = 250;
-                const el = document.elementFromPoint(x, y);
-                if(el){ el.click(); }
-            }''')
+            await self.click_at(page, *COVER_COORDINATES['ai_cover'])
             douyin_logger.info(f'  [-] 点击第{i+1}次')
-            
-            # 点击后等待3秒让弹出框出现
-            await page.wait_for_timeout(3000)
-            
-            # 检查是否弹出确认框
-            if await page.get_by_text("是否确认应用此封面").count()>0:
-                douyin_logger.info('  [-] 找到确认对话框!')
+            try:
+                await confirm_dialog.first.wait_for(state="visible", timeout=3000)
                 break
-        
-        # 5. 等待弹出框稳定，然后点击确定 (815, 396)，多点几次
-        douyin_logger.info('  [-] 点击确定(815, 396)...')
-        await page.wait_for_timeout(1000)
+            except PlaywrightTimeoutError:
+                continue
+        else:
+            return False
+        douyin_logger.info('  [-] 找到确认对话框!')
+        # 多点几次确保点中，对话框消失即停止
         for i in range(5):
-            await page.evaluate('''() => {
-                const x = 815, y = 396;
-                const el = document.elementFromPoint(x, y);
-                if(el){ el.click(); }
-            }''')
+            await self.click_at(page, *COVER_COORDINATES['confirm'])
             douyin_logger.info(f'  [-] 确定按钮点击第{i+1}次')
-            await page.wait_for_timeout(500)
-        await page.wait_for_timeout(15000)  # 等待10-15秒生成横封面
-        
-        # 6. 验证封面状态
-        douyin_logger.info('  [-] 验证封面状态...')
-        cover_check = await page.evaluate('''() => {
-            const text = document.body.innerText;
-            if(text.includes('横/竖双封面缺失') || text.includes('封面缺失')){
-                return 'COVER_MISSING';
-            }
-            return 'COVER_OK';
-        }''')
-        douyin_logger.info(f'  [-] 封面状态: {cover_check}')
-        
-        # 7. 添加AI声明 - 无论封面状态如何都要添加！
+            try:
+                await confirm_dialog.first.wait_for(state="hidden", timeout=500)
+                break
+            except PlaywrightTimeoutError:
+                continue
+        return True
+
+    async def wait_for_cover_ready(self, page: Page, timeout=20000) -> bool:
+        """等平台生成横封面：页面上不再提示封面缺失"""
+        try:
+            await page.wait_for_function('''() => {
+                const text = document.body.innerText;
+                return !(text.includes('横/竖双封面缺失') || text.includes('封面缺失'));
+            }''', timeout=timeout, polling=500)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def set_thumbnail(self, page: Page, thumbnail_path: str):
+        """设置封面：优先用户封面，其次AI推荐封面，坐标点击兜底"""
+        douyin_logger.info('  [-] 开始封面流程...')
+        start_time = time.perf_counter()
+
+        await self.close_preview(page)
+
+        cover_set = False
+        if thumbnail_path:
+            if os.path.exists(thumbnail_path):
+                cover_set = await self.upload_custom_cover(page, thumbnail_path)
+            else:
+                douyin_logger.warning(f'  [!] 封面文件不存在: {thumbnail_path}')
+        if not cover_set:
+            cover_set = await self.apply_ai_cover(page)
+        if not cover_set:
+            douyin_logger.info('  [!] 改用坐标流程设置封面')
+            cover_set = await self.apply_ai_cover_by_coordinates(page)
+
+        # 验证封面状态
+        cover_ready = cover_set and await self.wait_for_cover_ready(page)
+        douyin_logger.info(f'  [-] 封面状态: {"COVER_OK" if cover_ready else "COVER_MISSING"}')
+
+        # 添加AI声明 - 无论封面状态如何都要添加！
         douyin_logger.info('  [-] 添加AI声明...')
         try:
             await page.get_by_text("添加声明").scroll_into_view_if_needed()
             await page.get_by_text("添加声明").click(timeout=5000)
-            await page.wait_for_timeout(2000)
             # 勾选"内容由AI生成"
             ai_checkbox = page.locator('label:has-text("内容由AI生成")')
-            if await ai_checkbox.count()>0:
+            try:
+                await ai_checkbox.first.wait_for(state="visible", timeout=5000)
                 await ai_checkbox.click(force=True)
                 douyin_logger.info('  [+] 已勾选"内容由AI生成"')
+            except PlaywrightTimeoutError:
+                pass
             # 点击确定
             if await page.get_by_text("确定").count()>0:
                 await page.get_by_text("确定").first.click(force=True)
@@ -550,9 +510,10 @@ class DouYinVideo(object):
                 await page.keyboard.press("Escape")
             except:
                 pass
-        
-        douyin_logger.info('  [+] 封面完成')
-    
+
+        self.cover_elapsed = time.perf_counter() - start_time
+        douyin_logger.info(f'  [+] 封面完成，耗时 {self.cover_elapsed:.1f}s')
+
     async def set_location(self, page: Page, location: str = ""):
         if not location:
             return
@@ -660,22 +621,19 @@ class DouYinVideo(object):
             douyin_logger.error(f"[-] 设置商品链接时出错: {str(e)}")
             return False
 
-    async def locate_first_visible(self, page: Page, selectors, timeout=5000):
-        """
-        Try selectors sequentially and return the first visible locator.
-        """
-        for selector in selectors:
-            locator = page.locator(selector).first
-            if not await locator.count():
-                continue
-            try:
-                await locator.wait_for(state="visible", timeout=timeout)
-                return locator
-            except PlaywrightTimeoutError:
-                continue
-        return None
+    async def validate_and_upload(self, browser_pool=None) -> bool:
+        """校验 cookie 与上传共用同一个浏览器会话，cookie 失效时返回 False"""
+        async with platform_context('douyin', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            page = await open_upload_page(context)
+            record_verdict('douyin', self.account_file, page is not None)
+            if page is None:
+                return False
+            await self.upload_in_context(context, page=page)
+        return True
 
-    async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+    async def main(self, browser_pool=None):
+        async with platform_context('douyin', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            await self.upload_in_context(context)
 
@@ -136,6 +136,7 @@ def generate_config(
     account_file: str = None,
     publish_date: str = None,
     output_format: str = 'json',
+    verify_video: bool = True,
     **kwargs
 ) -> dict:
     """
@@ -150,6 +151,7 @@ def generate_config(
         account_file: Path to cookie file
         publish_date: Schedule time or None for immediate
         output_format: Output format (json/yaml/command)
+        verify_video: Check that the video file exists (off when the caller already did)
         **kwargs: Additional platform-specific options
     
     Returns:
@@ -157,7 +159,7 @@ def generate_config(
     """
     # Verify video file exists
     video_path = Path(video_path).resolve()
-    if not video_path.exists():
+    if verify_video and not video_path.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
     # Auto-generate title if not provided
@@ -237,6 +239,109 @@ def generate_config(
     return config
 
 
+def merge_overrides(base: dict, overrides: dict) -> dict:
+    """
+    Recursively merge override values into a configuration
+    
+    Args:
+        base: Configuration dictionary (modified in place)
+        overrides: Values to merge; nested dictionaries are merged, other values replace
+    
+    Returns:
+        The merged configuration
+    """
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge_overrides(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def generate_fanout_configs(
+    platforms: list,
+    video_path: str,
+    title: str = None,
+    tags: list = None,
+    description: str = None,
+    accounts: dict = None,
+    publish_date: str = None,
+    overrides: dict = None,
+    **kwargs
+) -> list:
+    """
+    Generate one upload configuration per platform for the same video
+    
+    Each platform's config comes from generate_config (so platform rules such
+    as title length and tag limits apply), then that platform's entry in
+    overrides is merged on top. The video file is checked once, and every
+    platform needs an entry in accounts.
+    
+    Args:
+        platforms: Target platforms
+        video_path: Path to video file
+        title: Video title (auto-generated if not provided)
+        tags: List of tags (auto-generated if not provided)
+        description: Video description
+        accounts: platform -> cookie file
+        publish_date: Schedule time or None for immediate
+        overrides: platform -> partial configuration, e.g. {"tiktok": {"video": {"title": "..."}}}
+        **kwargs: Additional platform-specific options (see generate_config)
+    
+    Returns:
+        List of configuration dictionaries, in platform order
+    
+    Raises:
+        FileNotFoundError: The video file does not exist
+        ValueError: A platform has no account
+    """
+    accounts = accounts or {}
+    overrides = overrides or {}
+    missing = [platform for platform in platforms if not accounts.get(platform)]
+    if missing:
+        raise ValueError(f"No account given for: {', '.join(missing)}")
+    if not video_path or not Path(video_path).exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    configs = []
+    for platform in platforms:
+        config = generate_config(
+            platform=platform,
+            video_path=video_path,
+            title=title,
+            tags=list(tags) if tags else None,
+            description=description,
+            account_file=accounts[platform],
+            publish_date=publish_date,
+            verify_video=False,
+            **kwargs
+        )
+        configs.append(merge_overrides(config, overrides.get(platform, {})))
+    return configs
+
+
+def parse_accounts(value, platforms):
+    """
+    Parse --account for fan-out mode
+    
+    Args:
+        value: "platform=path,platform=path"
+        platforms: Target platforms (each needs a cookie file)
+    
+    Returns:
+        Dictionary platform -> cookie file
+    """
+    accounts = {}
+    for pair in value.split(','):
+        platform, sep, path = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Fan-out mode expects --account platform=path pairs, got: {pair}")
+        accounts[platform.strip()] = path.strip()
+    missing = [platform for platform in platforms if platform not in accounts]
+    if missing:
+        raise ValueError(f"No account given for: {', '.join(missing)}")
+    return accounts
+
+
 def config_to_command(config: dict) -> str:
     """
     Convert configuration to command-line format
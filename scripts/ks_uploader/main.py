@@ -1,41 +1,44 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from playwright.async_api import Playwright, async_playwright
 import os
 import asyncio
 
-from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from utils.browser_factory import platform_context
+from utils.cookie_cache import check_cookie, record_verdict
 from utils.files_times import get_absolute_path
 from utils.log import kuaishou_logger
+from utils.platform_urls import platform_url
+from utils.retry import poll_until
+from utils.stage_timer import timed_upload
+from utils.upload_monitor import UploadMonitor
 
 
-async def cookie_auth(account_file):
-    async with async_playwright() as playwright:
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(headless=True, executable_path=LOCAL_CHROME_PATH)
-        else:
-            browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=account_file)
-        context = await set_init_script(context)
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://cp.kuaishou.com/article/publish/video")
-        try:
-            await page.wait_for_selector("div.names div.container div.name:text('机构服务')", timeout=5000)  # 等待5秒
+async def open_upload_page(context):
+    """打开上传页并校验登录态，cookie 有效时返回已加载的页面，失效时返回 None"""
+    # 创建一个新的页面
+    page = await context.new_page()
+    # 访问指定的 URL
+    await page.goto(platform_url('kuaishou', "/article/publish/video"))
+    try:
+        await page.wait_for_selector("div.names div.container div.name:text('机构服务')", timeout=5000)  # 等待5秒
 
-            kuaishou_logger.info("[+] 等待5秒 cookie 失效")
-            return False
-        except:
-            kuaishou_logger.success("[+] cookie 有效")
-            return True
+        kuaishou_logger.info("[+] 等待5秒 cookie 失效")
+        return None
+    except:
+        kuaishou_logger.success("[+] cookie 有效")
+        return page
 
 
-async def ks_setup(account_file, handle=False):
+async def cookie_auth(account_file):
+    async with platform_context('kuaishou', headless=True, stage='auth',
+                                storage_state=account_file) as context:
+        return await open_upload_page(context) is not None
+
+
+async def ks_setup(account_file, handle=False, revalidate=False):
     account_file = get_absolute_path(account_file, "ks_uploader")
-    if not os.path.exists(account_file) or not await cookie_auth(account_file):
+    if not os.path.exists(account_file) or not await check_cookie('kuaishou', account_file, cookie_auth, revalidate):
         if not handle:
             return False
         kuaishou_logger.info('[+] cookie文件不存在或已失效，即将自动打开浏览器，请扫码登录，登陆后会自动生成cookie文件')
@@ -44,23 +47,10 @@ async def ks_setup(account_file, handle=False):
 
 
 async def get_ks_cookie(account_file):
-    async with async_playwright() as playwright:
-        options = {
-            'args': [
-                '--lang en-GB'
-            ],
-            'headless': False,  # Set headless option here
-        }
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(executable_path=LOCAL_CHROME_PATH, **options)
-        else:
-            browser = await playwright.chromium.launch(**options)
-        # Setup context however you like.
-        context = await browser.new_context()  # Pass any options
-        context = await set_init_script(context)
+    async with platform_context('kuaishou', headless=False, stage='login') as context:
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://cp.kuaishou.com")
+        await page.goto(platform_url('kuaishou'))
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -74,38 +64,31 @@ class KSVideo(object):
         self.publish_date = publish_date
         self.account_file = account_file
         self.date_format = '%Y-%m-%d %H:%M'
-        self.local_executable_path = LOCAL_CHROME_PATH
+        self.upload_monitor = None
 
     async def handle_upload_error(self, page):
         kuaishou_logger.error("视频出错了，重新上传中")
+        if self.upload_monitor is not None:
+            self.upload_monitor.reset()
         await page.locator('div.progress-div [class^="upload-btn-input"]').set_input_files(self.file_path)
 
-    async def upload(self, playwright: Playwright) -> None:
-        # 使用 Chromium 浏览器启动一个浏览器实例
-        print(self.local_executable_path)
-        if self.local_executable_path:
-            browser = await playwright.chromium.launch(
-                headless=False,
-                executable_path=self.local_executable_path,
-            )
-        else:
-            browser = await playwright.chromium.launch(
-                headless=False
-            )  # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
-        context = await set_init_script(context)
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://cp.kuaishou.com/article/publish/video")
+    @timed_upload('kuaishou', kuaishou_logger)
+    async def upload_in_context(self, context, page=None) -> None:
+        self.stage_timer.stage('navigate')
+        if page is None:
+            # 创建一个新的页面
+            page = await context.new_page()
+            # 访问指定的 URL
+            await page.goto(platform_url('kuaishou', "/article/publish/video"))
         kuaishou_logger.info('正在上传-------{}.mp4'.format(self.title))
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
         kuaishou_logger.info('正在打开主页...')
-        await page.wait_for_url("https://cp.kuaishou.com/article/publish/video")
+        await page.wait_for_url(platform_url('kuaishou', "/article/publish/video"))
         # 点击 "上传视频" 按钮
         upload_button = page.locator("button[class^='_upload-btn']")
         await upload_button.wait_for(state='visible')  # 确保按钮可见
 
+        self.upload_monitor = UploadMonitor(page, 'kuaishou', self.file_path, logger=kuaishou_logger).start()
         async with page.expect_file_chooser() as fc_info:
             await upload_button.click()
         file_chooser = await fc_info.value
@@ -123,6 +106,7 @@ class KSVideo(object):
         if await new_feature_button.count() > 0:
             await new_feature_button.click()
 
+        self.stage_timer.stage('metadata')
         kuaishou_logger.info("正在填充标题和话题...")
         await page.get_by_text("描述").locator("xpath=following-sibling::div").click()
         kuaishou_logger.info("clear existing title")
@@ -139,67 +123,67 @@ class KSVideo(object):
             await page.keyboard.type(f"#{tag} ")
             await asyncio.sleep(2)
 
-        max_retries = 60  # 设置最大重试次数,最大等待时间为 2 分钟
-        retry_count = 0
-
-        while retry_count < max_retries:
-            try:
-                # 获取包含 '上传中' 文本的元素数量
-                number = await page.locator("text=上传中").count()
-
-                if number == 0:
-                    kuaishou_logger.success("视频上传完毕")
-                    break
-                else:
-                    if retry_count % 5 == 0:
-                        kuaishou_logger.info("正在上传视频中...")
-                    await asyncio.sleep(2)
-            except Exception as e:
-                kuaishou_logger.error(f"检查上传状态时发生错误: {e}")
-                await asyncio.sleep(2)  # 等待 2 秒后重试
-            retry_count += 1
-
-        if retry_count == max_retries:
-            kuaishou_logger.warning("超过最大重试次数，视频上传可能未完成。")
+        self.stage_timer.stage('file_transfer')
+
+        async def video_uploaded():
+            # 获取包含 '上传中' 文本的元素数量
+            if await page.locator("text=上传中").count():
+                return False
+            kuaishou_logger.success("视频上传完毕")
+            return True
+
+        await self.upload_monitor.wait_until_uploaded(video_uploaded, interval=2, max_interval=2,
+                                                      logger=kuaishou_logger)
 
         # 定时任务
         if self.publish_date != 0:
+            self.stage_timer.stage('scheduling')
             await self.set_schedule_time(page, self.publish_date)
 
         # 判断视频是否发布成功
-        while True:
-            try:
-                publish_button = page.get_by_text("发布", exact=True)
-                if await publish_button.count() > 0:
-                    await publish_button.click()
-
-                await asyncio.sleep(1)
-                confirm_button = page.get_by_text("确认发布")
-                if await confirm_button.count() > 0:
-                    await confirm_button.click()
-
-                # 等待页面跳转，确认发布成功
-                await page.wait_for_url(
-                    "https://cp.kuaishou.com/article/manage/video?status=2&from=publish",
-                    timeout=5000,
-                )
-                kuaishou_logger.success("视频发布成功")
-                break
-            except Exception as e:
-                kuaishou_logger.info(f"视频正在发布中... 错误: {e}")
-                await page.screenshot(full_page=True)
-                await asyncio.sleep(1)
+        self.stage_timer.stage('publish')
+
+        async def try_publish():
+            publish_button = page.get_by_text("发布", exact=True)
+            if await publish_button.count() > 0:
+                await publish_button.click()
+
+            await asyncio.sleep(1)
+            confirm_button = page.get_by_text("确认发布")
+            if await confirm_button.count() > 0:
+                await confirm_button.click()
+
+            # 等待页面跳转，确认发布成功
+            await page.wait_for_url(
+                platform_url('kuaishou', "/article/manage/video?status=2&from=publish"),
+                timeout=5000,
+            )
+            kuaishou_logger.success("视频发布成功")
+            return True
+
+        await poll_until(try_publish, 'publish', 'kuaishou', interval=1, max_interval=5, logger=kuaishou_logger)
+        self.stage_timer.stage('save_cookie')
 
         await context.storage_state(path=self.account_file)  # 保存cookie
+        record_verdict('kuaishou', self.account_file, True)
         kuaishou_logger.info('cookie更新完毕！')
         await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
-        # 关闭浏览器上下文和浏览器实例
-        await context.close()
-        await browser.close()
 
-    async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+    async def validate_and_upload(self, browser_pool=None) -> bool:
+        """校验 cookie 与上传共用同一个浏览器会话，cookie 失效时返回 False"""
+        async with platform_context('kuaishou', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            page = await open_upload_page(context)
+            record_verdict('kuaishou', self.account_file, page is not None)
+            if page is None:
+                return False
+            await self.upload_in_context(context, page=page)
+        return True
+
+    async def main(self, browser_pool=None):
+        async with platform_context('kuaishou', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            await self.upload_in_context(context)
 
     async def set_schedule_time(self, page, publish_date):
         kuaishou_logger.info("click schedule")
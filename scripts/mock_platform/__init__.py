@@ -0,0 +1,3 @@
+from mock_platform.server import MockPlatformServer, SUCCESS_PAGES, UPLOAD_PAGES
+
+__all__ = ['MockPlatformServer', 'SUCCESS_PAGES', 'UPLOAD_PAGES']
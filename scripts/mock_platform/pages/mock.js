@@ -0,0 +1,65 @@
+// Helpers shared by the mock creator pages (mock_platform/server.py)
+(function () {
+  const CHUNK_SIZE = 1024 * 1024;
+
+  async function post(url, body) {
+    const response = await fetch(url, {method: 'POST', body: body});
+    if (!response.ok) {
+      throw new Error(url + ': HTTP ' + response.status);
+    }
+    return response.json();
+  }
+
+  // Upload a file in 1MB slices to chunkUrl(partNumber), then POST completeUrl.
+  // The URLs carry the fragments utils/upload_monitor.py matches for the platform.
+  window.mockUpload = function (file, options) {
+    const parts = Math.max(1, Math.ceil(file.size / CHUNK_SIZE));
+    const state = {cancelled: false};
+    (async () => {
+      for (let part = 1; part <= parts; part++) {
+        const blob = file.slice((part - 1) * CHUNK_SIZE, Math.min(file.size, part * CHUNK_SIZE));
+        for (let attempt = 1; ; attempt++) {
+          try {
+            await post(options.chunkUrl(part), blob);
+            break;
+          } catch (error) {
+            // pages without an error state retry the chunk, like the platforms' upload SDKs
+            if (!options.retryChunks || attempt >= 3) {
+              throw error;
+            }
+          }
+        }
+        if (state.cancelled) {
+          return;
+        }
+        options.onProgress(part / parts);
+      }
+      await post(options.completeUrl, JSON.stringify({name: file.name, size: file.size, parts: parts}));
+      if (!state.cancelled) {
+        options.onDone();
+      }
+    })().catch((error) => {
+      if (!state.cancelled) {
+        options.onError(error);
+      }
+    });
+    return {cancel: () => { state.cancelled = true; }};
+  };
+
+  // Record the publish on the server and leave for the platform's success page
+  window.mockPublish = async function (platform, successUrl) {
+    const result = await post('/mock-api/' + platform + '/publish', '{}');
+    document.cookie = 'mock_video_id=' + result.video_id + '; path=/';
+    window.location.href = successUrl;
+  };
+
+  window.mockElement = function (html) {
+    const template = document.createElement('template');
+    template.innerHTML = html.trim();
+    return template.content.firstElementChild;
+  };
+
+  window.mockPercent = function (fraction) {
+    return Math.round(fraction * 100) + '%';
+  };
+})();
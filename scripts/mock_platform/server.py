@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the creator platforms
+
+Serves imitations of the Douyin, Kuaishou, Tencent Channels, TikTok Studio
+and Xiaohongshu upload pages at the same paths as the real sites, so the
+uploaders run their normal flow against it once UPLOADER_BASE_URL points here
+(utils/platform_urls). The pages keep only what the uploaders touch: file
+input, chunked upload with progress (to URLs that utils/upload_monitor
+recognizes), "重新上传", error state, cover/declaration dialogs, publish button
+and the redirect to a success page.
+
+The server can slow chunk uploads down to a given throughput, add latency to
+every API call and fail a fraction of the chunks, and it counts what it
+received (GET /mock-api/stats).
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+PAGES_DIR = Path(__file__).parent / "pages"
+
+# Upload page paths -> page, as on the real sites (the paths do not collide, so one origin serves all platforms)
+UPLOAD_PAGES = {
+    '/creator-micro/content/upload': 'douyin.html',
+    '/creator-micro/content/publish': 'douyin.html',
+    '/creator-micro/content/post/video': 'douyin.html',
+    '/article/publish/video': 'kuaishou.html',
+    '/platform/post/create': 'tencent.html',
+    '/tiktokstudio/upload': 'tiktok.html',
+    '/creator-center/upload': 'tiktok.html',
+    '/upload': 'tiktok.html',
+    '/publish/publish': 'xhs.html',
+}
+
+# Pages the platforms redirect to after publishing
+SUCCESS_PAGES = {
+    '/creator-micro/content/manage': 'douyin',
+    '/article/manage/video': 'kuaishou',
+    '/platform/post/list': 'tencent',
+    '/tiktokstudio/content': 'tiktok',
+    '/publish/success': 'xhs',
+}
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+}
+
+FIRST_VIDEO_ID = 7300000000000000000
+
+
+class MockPlatformServer:
+    """
+    Threaded HTTP server with the mock upload pages
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        throughput_mbps: Simulated upload bandwidth per chunk request in MB/s (0: unlimited)
+        latency_ms: Delay added to every API request
+        failure_rate: Fraction of chunk requests answered with HTTP 500
+        verbose: Log every request
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, throughput_mbps: float = 0,
+                 latency_ms: float = 0, failure_rate: float = 0.0, verbose: bool = False):
+        self.throughput_mbps = throughput_mbps
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._next_video_id = FIRST_VIDEO_ID
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-platform-server', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def count(self, platform: str, **increments) -> Dict[str, int]:
+        with self._lock:
+            stats = self._stats.setdefault(platform, {
+                'chunks': 0, 'bytes': 0, 'failed_chunks': 0, 'completed_uploads': 0, 'published': 0,
+            })
+            for name, value in increments.items():
+                stats[name] += value
+            return dict(stats)
+
+    def new_video_id(self) -> int:
+        with self._lock:
+            self._next_video_id += 1
+            return self._next_video_id
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-platform counts of received chunks, bytes, completed uploads and publishes"""
+        with self._lock:
+            return {platform: dict(stats) for platform, stats in self._stats.items()}
+
+
+def _make_handler(server: MockPlatformServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            if server.verbose:
+                super().log_message(format, *args)
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, payload, status: int = 200):
+            self._send(status, json.dumps(payload).encode('utf-8'))
+
+        def _send_page(self, name: str, **values):
+            path = PAGES_DIR / name
+            body = path.read_text(encoding='utf-8')
+            for key, value in values.items():
+                body = body.replace('{{' + key + '}}', str(value))
+            self._send(200, body.encode('utf-8'), CONTENT_TYPES[path.suffix])
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path in UPLOAD_PAGES:
+                self._send_page(UPLOAD_PAGES[path])
+            elif path in SUCCESS_PAGES:
+                cookie = SimpleCookie(self.headers.get('Cookie', ''))
+                video_id = cookie['mock_video_id'].value if 'mock_video_id' in cookie else FIRST_VIDEO_ID
+                self._send_page('success.html', platform=SUCCESS_PAGES[path], video_id=video_id)
+            elif path.startswith('/mock-static/') and (PAGES_DIR / Path(path).name).suffix in ('.js', '.css'):
+                self._send_page(Path(path).name)
+            elif path == '/mock-api/stats':
+                self._send_json(server.stats())
+            elif path in ('/', '/login'):
+                self._send_page('index.html')
+            else:
+                self._send(404, b'not found', 'text/plain')
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            url = urlsplit(self.path)
+            match = re.match(r'^/mock-api/(\w+)/(.+)$', url.path)
+            if not match:
+                self._send(404, b'not found', 'text/plain')
+                return
+            platform, endpoint = match.groups()
+            if server.latency_ms:
+                time.sleep(server.latency_ms / 1000)
+
+            if endpoint == 'publish':
+                server.count(platform, published=1)
+                self._send_json({'video_id': server.new_video_id()})
+            elif 'complete' in endpoint or 'phase=finish' in url.query:
+                server.count(platform, completed_uploads=1)
+                self._send_json({'code': 0})
+            else:
+                if server.throughput_mbps:
+                    time.sleep(len(body) / (server.throughput_mbps * 1048576))
+                if random.random() < server.failure_rate:
+                    server.count(platform, failed_chunks=1)
+                    self._send_json({'code': 500, 'message': 'mock chunk failure'}, status=500)
+                    return
+                server.count(platform, chunks=1, bytes=len(body))
+                self._send_json({'code': 0})
+
+    return Handler
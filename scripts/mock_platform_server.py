@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local mock creator-platform server
+Serves stand-ins of the Douyin, Kuaishou, Tencent Channels, TikTok Studio and
+Xiaohongshu upload pages; point the uploaders at it with
+UPLOADER_BASE_URL=http://127.0.0.1:<port>
+"""
+import argparse
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from mock_platform import MockPlatformServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve mock creator-platform upload pages')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--throughput', type=float, default=0,
+                        help='Simulated upload bandwidth per chunk request in MB/s (default: unlimited)')
+    parser.add_argument('--latency', type=float, default=0, help='Delay added to every API request in ms')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='Fraction of chunk requests that fail with HTTP 500 (default: 0)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    server = MockPlatformServer(args.host, args.port, throughput_mbps=args.throughput,
+                                latency_ms=args.latency, failure_rate=args.failure_rate, verbose=args.verbose)
+    print(f"🧪 Mock creator platforms on {server.url}")
+    print(f"   export UPLOADER_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        print(f"📊 {server.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Selector health report
+Reads the hit statistics collected by utils/selector_registry and shows, per
+platform element, which fallback selectors still match and which are dead
+(checked in enough lookups and never matched)
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.selector_registry import selector_report
+
+
+def format_age(timestamp: float) -> str:
+    """Human-readable time since a last win"""
+    if not timestamp:
+        return '-'
+    hours = (time.time() - timestamp) / 3600
+    return f"{hours:.1f}h ago" if hours < 48 else f"{hours / 24:.0f}d ago"
+
+
+def print_report(rows: list, dead_only: bool = False):
+    """Print the report grouped by element"""
+    icons = {'ok': '✅', 'dead': '❌', 'unused': '⚪'}
+    current_key = None
+    for row in rows:
+        if dead_only and row['status'] != 'dead':
+            continue
+        if row['key'] != current_key:
+            current_key = row['key']
+            print(f"\n📍 {current_key} ({row['lookups']} lookups, {row['misses']} misses)")
+        print(f"  {icons[row['status']]} {row['wins']:>5} wins {row['hit_rate']:>6.0%}  "
+              f"{row['matches']:>5}/{row['checks']:<5} matched  {format_age(row['last_win']):>10}  {row['selector']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show which registered selectors still match')
+    parser.add_argument('--platform', action='append',
+                        help='Only report this platform (repeatable)')
+    parser.add_argument('--min-lookups', type=int, default=5,
+                        help='Lookups a selector must be checked in before it is reported as dead '
+                             'when it never matched (default: 5)')
+    parser.add_argument('--dead', action='store_true', help='Only list dead selectors')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    rows = selector_report(min_lookups=args.min_lookups)
+    if args.platform:
+        rows = [row for row in rows if row['key'].split('.', 1)[0] in args.platform]
+
+    if args.json:
+        if args.dead:
+            rows = [row for row in rows if row['status'] == 'dead']
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+
+    print_report(rows, dead_only=args.dead)
+    dead = sum(1 for row in rows if row['status'] == 'dead')
+    print(f"\n{'❌' if dead else '✅'} {dead} dead selector(s) of {len(rows)}")
+    sys.exit(1 if dead else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from playwright.async_api import Playwright, async_playwright
 import os
 import asyncio
 
-from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from utils.browser_factory import platform_context
+from utils.cookie_cache import check_cookie, record_verdict
 from utils.files_times import get_absolute_path
 from utils.log import tencent_logger
+from utils.platform_urls import platform_url
+from utils.retry import PlatformRejectedError, poll_until
+from utils.stage_timer import timed_upload
+from utils.upload_monitor import UploadMonitor
 
 
 def format_str_for_short_title(origin_title: str) -> str:
@@ -31,58 +34,45 @@ def format_str_for_short_title(origin_title: str) -> str:
     return formatted_string
 
 
+async def open_upload_page(context):
+    """打开发表页并校验登录态，cookie 有效时返回已加载的页面，失效时返回 None"""
+    # 创建一个新的页面
+    page = await context.new_page()
+    # 访问指定的 URL
+    await page.goto(platform_url('tencent', "/platform/post/create"))
+    try:
+        await page.wait_for_selector('div.title-name:has-text("微信小店")', timeout=5000)  # 等待5秒
+        tencent_logger.error("[+] 等待5秒 cookie 失效")
+        return None
+    except:
+        tencent_logger.success("[+] cookie 有效")
+        return page
+
+
 async def cookie_auth(account_file):
-    async with async_playwright() as playwright:
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(headless=True, executable_path=LOCAL_CHROME_PATH)
-        else:
-            browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=account_file)
-        context = await set_init_script(context)
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://channels.weixin.qq.com/platform/post/create")
-        try:
-            await page.wait_for_selector('div.title-name:has-text("微信小店")', timeout=5000)  # 等待5秒
-            tencent_logger.error("[+] 等待5秒 cookie 失效")
-            return False
-        except:
-            tencent_logger.success("[+] cookie 有效")
-            return True
+    async with platform_context('tencent', headless=True, stage='auth',
+                                storage_state=account_file) as context:
+        return await open_upload_page(context) is not None
 
 
 async def get_tencent_cookie(account_file):
-    async with async_playwright() as playwright:
-        options = {
-            'args': [
-                '--lang en-GB'
-            ],
-            'headless': False,  # Set headless option here
-        }
-        if LOCAL_CHROME_PATH:
-            browser = await playwright.chromium.launch(executable_path=LOCAL_CHROME_PATH, **options)
-        else:
-            browser = await playwright.chromium.launch(**options)
-        # Setup context however you like.
-        context = await browser.new_context()  # Pass any options
+    async with platform_context('tencent', headless=False, stage='login') as context:
         # Pause the page, and start recording manually.
-        context = await set_init_script(context)
         page = await context.new_page()
-        await page.goto("https://channels.weixin.qq.com")
+        await page.goto(platform_url('tencent'))
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
 
 
-async def weixin_setup(account_file, handle=False):
+async def weixin_setup(account_file, handle=False, revalidate=False):
     # If account_file is an absolute path or contains /, use as-is
     if os.path.isabs(account_file) or "/" in account_file:
         account_path = account_file
     else:
         account_path = get_absolute_path(account_file, "tencent_uploader")
     
-    if not os.path.exists(account_path) or not await cookie_auth(account_path):
+    if not os.path.exists(account_path) or not await check_cookie('tencent', account_path, cookie_auth, revalidate):
         if not handle:
             # Todo alert message
             return False
@@ -99,7 +89,8 @@ class TencentVideo(object):
         self.publish_date = publish_date
         self.account_file = account_file
         self.category = category
-        self.local_executable_path = LOCAL_CHROME_PATH
+        self.upload_monitor = None
+        self.publish_turn = None  # 流水线模式下由 utils/upload_pipeline 设置
 
     async def set_schedule_time_tencent(self, page, publish_date):
         label_element = page.locator("label").filter(has_text="定时").nth(1)
@@ -138,29 +129,34 @@ class TencentVideo(object):
 
     async def handle_upload_error(self, page):
         tencent_logger.info("视频出错了，重新上传中")
+        if self.upload_monitor is not None:
+            self.upload_monitor.reset()
         await page.locator('div.media-status-content div.tag-inner:has-text("删除")').click()
         await page.get_by_role('button', name="删除", exact=True).click()
         file_input = page.locator('input[type="file"]')
         await file_input.set_input_files(self.file_path)
 
-    async def upload(self, playwright: Playwright) -> None:
-        # 使用 Chromium (这里使用系统内浏览器，用chromium 会造成h264错误
-        browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
-        # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
-        context = await set_init_script(context)
-
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://channels.weixin.qq.com/platform/post/create")
+    @timed_upload('tencent', tencent_logger)
+    async def upload_in_context(self, context, page=None) -> None:
+        self.stage_timer.stage('navigate')
+        if page is None:
+            # 创建一个新的页面
+            page = await context.new_page()
+            # 访问指定的 URL
+            await page.goto(platform_url('tencent', "/platform/post/create"))
         tencent_logger.info(f'[+]正在上传-------{self.title}.mp4')
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
-        await page.wait_for_url("https://channels.weixin.qq.com/platform/post/create")
+        await page.wait_for_url(platform_url('tencent', "/platform/post/create"))
         # await page.wait_for_selector('input[type="file"]', timeout=10000)
+        self.upload_monitor = UploadMonitor(page, 'tencent', self.file_path, logger=tencent_logger).start()
         file_input = page.locator('input[type="file"]')
         await file_input.set_input_files(self.file_path)
+        if self.publish_turn is not None:
+            # 流水线模式：视频已在后台上传，等前面的视频发布完再操作页面
+            self.stage_timer.stage('pipeline_wait')
+            await self.publish_turn(page)
         # 填充标题和话题
+        self.stage_timer.stage('metadata')
         await self.add_title_tags(page)
         # 添加商品
         # await self.add_product(page)
@@ -169,20 +165,25 @@ class TencentVideo(object):
         # 原创选择
         await self.add_original(page)
         # 检测上传状态
+        self.stage_timer.stage('file_transfer')
         await self.detect_upload_status(page)
         if self.publish_date != 0:
+            self.stage_timer.stage('scheduling')
             await self.set_schedule_time_tencent(page, self.publish_date)
         # 添加短标题
+        self.stage_timer.stage('publish')
         await self.add_short_title(page)
 
         await self.click_publish(page)
+        if self.publish_turn is not None:
+            # 流水线模式：同一上下文的多个标签页共用 cookie 文件，整组结束后统一保存
+            return
+        self.stage_timer.stage('save_cookie')
 
         await context.storage_state(path=f"{self.account_file}")  # 保存cookie
+        record_verdict('tencent', self.account_file, True)
         tencent_logger.success('  [-]cookie更新完毕！')
         await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
-        # 关闭浏览器上下文和浏览器实例
-        await context.close()
-        await browser.close()
 
     async def add_short_title(self, page):
         short_title_element = page.get_by_text("短标题", exact=True).locator("..").locator(
@@ -193,44 +194,44 @@ class TencentVideo(object):
             await short_title_element.fill(short_title)
 
     async def click_publish(self, page):
-        while True:
-            try:
-                publish_buttion = page.locator('div.form-btns button:has-text("发表")')
-                if await publish_buttion.count():
-                    await publish_buttion.click()
-                await page.wait_for_url("https://channels.weixin.qq.com/platform/post/list", timeout=5000)
+        async def try_publish():
+            if platform_url('tencent', "/platform/post/list") in page.url:
                 tencent_logger.success("  [-]视频发布成功")
-                break
-            except Exception as e:
-                current_url = page.url
-                if "https://channels.weixin.qq.com/platform/post/list" in current_url:
-                    tencent_logger.success("  [-]视频发布成功")
-                    break
-                else:
-                    tencent_logger.exception(f"  [-] Exception: {e}")
-                    tencent_logger.info("  [-] 视频正在发布中...")
-                    await asyncio.sleep(0.5)
+                return True
+            publish_buttion = page.locator('div.form-btns button:has-text("发表")')
+            if await publish_buttion.count():
+                await publish_buttion.click()
+            await page.wait_for_url(platform_url('tencent', "/platform/post/list"), timeout=5000)
+            tencent_logger.success("  [-]视频发布成功")
+            return True
+
+        await poll_until(try_publish, 'publish', 'tencent', interval=0.5, max_interval=5, logger=tencent_logger)
 
     async def detect_upload_status(self, page):
-        while True:
-            # 匹配删除按钮，代表视频上传完毕，如果不存在，代表视频正在上传，则等待
-            try:
-                # 匹配删除按钮，代表视频上传完毕
-                if "weui-desktop-btn_disabled" not in await page.get_by_role("button", name="发表").get_attribute(
-                        'class'):
-                    tencent_logger.info("  [-]视频上传完毕")
-                    break
-                else:
-                    tencent_logger.info("  [-] 正在上传视频中...")
-                    await asyncio.sleep(2)
-                    # 出错了视频出错
-                    if await page.locator('div.status-msg.error').count() and await page.locator(
-                            'div.media-status-content div.tag-inner:has-text("删除")').count():
-                        tencent_logger.error("  [-] 发现上传出错了...准备重试")
-                        await self.handle_upload_error(page)
-            except:
-                tencent_logger.info("  [-] 正在上传视频中...")
-                await asyncio.sleep(2)
+        upload_errors = 0
+
+        async def video_uploaded():
+            nonlocal upload_errors
+            # 发表按钮可点击，代表视频上传完毕，否则代表视频正在上传，则等待
+            if "weui-desktop-btn_disabled" not in await page.get_by_role("button", name="发表").get_attribute(
+                    'class'):
+                tencent_logger.info("  [-]视频上传完毕")
+                return True
+            tencent_logger.info("  [-] 正在上传视频中...")
+            # 出错了视频出错
+            if await page.locator('div.status-msg.error').count() and await page.locator(
+                    'div.media-status-content div.tag-inner:has-text("删除")').count():
+                upload_errors += 1
+                if upload_errors > 3:
+                    raise PlatformRejectedError("视频多次上传失败")
+                tencent_logger.error("  [-] 发现上传出错了...准备重试")
+                await self.handle_upload_error(page)
+            return False
+
+        if self.upload_monitor is None:
+            await poll_until(video_uploaded, 'video_upload', 'tencent', interval=2, max_interval=2)
+        else:
+            await self.upload_monitor.wait_until_uploaded(video_uploaded, interval=2, max_interval=2)
 
     async def add_title_tags(self, page):
         await page.locator("div.input-editor").click()
@@ -272,6 +273,18 @@ class TencentVideo(object):
             if await page.locator('button:has-text("声明原创"):visible').count():
                 await page.locator('button:has-text("声明原创"):visible').click()
 
-    async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+    async def validate_and_upload(self, browser_pool=None) -> bool:
+        """校验 cookie 与上传共用同一个浏览器会话，cookie 失效时返回 False"""
+        async with platform_context('tencent', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            page = await open_upload_page(context)
+            record_verdict('tencent', self.account_file, page is not None)
+            if page is None:
+                return False
+            await self.upload_in_context(context, page=page)
+        return True
+
+    async def main(self, browser_pool=None):
+        async with platform_context('tencent', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            await self.upload_in_context(context)
@@ -15,6 +15,7 @@ from utils.browser_config import (
     get_platform_specific_config,
     setup_browser_context
 )
+from utils.platform_urls import platform_url
 
 
 async def test_platform_page(platform: str):
@@ -24,13 +25,13 @@ async def test_platform_page(platform: str):
     Args:
         platform: Platform name (douyin, kuaishou, tiktok, tencent, xhs)
     """
-    # Platform URLs
+    # Platform URLs (UPLOADER_BASE_URL points them at mock_platform_server.py)
     urls = {
-        'douyin': 'https://creator.douyin.com/creator-micro/content/upload',
-        'kuaishou': 'https://cp.kuaishou.com/article/publish/video',
-        'tiktok': 'https://www.tiktok.com/tiktokstudio/upload',
-        'tencent': 'https://channels.weixin.qq.com/platform/post/create',
-        'xhs': 'https://creator.xiaohongshu.com/publish/publish',
+        'douyin': platform_url('douyin', '/creator-micro/content/upload'),
+        'kuaishou': platform_url('kuaishou', '/article/publish/video'),
+        'tiktok': platform_url('tiktok', '/tiktokstudio/upload'),
+        'tencent': platform_url('tencent', '/platform/post/create'),
+        'xhs': platform_url('xhs', '/publish/publish'),
     }
     
     if platform not in urls:
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures: scripts/ on the import path, and on-disk state redirected to tmp_path
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# the uploader packages create their cookie subdirectories on import
+(SCRIPTS_DIR / 'cookies').mkdir(exist_ok=True)
+
+
+@pytest.fixture
+def rate_limits(tmp_path, monkeypatch):
+    """
+    Rate-limit state in tmp_path; returns a function setting the policies
+
+    policies(platform={'account': (capacity, period)}, ...) replaces conf.UPLOAD_RATE_LIMITS.
+    """
+    from utils import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, 'STATE_FILE', tmp_path / 'rate_limits.json')
+    monkeypatch.setattr(rate_limiter, 'LOCK_FILE', tmp_path / 'rate_limits.lock')
+    monkeypatch.setattr(rate_limiter, 'ACCOUNT_RATE_LIMITS', {})
+    monkeypatch.setattr(rate_limiter, 'UPLOAD_RATE_LIMITS', {})
+
+    def policies(**limits):
+        monkeypatch.setattr(rate_limiter, 'UPLOAD_RATE_LIMITS', limits)
+
+    return policies
+
+
+@pytest.fixture
+def selector_stats(tmp_path, monkeypatch):
+    """Selector statistics in tmp_path, starting empty; returns the registry module"""
+    from utils import selector_registry
+
+    monkeypatch.setattr(selector_registry, 'SELECTOR_STATS_PATH', tmp_path / 'selector_stats.json')
+    monkeypatch.setattr(selector_registry, '_pending', {})
+    monkeypatch.setattr(selector_registry, '_last_win', {})
+    monkeypatch.setattr(selector_registry, '_loaded', None)
+    return selector_registry
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+batch_upload: every upload draws from the posting budgets
+"""
+import asyncio
+
+import upload_from_config
+from utils import rate_limiter
+
+
+def make_config(title, account='cookies/douyin_a.json'):
+    return {'platform': 'douyin', 'account': {'cookie_file': account}, 'video': {'path': '/tmp/x.mp4', 'title': title}}
+
+
+def test_non_pipelined_batch_uses_up_the_account_bucket(rate_limits, monkeypatch):
+    rate_limits(douyin={'account': (2, 3600)})
+    uploaded = []
+
+    async def fake_upload(config, browser_pool=None, revalidate=False, details=None):
+        uploaded.append(config['video']['title'])
+        return True
+
+    monkeypatch.setattr(upload_from_config, 'upload_from_config', fake_upload)
+    results = asyncio.run(upload_from_config.batch_upload([make_config('a'), make_config('b')],
+                                                          browser_pool=object(), concurrency=2))
+    assert results['success'] == 2 and uploaded == ['a', 'b']
+    # both tokens are gone: a third post for the account has to wait
+    assert rate_limiter.try_acquire('douyin', 'cookies/douyin_a.json') > 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/douyin_b.json') == 0
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+JobStore: resume, claim, lease and requeue semantics on a temporary database
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.job_store import (FAILED, PENDING, QUEUE_SOURCE_PREFIX, RUNNING, SUCCEEDED,  # noqa: E402
+                             JobStore)
+
+
+def make_config(platform='douyin', account='cookies/a.json', title='video'):
+    return {'platform': platform, 'account': {'cookie_file': account}, 'video': {'title': title}}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+@pytest.fixture
+def store(db_path):
+    with JobStore(db_path) as job_store:
+        yield job_store
+
+
+def states(store, batch_id):
+    return {job['idx']: job['state'] for job in store.jobs(batch_id)}
+
+
+def queue(store, configs):
+    return store.create_batch(configs, source=QUEUE_SOURCE_PREFIX + 'test')
+
+
+class TestResume:
+
+    def test_new_batch_is_all_pending(self, store):
+        configs = [make_config(title='a'), make_config(title='b')]
+        batch_id = store.create_batch(configs)
+        assert store.find_batch(configs) == batch_id
+        assert store.runnable_jobs(batch_id) == list(enumerate(configs, 1))
+
+    def test_resume_skips_succeeded_and_failed(self, store):
+        batch_id = store.create_batch([make_config(title=str(i)) for i in range(3)])
+        store.mark_running(batch_id, 1)
+        store.mark_succeeded(batch_id, 1)
+        store.mark_running(batch_id, 2)
+        store.mark_failed(batch_id, 2, '[timeout] publish: no confirmation')
+        assert [idx for idx, _ in store.runnable_jobs(batch_id)] == [3]
+
+    def test_requeue_stale_returns_running_jobs(self, store):
+        batch_id = store.create_batch([make_config(), make_config(title='b')])
+        store.mark_running(batch_id, 1)
+        assert store.requeue_stale(batch_id) == 1
+        assert states(store, batch_id) == {1: PENDING, 2: PENDING}
+        assert [idx for idx, _ in store.runnable_jobs(batch_id)] == [1, 2]
+
+    def test_retry_failed_is_bounded_by_attempts(self, store):
+        batch_id = store.create_batch([make_config(title='a'), make_config(title='b')])
+        store.mark_running(batch_id, 1)
+        store.mark_failed(batch_id, 1, 'once')
+        for _ in range(3):
+            store.mark_running(batch_id, 2)
+            store.mark_failed(batch_id, 2, 'again')
+        assert store.runnable_jobs(batch_id, retry_failed=True, max_attempts=3) == [(1, make_config(title='a'))]
+        assert store.runnable_jobs(batch_id, retry_failed=True, max_attempts=4) == \
+            [(1, make_config(title='a')), (2, make_config(title='b'))]
+
+    def test_file_jobs_append_and_mark_seen(self, store):
+        batch_id = store.create_batch([], source='watch:/inbox')
+        assert store.latest_batch('watch:/inbox') == batch_id
+        assert store.add_file_jobs(batch_id, '/inbox/a.mp4', 1, 1.0, [make_config(), make_config('tiktok')]) == [1, 2]
+        assert store.add_file_jobs(batch_id, '/inbox/b.mp4', 1, 1.0, [make_config()]) == [3]
+        assert store.seen_paths() == {'/inbox/a.mp4', '/inbox/b.mp4'}
+
+
+class TestClaims:
+
+    def test_only_queued_batches_are_claimed(self, store):
+        store.create_batch([make_config()])
+        assert store.claim_job('w1', 60) is None
+        batch_id = queue(store, [make_config()])
+        job = store.claim_job('w1', 60)
+        assert (job.batch_id, job.idx, job.attempts) == (batch_id, 1, 1)
+        assert states(store, batch_id) == {1: RUNNING}
+
+    def test_account_is_leased_to_one_worker(self, store):
+        queue(store, [make_config(account='a'), make_config(account='a'), make_config(account='b')])
+        first = store.claim_job('w1', 60)
+        second = store.claim_job('w2', 60)
+        assert (first.idx, second.idx) == (1, 3)
+        assert store.claim_job('w2', 60) is None
+
+    def test_account_is_leased_however_its_path_is_spelled(self, store):
+        queue(store, [make_config(account='cookies/a.json'), make_config(account=os.path.abspath('cookies/a.json')),
+                      make_config(account='./cookies/../cookies/a.json')])
+        assert store.claim_job('w1', 60).idx == 1
+        assert store.claim_job('w2', 60) is None
+
+    def test_worker_does_not_stack_jobs_of_a_running_account(self, store):
+        queue(store, [make_config(account='a'), make_config(account='a'), make_config(account='b')])
+        assert store.claim_job('w1', 60).idx == 1
+        assert store.claim_job('w1', 60).idx == 3
+        assert store.claim_job('w1', 60) is None
+
+    def test_finish_releases_the_account(self, store):
+        batch_id = queue(store, [make_config(account='a'), make_config(account='a')])
+        job = store.claim_job('w1', 60)
+        assert store.finish_claim(job, 'w1', video_id='123')
+        assert store.claim_job('w2', 60).idx == 2
+        assert states(store, batch_id) == {1: SUCCEEDED, 2: RUNNING}
+
+    def test_expired_lease_is_reclaimed_and_old_owner_loses_it(self, store):
+        batch_id = queue(store, [make_config()])
+        job = store.claim_job('w1', 0.01)
+        time.sleep(0.05)
+        again = store.claim_job('w2', 60)
+        assert (again.idx, again.attempts) == (1, 2)
+        assert store.heartbeat('w1', 60) == set()
+        assert not store.finish_claim(job, 'w1', error='late')
+        assert store.finish_claim(again, 'w2')
+        assert states(store, batch_id) == {1: SUCCEEDED}
+
+    def test_heartbeat_extends_and_reports_held_jobs(self, store):
+        batch_id = queue(store, [make_config(account='a'), make_config(account='b')])
+        store.claim_job('w1', 0.05)
+        store.claim_job('w1', 0.05)
+        assert store.heartbeat('w1', 60) == {(batch_id, 1), (batch_id, 2)}
+        time.sleep(0.1)
+        assert store.claim_job('w2', 60) is None
+
+    def test_heartbeat_drops_job_whose_account_was_taken(self, store):
+        batch_id = queue(store, [make_config(account='a'), make_config(account='a')])
+        store.claim_job('w1', 60)
+        # the account lease runs out (e.g. the worker stalled) and another worker takes the account
+        store.conn.execute("UPDATE account_leases SET expires = 0 WHERE owner = 'w1'")
+        assert store.claim_job('w2', 60).idx == 2
+        assert store.heartbeat('w1', 60) == set()
+        assert store.heartbeat('w2', 60) == {(batch_id, 2)}
+
+    def test_expired_job_fails_after_max_attempts(self, store):
+        batch_id = queue(store, [make_config()])
+        store.claim_job('w1', 0.01, max_attempts=2)
+        time.sleep(0.05)
+        store.claim_job('w2', 0.01, max_attempts=2)
+        time.sleep(0.05)
+        assert store.claim_job('w3', 60, max_attempts=2) is None
+        job = store.jobs(batch_id)[0]
+        assert (job['state'], job['attempts']) == (FAILED, 2)
+
+    def test_requeue_stale_keeps_live_leases(self, store):
+        batch_id = queue(store, [make_config()])
+        store.claim_job('w1', 60)
+        assert store.requeue_stale(batch_id) == 0
+        assert states(store, batch_id) == {1: RUNNING}
+
+    def test_release_leases_returns_jobs_to_queue(self, store):
+        batch_id = queue(store, [make_config()])
+        store.claim_job('w1', 60)
+        assert store.release_leases('w1') == 1
+        assert states(store, batch_id) == {1: PENDING}
+        assert store.claim_job('w2', 60).attempts == 2
+
+    def test_two_connections_share_the_store(self, db_path):
+        with JobStore(db_path) as one, JobStore(db_path) as two:
+            queue(one, [make_config(account='a'), make_config(account='a')])
+            assert one.claim_job('w1', 60).idx == 1
+            assert two.claim_job('w2', 60) is None
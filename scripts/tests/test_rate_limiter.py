@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Token buckets: capacity, refill, shared platform budgets and account overrides
+"""
+import asyncio
+import os
+
+import pytest
+
+from utils import rate_limiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.time for the limiter; advance with clock.now += seconds"""
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(rate_limiter.time, 'time', lambda: Clock.now)
+    return Clock
+
+
+def test_no_policy_never_waits(rate_limits):
+    for _ in range(10):
+        assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+
+
+def test_account_bucket_empties_and_refills(rate_limits, clock):
+    rate_limits(douyin={'account': (2, 3600)})
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == pytest.approx(1800)
+    assert rate_limiter.try_acquire('douyin', 'cookies/b.json') == 0
+    clock.now += 1800
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') > 0
+
+
+def test_account_is_keyed_by_absolute_path(rate_limits, clock):
+    rate_limits(douyin={'account': (1, 3600)})
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', os.path.abspath('cookies/a.json')) > 0
+
+
+def test_empty_platform_bucket_takes_no_account_token(rate_limits, clock):
+    rate_limits(douyin={'account': (2, 3600), 'platform': (1, 60)})
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/b.json') == pytest.approx(60)
+    clock.now += 60
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    # the refused attempt did not spend a's second token
+    clock.now += 60
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == pytest.approx(1800 - 120)
+
+
+def test_account_override_replaces_the_platform_default(rate_limits, monkeypatch):
+    rate_limits(douyin={'account': (5, 3600)})
+    monkeypatch.setattr(rate_limiter, 'ACCOUNT_RATE_LIMITS', {os.path.abspath('cookies/a.json'): (1, 3600)})
+    assert rate_limiter.get_policies('douyin', 'cookies/a.json') == \
+        [(f"account:douyin:{os.path.abspath('cookies/a.json')}", 1, 3600)]
+    assert rate_limiter.get_policies('douyin', 'cookies/b.json')[0][1:] == (5, 3600)
+
+
+def test_acquire_waits_for_the_refill(rate_limits, clock, monkeypatch):
+    rate_limits(douyin={'account': (1, 100)})
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, 'sleep', fake_sleep)
+    asyncio.run(rate_limiter.acquire('douyin', 'cookies/a.json'))
+    asyncio.run(rate_limiter.acquire('douyin', 'cookies/a.json'))
+    assert slept == [pytest.approx(100)]
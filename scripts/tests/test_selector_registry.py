@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Selector registry: per-candidate match counts, the dead-selector report and the concurrent locator
+"""
+import asyncio
+
+from playwright.async_api import Error as PlaywrightError
+
+from utils.locators import locate_first_visible
+
+
+class FakeLocator:
+
+    def __init__(self, visible, delay):
+        self.visible = visible
+        self.delay = delay
+        self.first = self
+
+    async def wait_for(self, state, timeout):
+        await asyncio.sleep(self.delay if self.visible else timeout / 1000)
+        if not self.visible:
+            raise PlaywrightError('Timeout')
+
+    async def is_visible(self):
+        return self.visible
+
+
+class FakePage:
+    """selector -> (visible, seconds until it shows up)"""
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def locator(self, selector):
+        return FakeLocator(*self.elements.get(selector, (False, 0)))
+
+
+def report(registry, key, min_lookups=2):
+    return {row['selector']: row for row in registry.selector_report(min_lookups) if row['key'] == key}
+
+
+def test_tied_fallback_is_not_dead(selector_stats):
+    first, second, third = selector_stats.get_selectors('douyin', 'title')[:3]
+    for _ in range(2):
+        selector_stats.record_lookup('douyin.title', first, {first: True, second: True, third: False})
+    selector_stats.save_stats()
+    rows = report(selector_stats, 'douyin.title')
+    assert (rows[first]['status'], rows[first]['wins']) == ('ok', 2)
+    assert (rows[second]['status'], rows[second]['wins'], rows[second]['matches']) == ('ok', 0, 2)
+    assert (rows[third]['status'], rows[third]['checks']) == ('dead', 2)
+
+
+def test_selector_without_enough_checks_is_unused(selector_stats):
+    first, second = selector_stats.get_selectors('douyin', 'title')[:2]
+    selector_stats.record_lookup('douyin.title', None, {first: False})
+    selector_stats.save_stats()
+    rows = report(selector_stats, 'douyin.title')
+    assert rows[first]['status'] == rows[second]['status'] == 'unused'
+    assert (rows[first]['lookups'], rows[first]['misses']) == (1, 1)
+
+
+def test_save_merges_with_counts_of_other_processes(selector_stats):
+    first = selector_stats.get_selectors('douyin', 'title')[0]
+    selector_stats.record_lookup('douyin.title', first, {first: True})
+    selector_stats.save_stats()
+    selector_stats.record_lookup('douyin.title', first, {first: True})
+    selector_stats.save_stats()
+    stats = selector_stats.load_stats()['douyin.title']
+    assert (stats['lookups'], stats['wins'][first], stats['matches'][first]) == (2, 2, 2)
+
+
+def test_locator_records_every_candidate(selector_stats):
+    page = FakePage({'#a': (True, 0.05), '#b': (True, 0), '#c': (False, 0)})
+    found = asyncio.run(locate_first_visible(page, ['#a', '#b', '#c'], timeout=1000, key='test.title'))
+    assert found is not None
+    stats = selector_stats._pending['test.title']
+    assert stats['wins'] == {'#b': 1}
+    assert stats['matches'] == {'#a': 1, '#b': 1}
+    assert stats['checks'] == {'#a': 1, '#b': 1, '#c': 1}
+
+
+def test_locator_counts_a_miss_for_every_candidate(selector_stats):
+    page = FakePage({})
+    assert asyncio.run(locate_first_visible(page, ['#a', '#b'], timeout=50, key='test.title')) is None
+    stats = selector_stats._pending['test.title']
+    assert (stats['misses'], stats['matches'], stats['checks']) == (1, {}, {'#a': 1, '#b': 1})
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+UploadLimiter.slot: account, platform and global limits, and where the posting token is drawn
+"""
+import asyncio
+import os
+
+from utils import rate_limiter
+from utils.upload_limiter import UploadLimiter
+
+
+async def run_uploads(limiter, uploads, hold=0.02):
+    """Run (platform, account, take_token) uploads through the limiter; returns the peak in flight per key"""
+    in_flight, peak = {}, {}
+
+    async def upload(platform, account, take_token=True):
+        async with limiter.slot(platform, account, take_token=take_token):
+            for key in ('total', platform, os.path.abspath(account)):
+                in_flight[key] = in_flight.get(key, 0) + 1
+                peak[key] = max(peak.get(key, 0), in_flight[key])
+            await asyncio.sleep(hold)
+            for key in ('total', platform, os.path.abspath(account)):
+                in_flight[key] -= 1
+
+    await asyncio.gather(*(upload(*item) for item in uploads))
+    return peak
+
+
+def test_one_upload_per_account_however_the_path_is_spelled(rate_limits):
+    async def main():
+        limiter = UploadLimiter(concurrency=4, platform_limits={})
+        return await run_uploads(limiter, [('douyin', 'cookies/a.json'), ('douyin', os.path.abspath('cookies/a.json')),
+                                           ('douyin', 'cookies/b.json')])
+
+    peak = asyncio.run(main())
+    assert peak[os.path.abspath('cookies/a.json')] == 1
+    assert peak['total'] == 2
+
+
+def test_platform_and_global_caps(rate_limits):
+    async def main():
+        limiter = UploadLimiter(concurrency=3, platform_limits={'douyin': 2})
+        return await run_uploads(limiter, [('douyin', f'cookies/d{i}.json') for i in range(4)] +
+                                 [('tiktok', f'cookies/t{i}.json') for i in range(4)])
+
+    peak = asyncio.run(main())
+    assert peak['douyin'] == 2
+    assert peak['total'] == 3
+
+
+def test_throttled_account_does_not_hold_a_slot(rate_limits, monkeypatch):
+    rate_limits(douyin={'account': (1, 3600)})
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    order = []
+
+    async def main():
+        limiter = UploadLimiter(concurrency=1)
+        budget = asyncio.Event()
+
+        async def wait_for_budget(seconds):
+            # the account stays out of budget until the other upload is done
+            await budget.wait()
+            monkeypatch.setattr(rate_limiter, 'UPLOAD_RATE_LIMITS', {})
+
+        monkeypatch.setattr(rate_limiter.asyncio, 'sleep', wait_for_budget)
+
+        async def upload(account):
+            async with limiter.slot('douyin', account):
+                order.append(account)
+            if account == 'cookies/b.json':
+                budget.set()
+
+        await asyncio.gather(upload('cookies/a.json'), upload('cookies/b.json'))
+
+    asyncio.run(main())
+    assert order == ['cookies/b.json', 'cookies/a.json']
+
+
+def test_slot_without_token_leaves_the_budget(rate_limits):
+    rate_limits(douyin={'account': (1, 3600)})
+
+    async def main():
+        limiter = UploadLimiter(concurrency=1)
+        async with limiter.slot('douyin', 'cookies/a.json', take_token=False):
+            pass
+        async with limiter.slot('douyin', 'cookies/b.json'):
+            pass
+
+    asyncio.run(main())
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
+    assert rate_limiter.try_acquire('douyin', 'cookies/b.json') > 0
+
+
+def test_rate_limit_off_takes_no_tokens(rate_limits):
+    rate_limits(douyin={'account': (1, 3600)})
+
+    async def main():
+        limiter = UploadLimiter(concurrency=1, rate_limit=False)
+        for _ in range(3):
+            async with limiter.slot('douyin', 'cookies/a.json'):
+                pass
+
+    asyncio.run(main())
+    assert rate_limiter.try_acquire('douyin', 'cookies/a.json') == 0
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Upload stage timing report
+Summarizes the per-stage durations written by utils/stage_timer into
+p50/p95 per platform and stage, so slow stages stand out across runs
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import STAGE_TIMINGS_PATH
+from utils.stage_timer import load_timings, summarize
+
+
+def print_summary(rows: list):
+    """Print one table per platform"""
+    current_platform = None
+    for row in rows:
+        if row['platform'] != current_platform:
+            current_platform = row['platform']
+            print(f"\n📊 {current_platform}")
+            print(f"  {'stage':<16}{'runs':>6}{'failed':>8}{'p50':>10}{'p95':>10}{'max':>10}")
+        print(f"  {row['stage']:<16}{row['runs']:>6}{row['failures']:>8}"
+              f"{row['p50_s']:>9.1f}s{row['p95_s']:>9.1f}s{row['max_s']:>9.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize upload stage timings (p50/p95)')
+    parser.add_argument('--file', default=STAGE_TIMINGS_PATH, help='Timings JSONL file')
+    parser.add_argument('--platform', action='append', help='Only this platform (repeatable)')
+    parser.add_argument('--account', help='Only this account')
+    parser.add_argument('--since-hours', type=float, help='Only runs from the last N hours')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    records = load_timings(args.file, since=since)
+    if args.platform:
+        records = [record for record in records if record.get('platform') in args.platform]
+    if args.account:
+        records = [record for record in records if record.get('account') == args.account]
+
+    if not records:
+        print(f"⚠️  No timings found in {args.file}")
+        sys.exit(1)
+
+    rows = summarize(records)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+
+    runs = len({record['run_id'] for record in records})
+    print(f"⏱️  {runs} run(s) from {args.file}")
+    print_summary(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,49 +3,57 @@ import re
 import time
 from datetime import datetime
 
-from playwright.async_api import Playwright, async_playwright
 import os
 import asyncio
 from uploader.tk_uploader.tk_config import Tk_Locator
-from utils.base_social_media import set_init_script
+from utils.browser_factory import platform_context
+from utils.cookie_cache import check_cookie, record_verdict
 from utils.files_times import get_absolute_path
 from utils.log import tiktok_logger
+from utils.platform_urls import platform_url
+from utils.popup_dismisser import dismiss_popups
+from utils.retry import poll_until
+from utils.stage_timer import timed_upload
+from utils.upload_monitor import UploadMonitor
+
+
+async def open_upload_page(context):
+    """Open TikTok Studio upload page and check login; returns the loaded page, or None if the cookie expired"""
+    # 创建一个新的页面
+    page = await context.new_page()
+    # 访问指定的 URL
+    await page.goto(platform_url('tiktok', "/tiktokstudio/upload?lang=en"))
+    await page.wait_for_load_state('networkidle')
+    try:
+        # 选择所有的 select 元素
+        select_elements = await page.query_selector_all('select')
+        for element in select_elements:
+            class_name = await element.get_attribute('class')
+            # 使用正则表达式匹配特定模式的 class 名称
+            if re.match(r'tiktok-.*-SelectFormContainer.*', class_name):
+                tiktok_logger.error("[+] cookie expired")
+                return None
+        tiktok_logger.success("[+] cookie valid")
+        return page
+    except:
+        tiktok_logger.success("[+] cookie valid")
+        return page
 
 
 async def cookie_auth(account_file):
-    async with async_playwright() as playwright:
-        browser = await playwright.firefox.launch(headless=True)
-        context = await browser.new_context(storage_state=account_file)
-        context = await set_init_script(context)
-        # 创建一个新的页面
-        page = await context.new_page()
-        # 访问指定的 URL
-        await page.goto("https://www.tiktok.com/tiktokstudio/upload?lang=en")
-        await page.wait_for_load_state('networkidle')
-        try:
-            # 选择所有的 select 元素
-            select_elements = await page.query_selector_all('select')
-            for element in select_elements:
-                class_name = await element.get_attribute('class')
-                # 使用正则表达式匹配特定模式的 class 名称
-                if re.match(r'tiktok-.*-SelectFormContainer.*', class_name):
-                    tiktok_logger.error("[+] cookie expired")
-                    return False
-            tiktok_logger.success("[+] cookie valid")
-            return True
-        except:
-            tiktok_logger.success("[+] cookie valid")
-            return True
-
-
-async def tiktok_setup(account_file, handle=False):
+    async with platform_context('tiktok', headless=True, stage='auth',
+                                storage_state=account_file) as context:
+        return await open_upload_page(context) is not None
+
+
+async def tiktok_setup(account_file, handle=False, revalidate=False):
     # If account_file is an absolute path or contains /, don't add base_dir
     if os.path.isabs(account_file) or "/" in account_file:
         account_path = account_file
     else:
         account_path = get_absolute_path(account_file, "tk_uploader")
     
-    if not os.path.exists(account_path) or not await cookie_auth(account_path):
+    if not os.path.exists(account_path) or not await check_cookie('tiktok', account_path, cookie_auth, revalidate):
         if not handle:
             return False
         tiktok_logger.info('[+] cookie file is not existed or expired. Now open the browser auto. Please login with your way(gmail phone, whatever, the cookie file will generated after login')
@@ -54,21 +62,11 @@ async def tiktok_setup(account_file, handle=False):
 
 
 async def get_tiktok_cookie(account_file):
-    async with async_playwright() as playwright:
-        options = {
-            'args': [
-                '--lang en-GB',
-            ],
-            'headless': False,  # Set headless option here
-        }
-        # Make sure to run headed.
-        browser = await playwright.firefox.launch(**options)
-        # Setup context however you like.
-        context = await browser.new_context()  # Pass any options
-        context = await set_init_script(context)
+    # Make sure to run headed.
+    async with platform_context('tiktok', headless=False, stage='login') as context:
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://www.tiktok.com/login?lang=en")
+        await page.goto(platform_url('tiktok', "/login?lang=en"))
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -82,55 +80,15 @@ class TiktokVideo(object):
         self.publish_date = publish_date
         self.account_file = account_file
         self.locator_base = None
+        self.video_id = None
+        self.upload_monitor = None
 
     async def close_popups(self, page):
-        """关闭可能弹出的对话框和遮罩"""
+        """关闭可能弹出的对话框和遮罩：页面内的 popup_dismisser 做一次全量清理，再按一次 ESC"""
         try:
-            tiktok_logger.info('  [-] 关闭弹窗...')
-            
-            # 使用 JavaScript 强制移除遮罩元素
-            await page.evaluate("""
-                () => {
-                    // 移除 joyride overlay
-                    const joyrideOverlay = document.querySelector('div.react-joyride__overlay');
-                    if (joyrideOverlay) joyrideOverlay.remove();
-                    
-                    // 移除其他常见遮罩
-                    const overlays = document.querySelectorAll('[data-test-id="overlay"]');
-                    overlays.forEach(el => el.remove());
-                    
-                    // 移除 modal 遮罩
-                    const modals = document.querySelectorAll('div[class*="overlay"]');
-                    modals.forEach(el => el.remove());
-                }
-            """)
-            await page.wait_for_timeout(500)
-            
-            # 多次尝试关闭
-            for attempt in range(3):
-                # 按ESC关闭
-                await page.keyboard.press("Escape")
-                await page.wait_for_timeout(500)
-                
-                # 关闭可能的各种弹窗按钮
-                close_selectors = [
-                    'button:has-text("Skip")]',
-                    'button:has-text("Got it")]',
-                    'button:has-text("OK")]',
-                    'button:has-text("Close")]',
-                    'button[class*="close"]'
-                ]
-                
-                for selector in close_selectors:
-                    try:
-                        btn = page.locator(selector).first
-                        if await btn.count() > 0 and await btn.is_visible():
-                            await btn.click()
-                            await page.wait_for_timeout(500)
-                    except:
-                        pass
-                    
-            tiktok_logger.info('  [-] 弹窗处理完成')
+            counts = await dismiss_popups(page, 'tiktok')
+            await page.keyboard.press("Escape")
+            tiktok_logger.info(f'  [-] 弹窗处理完成 {counts}' if counts else '  [-] 弹窗处理完成')
         except Exception as e:
             tiktok_logger.info(f'  [-] 关闭弹窗失败: {e}')
 
@@ -189,24 +147,28 @@ class TiktokVideo(object):
 
     async def handle_upload_error(self, page):
         tiktok_logger.info("video upload error retrying.")
+        if self.upload_monitor is not None:
+            self.upload_monitor.reset()
         select_file_button = self.locator_base.locator('button[aria-label="Select file"]')
         async with page.expect_file_chooser() as fc_info:
             await select_file_button.click()
         file_chooser = await fc_info.value
         await file_chooser.set_files(self.file_path)
 
-    async def upload(self, playwright: Playwright) -> None:
-        browser = await playwright.firefox.launch(headless=False)
-        context = await browser.new_context(storage_state=f"{self.account_file}")
-        context = await set_init_script(context)
-        page = await context.new_page()
-
+    @timed_upload('tiktok', tiktok_logger)
+    async def upload_in_context(self, context, page=None) -> None:
+        self.stage_timer.stage('navigate')
         # 尝试多个 TikTok 上传 URL
         tiktok_urls = [
-            "https://www.tiktok.com/tiktokstudio/upload",
-            "https://www.tiktok.com/creator-center/upload",
-            "https://www.tiktok.com/upload"
+            platform_url('tiktok', "/tiktokstudio/upload"),
+            platform_url('tiktok', "/creator-center/upload"),
+            platform_url('tiktok', "/upload")
         ]
+        if page is None:
+            page = await context.new_page()
+        else:
+            # cookie 校验时已经打开了上传页，无需再次访问
+            tiktok_urls = []
         
         for url in tiktok_urls:
             try:
@@ -232,35 +194,41 @@ class TiktokVideo(object):
 
         await self.choose_base_locator(page)
 
-        # 关闭可能遮挡的弹窗 - 多次尝试
-        for i in range(3):
-            await self.close_popups(page)
-            await page.wait_for_timeout(1000)
+        # 关闭可能遮挡的弹窗（之后出现的由页面内观察器自动关闭）
+        await self.close_popups(page)
 
         upload_button = self.locator_base.locator(
             'button:has-text("Select video"):visible')
         await upload_button.wait_for(state='visible')  # 确保按钮可见
 
         # 使用 force 绕过遮罩点击
+        self.upload_monitor = UploadMonitor(page, 'tiktok', self.file_path, logger=tiktok_logger).start()
         async with page.expect_file_chooser() as fc_info:
             await upload_button.click(force=True)
         file_chooser = await fc_info.value
         await file_chooser.set_files(self.file_path)
 
+        self.stage_timer.stage('metadata')
         await self.add_title_tags(page)
         # detact upload status
+        self.stage_timer.stage('file_transfer')
         await self.detect_upload_status(page)
         if self.publish_date != 0:
+            self.stage_timer.stage('scheduling')
             await self.set_schedule_time(page, self.publish_date)
 
+        self.stage_timer.stage('publish')
         await self.click_publish(page)
+        self.stage_timer.stage('video_id')
+        self.video_id = await self.get_last_video_id(page)
+        if self.video_id:
+            tiktok_logger.success(f"video_id: {self.video_id}")
+        self.stage_timer.stage('save_cookie')
 
         await context.storage_state(path=f"{self.account_file}")  # save cookie
+        record_verdict('tiktok', self.account_file, True)
         tiktok_logger.info('  [-] update cookie！')
         await asyncio.sleep(2)  # close delay for look the video status
-        # close all
-        await context.close()
-        await browser.close()
 
     async def add_title_tags(self, page):
 
@@ -298,98 +266,101 @@ class TiktokVideo(object):
 
     async def click_publish(self, page):
         # 先关闭所有弹窗
-        for i in range(3):
-            await self.close_popups(page)
-            await page.wait_for_timeout(1000)
-        
+        await self.close_popups(page)
+
         # 使用 data-e2e 属性定位发布按钮
-        max_attempts = 10
-        attempt = 0
-        
-        while attempt < max_attempts:
-            attempt += 1
-            try:
-                # 先关闭弹窗
-                await self.close_popups(page)
-                await page.wait_for_timeout(500)
-                
-                # 使用 force 绕过遮罩点击发布按钮
-                publish_button = self.locator_base.locator('button[data-e2e="post_video_button"]')
-                if await publish_button.count():
-                    await publish_button.click(force=True)
-                    tiktok_logger.info(f"  [-] 点击了发布按钮 (尝试 {attempt})")
-                
-                await page.wait_for_timeout(2000)
-                
-                # 检查是否有确认对话框并处理
-                confirm_texts = ["Confirm", "Post", "Yes", "是", "确认"]
-                
-                for text in confirm_texts:
-                    try:
-                        confirm_btn = page.get_by_role("button", name=text)
-                        if await confirm_btn.count():
-                            await confirm_btn.first.click(force=True)
-                            tiktok_logger.info(f"  [-] 点击了确认按钮: {text}")
-                            await page.wait_for_timeout(2000)
-                            break
-                    except Exception as e:
-                        pass
-                
-                # 检查URL是否变化 (表示发布成功)
-                if "video" not in page.url.lower() or "manage" in page.url:
-                    tiktok_logger.success("  [-] video published success!")
-                    break
-                
-                # 检查是否有成功提示
-                success_text = page.locator('text=Posted, text=Published, text=发布成功')
-                if await success_text.count():
-                    tiktok_logger.success("  [-] video published!")
-                    break
-                
-            except Exception as e:
-                tiktok_logger.info(f"  [-] 发布异常: {e}")
-            
-            tiktok_logger.info(f"  [-] video publishing... (尝试 {attempt}/{max_attempts})")
-            await page.wait_for_timeout(3000)
+        publish_attempt = 0
+
+        async def try_publish():
+            nonlocal publish_attempt
+            publish_attempt += 1
+            # 先关闭弹窗
+            await self.close_popups(page)
+
+            # 使用 force 绕过遮罩点击发布按钮
+            publish_button = self.locator_base.locator('button[data-e2e="post_video_button"]')
+            if await publish_button.count():
+                await publish_button.click(force=True)
+                tiktok_logger.info(f"  [-] 点击了发布按钮 (尝试 {publish_attempt})")
+
+            await page.wait_for_timeout(2000)
+
+            # 检查是否有确认对话框并处理
+            confirm_texts = ["Confirm", "Post", "Yes", "是", "确认"]
+
+            for text in confirm_texts:
+                try:
+                    confirm_btn = page.get_by_role("button", name=text)
+                    if await confirm_btn.count():
+                        await confirm_btn.first.click(force=True)
+                        tiktok_logger.info(f"  [-] 点击了确认按钮: {text}")
+                        await page.wait_for_timeout(2000)
+                        break
+                except Exception as e:
+                    pass
+
+            # 检查URL是否变化 (表示发布成功)
+            if "video" not in page.url.lower() or "manage" in page.url:
+                tiktok_logger.success("  [-] video published success!")
+                return True
+
+            # 检查是否有成功提示
+            success_text = page.locator('text=Posted, text=Published, text=发布成功')
+            if await success_text.count():
+                tiktok_logger.success("  [-] video published!")
+                return True
+
+            tiktok_logger.info(f"  [-] video publishing... (尝试 {publish_attempt})")
+            return False
+
+        await poll_until(try_publish, 'publish', 'tiktok', interval=3, max_interval=5, logger=tiktok_logger)
+
+    async def get_last_video_id(self, page):
+        # 发布后跳转到作品列表，取第一条作品的 id；拿不到时返回 None，不影响上传结果
+        try:
+            await page.wait_for_selector('div[data-tt="components_PostTable_Container"]', timeout=15000)
+            video_list_locator = self.locator_base.locator('div[data-tt="components_PostTable_Container"] div[data-tt="components_PostInfoCell_Container"] a')
+            if await video_list_locator.count():
+                first_video_obj = await video_list_locator.nth(0).get_attribute('href')
+                match = re.search(r'video/(\d+)', first_video_obj or '')
+                return match.group(1) if match else None
+        except Exception as e:
+            tiktok_logger.info(f"  [-] video_id not found: {e}")
+        return None
 
     async def detect_upload_status(self, page):
         tiktok_logger.info("  [-] 检测上传状态...")
-        max_wait_time = 180  # 最多等待3分钟
         start_time = time.time()
-        
-        while True:
-            try:
-                elapsed = time.time() - start_time
-                if elapsed > max_wait_time:
-                    tiktok_logger.info("  [-] 上传超时，跳过等待")
-                    break
-                
-                # 尝试多种方式检测上传完成
-                # 方法1: 检查发布按钮 (使用 data-e2e 属性)
-                post_btn = self.locator_base.locator('button[data-e2e="post_video_button"]')
-                if await post_btn.count():
-                    btn_disabled = await post_btn.get_attribute("aria-disabled")
-                    if btn_disabled == "false":
-                        tiktok_logger.info("  [-] video uploaded (按钮可用)")
-                        break
-                
-                # 方法2: 检查上传进度条是否消失
-                progress = self.locator_base.locator('[class*="progress"]')
-                if await progress.count() == 0:
-                    tiktok_logger.info("  [-] video uploaded (进度条消失)")
-                    break
-                
-                # 方法3: 检查是否有错误
-                if await self.locator_base.locator('button[aria-label="Select file"]').count():
-                    tiktok_logger.info("  [-] 发现错误，重试...")
-                    await self.handle_upload_error(page)
-                
-                tiktok_logger.info("  [-] video uploading... (已等待 {:.0f}s)".format(elapsed))
-                await asyncio.sleep(3)
-                
-            except Exception as e:
-                tiktok_logger.info(f"  [-] 检测状态异常: {e}")
-                await asyncio.sleep(3)
+
+        async def video_uploaded():
+            # 尝试多种方式检测上传完成
+            # 方法1: 检查发布按钮 (使用 data-e2e 属性)
+            post_btn = self.locator_base.locator('button[data-e2e="post_video_button"]')
+            if await post_btn.count():
+                btn_disabled = await post_btn.get_attribute("aria-disabled")
+                if btn_disabled == "false":
+                    tiktok_logger.info("  [-] video uploaded (按钮可用)")
+                    return True
+
+            # 方法2: 检查上传进度条是否消失
+            progress = self.locator_base.locator('[class*="progress"]')
+            if await progress.count() == 0:
+                tiktok_logger.info("  [-] video uploaded (进度条消失)")
+                return True
+
+            # 方法3: 检查是否有错误
+            if await self.locator_base.locator('button[aria-label="Select file"]').count():
+                tiktok_logger.info("  [-] 发现错误，重试...")
+                await self.handle_upload_error(page)
+
+            tiktok_logger.info("  [-] video uploading... (已等待 {:.0f}s)".format(time.time() - start_time))
+            return False
+
+        if self.upload_monitor is None:
+            await poll_until(video_uploaded, 'video_upload', 'tiktok', interval=3, max_interval=3, logger=tiktok_logger)
+        else:
+            await self.upload_monitor.wait_until_uploaded(video_uploaded, interval=3, max_interval=3,
+                                                          logger=tiktok_logger)
 
     async def choose_base_locator(self, page):
         # await page.wait_for_selector('div.upload-container')
@@ -398,7 +369,19 @@ class TiktokVideo(object):
         else:
             self.locator_base = page.locator(Tk_Locator.default) 
 
-    async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+    async def validate_and_upload(self, browser_pool=None) -> bool:
+        """Check the cookie and upload in the same browser session; returns False if the cookie expired"""
+        async with platform_context('tiktok', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            page = await open_upload_page(context)
+            record_verdict('tiktok', self.account_file, page is not None)
+            if page is None:
+                return False
+            await self.upload_in_context(context, page=page)
+        return True
+
+    async def main(self, browser_pool=None):
+        async with platform_context('tiktok', browser_pool=browser_pool,
+                                    storage_state=f"{self.account_file}") as context:
+            await self.upload_in_context(context)
 
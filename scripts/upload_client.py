@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thin client for uploader_daemon.py
+Sends a JSON/YAML upload configuration (single or batch) to the running
+daemon and prints its JSON response. Imports nothing heavy on purpose so
+each call only pays for a socket round-trip.
+"""
+import asyncio
+import argparse
+import json
+from pathlib import Path
+import sys
+
+import yaml
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import UPLOADER_DAEMON_SOCKET
+
+
+async def send_request(request, socket_path: str = UPLOADER_DAEMON_SOCKET, host: str = '127.0.0.1',
+                       port: int = None) -> dict:
+    """
+    Send one request to the daemon and wait for its response
+
+    Args:
+        request: Config dict, list of configs, or control message ({"action": ...})
+        socket_path: Daemon Unix socket
+        host: Daemon host (with port)
+        port: Daemon TCP port, overrides socket_path
+
+    Returns:
+        Response dictionary
+    """
+    if port:
+        reader, writer = await asyncio.open_connection(host, port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+    if not line:
+        raise ConnectionError("Daemon closed the connection without a response")
+    return json.loads(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Submit upload jobs to the uploader daemon')
+    parser.add_argument('config', nargs='?', help='Path to configuration file (JSON/YAML)')
+    parser.add_argument('--action', choices=['ping', 'stats', 'probe', 'shutdown'],
+                        help='Send a control message instead of a config')
+    parser.add_argument('--platform', default='douyin',
+                        help='Platform whose browser the probe action uses')
+    parser.add_argument('--socket', default=UPLOADER_DAEMON_SOCKET, help='Daemon Unix socket path')
+    parser.add_argument('--port', type=int, help='Daemon TCP port (instead of Unix socket)')
+    parser.add_argument('--host', default='127.0.0.1', help='Daemon host (with --port)')
+
+    args = parser.parse_args()
+
+    if args.action:
+        request = {'action': args.action, 'platform': args.platform}
+    elif args.config:
+        # YAML is a superset of JSON, so one loader covers both formats
+        request = yaml.safe_load(Path(args.config).read_text(encoding='utf-8'))
+    else:
+        parser.error("config file or --action is required")
+
+    response = await send_request(request, socket_path=args.socket, host=args.host, port=args.port)
+    print(json.dumps(response, indent=2, ensure_ascii=False))
+    if response.get('ok') is False or response.get('success') is False or response.get('failed'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -7,6 +7,7 @@ Supports batch uploads and advanced configuration
 import asyncio
 import argparse
 import json
+import time
 import yaml
 from pathlib import Path
 from datetime import datetime
@@ -15,10 +16,23 @@ import sys
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from conf import JOB_DB_PATH, JOB_MAX_ATTEMPTS, SUPERVISOR_JOB_TIMEOUT, SUPERVISOR_MAX_RSS_MB
 from douyin_uploader.main import DouYinVideo, douyin_setup
+from douyin_uploader.main import open_upload_page as douyin_open_upload_page
+from generate_upload_config import generate_fanout_configs
 from ks_uploader.main import KSVideo, ks_setup
 from tk_uploader.main import TiktokVideo, tiktok_setup
 from tencent_uploader.main import TencentVideo, weixin_setup
+from tencent_uploader.main import open_upload_page as tencent_open_upload_page
+from utils import rate_limiter
+from utils.base_social_media import run_upload
+from utils.browser_factory import platform_context
+from utils.browser_pool import BrowserPool
+from utils.cookie_cache import record_verdict
+from utils.job_store import JobStore, QUEUE_SOURCE_PREFIX
+from utils.upload_limiter import UploadLimiter
+from utils.upload_pipeline import run_pipeline
+from utils.upload_supervisor import UploadSupervisor
 
 
 def load_config(config_path: str) -> dict:
@@ -91,12 +105,104 @@ def parse_publish_date(date_value):
     raise ValueError(f"Unable to parse date: {date_value}")
 
 
-async def upload_from_config(config: dict) -> bool:
+def expand_fanout(config: dict) -> list:
+    """
+    Expand a fan-out configuration into one configuration per platform
+    
+    A fan-out config has `platforms: [...]` instead of `platform`, an
+    `accounts` mapping (platform -> cookie file) and optional per-platform
+    `overrides` merged on top of generate_upload_config.generate_config.
+    The video file is checked once for all platforms, and a platform without
+    an account is rejected before anything is uploaded.
+    
+    Args:
+        config: Fan-out configuration dictionary
+    
+    Returns:
+        List of single-platform configuration dictionaries
+    """
+    video_info = config.get('video', {})
+    options = dict(config.get('options', {}))
+    publish_date = options.pop('publish_date', None)
+    return generate_fanout_configs(
+        config['platforms'],
+        video_info.get('path'),
+        title=video_info.get('title'),
+        tags=video_info.get('tags'),
+        description=video_info.get('description'),
+        accounts=config.get('accounts', {}),
+        publish_date=publish_date,
+        overrides=config.get('overrides', {}),
+        **options
+    )
+
+
+# Platforms with a browser uploader, and their names in messages
+PLATFORM_NAMES = {
+    'douyin': 'Douyin',
+    'kuaishou': 'Kuaishou',
+    'tiktok': 'TikTok',
+    'tencent': 'Tencent/WeChat',
+}
+
+# Platforms whose uploaders support multi-tab pipelining: platform -> page opener that also checks the cookie
+PIPELINE_PAGES = {
+    'douyin': douyin_open_upload_page,
+    'tencent': tencent_open_upload_page,
+}
+
+
+def create_video(config: dict):
+    """
+    Build the uploader object for a single-platform configuration
+    
+    Args:
+        config: Validated configuration dictionary (platform in PLATFORM_NAMES)
+    
+    Returns:
+        (uploader object, the platform's account setup function)
+    """
+    platform = config['platform']
+    video_info = config.get('video', {})
+    account_file = config.get('account', {}).get('cookie_file')
+    options = config.get('options', {})
+    common = dict(
+        title=video_info.get('title'),
+        file_path=video_info.get('path'),
+        tags=video_info.get('tags', []),
+        publish_date=parse_publish_date(options.get('publish_date', 0)),
+        account_file=account_file,
+    )
+    if platform == 'douyin':
+        return DouYinVideo(
+            thumbnail_path=options.get('thumbnail') or options.get('thumbnail_path'),
+            productLink=options.get('product_link', ''),
+            productTitle=options.get('product_title', ''),
+            **common
+        ), douyin_setup
+    if platform == 'kuaishou':
+        # Limit tags to 3
+        common['tags'] = common['tags'][:3]
+        return KSVideo(**common), ks_setup
+    if platform == 'tiktok':
+        return TiktokVideo(**common), tiktok_setup
+    if platform == 'tencent':
+        return TencentVideo(category=options.get('category'), **common), weixin_setup
+    raise ValueError(f"Unknown platform: {platform}")
+
+
+async def upload_from_config(config: dict, browser_pool: BrowserPool = None, revalidate: bool = False,
+                             details: dict = None) -> bool:
     """
     Upload video based on configuration
     
     Args:
         config: Configuration dictionary
+        browser_pool: Optional shared browser pool (batch mode)
+        revalidate: Ignore the cookie validation cache
+        details: Optional dictionary filled with extra results (video_id when the platform reports one,
+                 upload with the network-observed transfer stats,
+                 error with the failure category and stage when the upload raised)
     
     Returns:
         True if successful, False otherwise
@@ -139,135 +245,299 @@ async def upload_from_config(config: dict) -> bool:
     print(f"🏷️  Tags: {', '.join(tags)}")
     
     try:
-        if platform == 'douyin':
-            # Setup account
-            if not await douyin_setup(account_file, handle=True):
-                print("❌ Failed to setup Douyin account")
-                return False
-            
-            # Create video object
-            video = DouYinVideo(
-                title=title,
-                file_path=video_path,
-                tags=tags,
-                publish_date=publish_date,
-                account_file=account_file,
-                thumbnail_path=options.get('thumbnail'),
-                productLink=options.get('product_link', ''),
-                productTitle=options.get('product_title', '')
-            )
-            await video.main()
-        
-        elif platform == 'kuaishou':
-            # Setup account
-            if not await ks_setup(account_file, handle=True):
-                print("❌ Failed to setup Kuaishou account")
-                return False
-            
-            # Limit tags to 3
-            tags = tags[:3]
-            
-            # Create video object
-            video = KSVideo(
-                title=title,
-                file_path=video_path,
-                tags=tags,
-                publish_date=publish_date,
-                account_file=account_file
-            )
-            await video.main()
-        
-        elif platform == 'tiktok':
-            # Setup account
-            if not await tiktok_setup(account_file, handle=True):
-                print("❌ Failed to setup TikTok account")
-                return False
-            
-            # Create video object
-            video = TiktokVideo(
-                title=title,
-                file_path=video_path,
-                tags=tags,
-                publish_date=publish_date,
-                account_file=account_file
-            )
-            await video.main()
-        
-        elif platform == 'tencent':
-            # Setup account
-            if not await weixin_setup(account_file, handle=True):
-                print("❌ Failed to setup Tencent/WeChat account")
-                return False
-            
-            # Create video object
-            video = TencentVideo(
-                title=title,
-                file_path=video_path,
-                tags=tags,
-                publish_date=publish_date,
-                account_file=account_file,
-                category=options.get('category')
-            )
-            await video.main()
-        
-        elif platform == 'xhs':
+        if platform == 'xhs':
             print("⚠️  Xiaohongshu (小红书) upload requires separate signature service")
             print("Please refer to xhs_uploader module for implementation")
             return False
         
-        else:
+        if platform not in PLATFORM_NAMES:
             print(f"❌ Unknown platform: {platform}")
             return False
         
+        video, setup = create_video(config)
+        # Validate account and upload in one browser session
+        if not await run_upload(video, setup, account_file, browser_pool=browser_pool,
+                                revalidate=revalidate):
+            print(f"❌ Failed to setup {PLATFORM_NAMES[platform]} account")
+            return False
+        
+        if details is not None:
+            details['video_id'] = getattr(video, 'video_id', None)
+            monitor = getattr(video, 'upload_monitor', None)
+            if monitor is not None:
+                details['upload'] = monitor.stats()
         print(f"\n✅ Successfully uploaded to {platform.upper()}")
         return True
     
     except Exception as e:
         print(f"\n❌ Upload failed: {str(e)}")
+        if details is not None:
+            details['error'] = str(e)
         import traceback
         traceback.print_exc()
         return False
 
 
-async def batch_upload(config_list: list) -> dict:
+async def upload_item(index: int, total: int, config: dict, browser_pool: BrowserPool,
+                      limiter: UploadLimiter, revalidate: bool = False,
+                      job_store: JobStore = None, batch_id: str = None,
+                      supervisor: UploadSupervisor = None):
+    """
+    Upload one batch item once its account/platform slot is free
+
+    With a supervisor the upload runs in one of its worker processes instead
+    of on browser_pool.
+
+    Returns:
+        (error message or None on success, seconds spent uploading)
+    """
+    platform = config.get('platform')
+    account_file = config.get('account', {}).get('cookie_file')
+    async with limiter.slot(platform, account_file):
+        start = time.perf_counter()
+        print(f"\n{'='*60}")
+        print(f"Processing {index}/{total} ({platform})")
+        print(f"{'='*60}")
+        
+        if job_store is not None:
+            job_store.mark_running(batch_id, index)
+        details = {}
+        try:
+            if supervisor is not None:
+                details = await supervisor.run(config, revalidate=revalidate)
+                success = details['error'] is None
+            else:
+                success = await upload_from_config(config, browser_pool=browser_pool, revalidate=revalidate,
+                                                   details=details)
+            error = None if success else details.get('error') or 'Upload failed'
+        except Exception as e:
+            error = str(e)
+        if job_store is not None:
+            if error is None:
+                job_store.mark_succeeded(batch_id, index, details.get('video_id'))
+            else:
+                job_store.mark_failed(batch_id, index, error)
+        return error, time.perf_counter() - start
+
+
+async def upload_pipelined(items: list, total: int, browser_pool: BrowserPool, limiter: UploadLimiter,
+                           depth: int, revalidate: bool = False, job_store: JobStore = None,
+                           batch_id: str = None) -> list:
+    """
+    Upload several items of one account in tabs of one browser context
+    
+    Up to depth tabs run at once (utils/upload_pipeline): the next videos
+    transfer while the current one is filled in and published, and the
+    account's posts still go out in input order. The group holds one slot of
+    the limiter. Each video draws its own posting token once its tab has the
+    publish turn, so a tab that fails before that spends none. The account's
+    storage state is saved once, when the group is done, instead of by every
+    tab at the same time.
+    
+    Args:
+        items: (index, config) pairs with the same platform (in PIPELINE_PAGES) and cookie file
+        total: Batch size, for progress messages
+        browser_pool: Shared browser pool
+        limiter: UploadLimiter of the batch
+        depth: Maximum tabs in flight
+        revalidate: Ignore the cookie validation cache
+        job_store: Optional JobStore recording job states
+        batch_id: Batch of the jobs in job_store
+    
+    Returns:
+        (error message or None on success, seconds) per item, in input order
+    """
+    platform = items[0][1]['platform']
+    account_file = items[0][1].get('account', {}).get('cookie_file')
+    outcomes = {}
+    runnable, videos, setup = [], [], None
+    for index, config in items:
+        video_path = config.get('video', {}).get('path')
+        try:
+            if not video_path or not Path(video_path).exists():
+                raise FileNotFoundError(f"Video file not found: {video_path}")
+            video, setup = create_video(config)
+        except (ValueError, FileNotFoundError) as e:
+            outcomes[index] = (str(e), 0.0)
+            if job_store is not None:
+                job_store.mark_failed(batch_id, index, str(e))
+            continue
+        runnable.append((index, config))
+        videos.append(video)
+    
+    if not runnable:
+        return [outcomes[index] for index, _ in items]
+    
+    async def on_start(position):
+        index = runnable[position][0]
+        print(f"\n📑 Processing {index}/{total} ({platform}, pipelined)")
+        if job_store is not None:
+            job_store.mark_running(batch_id, index)
+    
+    async def before_publish(position):
+        if limiter.rate_limit:
+            await rate_limiter.acquire(platform, account_file)
+    
+    async def on_finish(position, error, video):
+        index = runnable[position][0]
+        if error is None:
+            print(f"✅ [{index}] Successfully uploaded to {platform.upper()}")
+        else:
+            print(f"❌ [{index}] Upload failed: {error}")
+        if job_store is not None:
+            if error is None:
+                job_store.mark_succeeded(batch_id, index, getattr(video, 'video_id', None))
+            else:
+                job_store.mark_failed(batch_id, index, error)
+    
+    async with limiter.slot(platform, account_file, take_token=False):
+        print(f"\n{'='*60}")
+        print(f"Pipelining {len(runnable)} uploads for {platform} account {account_file} (depth {depth})")
+        print(f"{'='*60}")
+        if await setup(account_file, handle=True, revalidate=revalidate):
+            async with platform_context(platform, browser_pool=browser_pool,
+                                        storage_state=account_file) as context:
+                results = await run_pipeline(context, videos, PIPELINE_PAGES[platform], depth=depth,
+                                             on_start=on_start, before_publish=before_publish,
+                                             on_finish=on_finish)
+                if any(error is None for error, _ in results):
+                    # the tabs leave the cookie file alone; save the refreshed session once
+                    try:
+                        await context.storage_state(path=account_file)
+                        record_verdict(platform, account_file, True)
+                    except Exception as e:
+                        # the posts are out already; only the cookie refresh is lost
+                        print(f"⚠️  Could not save the {platform} session to {account_file}: {e}")
+        else:
+            error = f"Failed to setup {PLATFORM_NAMES[platform]} account"
+            results = [(error, 0.0)] * len(runnable)
+            if job_store is not None:
+                for index, _ in runnable:
+                    job_store.mark_failed(batch_id, index, error)
+    outcomes.update({index: result for (index, _), result in zip(runnable, results)})
+    
+    return [outcomes[index] for index, _ in items]
+
+
+async def batch_upload(config_list: list, browser_max_uses: int = 20, revalidate: bool = False,
+                       browser_pool: BrowserPool = None, concurrency: int = 1,
+                       limiter: UploadLimiter = None, job_store: JobStore = None,
+                       resume: bool = False, supervisor: UploadSupervisor = None,
+                       pipeline_depth: int = 1, retry_failed: bool = False) -> dict:
     """
     Upload multiple videos from configuration list
     
+    All items share one browser pool: each upload gets a fresh context on an
+    already-running browser instead of launching its own. Items run
+    concurrently up to the limiter's global, per-platform and per-account
+    limits; results are reported in input order.
+    
+    With a supervisor the uploads run in its worker processes instead, so a
+    hung or crashed browser session costs one slot, not the whole batch.
+    
+    With pipeline_depth > 1, items of the same Douyin or Tencent account
+    share one browser context and upload in up to pipeline_depth tabs at once
+    (see upload_pipelined); they still publish in input order.
+    
+    With a job store every item is recorded as a job before it runs. With
+    resume, the latest batch created from the same configuration continues:
+    succeeded jobs are skipped and jobs stuck in running are requeued. Failed
+    jobs are skipped too unless retry_failed is set (up to JOB_MAX_ATTEMPTS).
+    
     Args:
         config_list: List of configuration dictionaries
+        browser_max_uses: Recycle a pooled browser after this many uploads (0 = never)
+        revalidate: Ignore the cookie validation cache
+        browser_pool: Existing pool to use instead of creating one (e.g. daemon mode)
+        concurrency: Maximum uploads in flight (ignored when limiter is given)
+        limiter: Existing UploadLimiter shared with other batches (e.g. daemon mode)
+        job_store: Optional JobStore recording job states
+        resume: Continue the previous batch of the same configuration (requires job_store)
+        supervisor: Started UploadSupervisor running each upload in a worker process
+        pipeline_depth: Tabs per account for pipelined platforms (1 = one upload at a time; ignored with supervisor)
+        retry_failed: With resume, also run the failed jobs that have attempts left
     
     Returns:
         Dictionary with success/failure counts
     """
+    if browser_pool is None and supervisor is None:
+        async with BrowserPool(max_uses=browser_max_uses) as browser_pool:
+            results = await batch_upload(config_list, revalidate=revalidate, browser_pool=browser_pool,
+                                         concurrency=concurrency, limiter=limiter,
+                                         job_store=job_store, resume=resume, pipeline_depth=pipeline_depth,
+                                         retry_failed=retry_failed)
+            results['browser_pool'] = browser_pool.stats()
+            return results
+    if limiter is None:
+        limiter = UploadLimiter(concurrency=concurrency)
+    
+    batch_id = None
+    jobs = list(enumerate(config_list, 1))
+    if job_store is not None:
+        batch_id = job_store.find_batch(config_list) if resume else None
+        if batch_id:
+            requeued = job_store.requeue_stale(batch_id)
+            jobs = job_store.runnable_jobs(batch_id, retry_failed=retry_failed)
+            print(f"🔁 Resuming batch {batch_id}: {len(jobs)} to run "
+                  f"({requeued} requeued from running, {len(config_list) - len(jobs)} finished earlier)")
+        else:
+            if resume:
+                print("⚠️  No previous batch for this configuration, starting a new one")
+            batch_id = job_store.create_batch(config_list)
+            print(f"🗂️  Batch {batch_id}: {len(jobs)} jobs")
+    
+    # Items of one account on a pipelined platform share a context and run as one group
+    groups = {}
+    if pipeline_depth > 1 and supervisor is None:
+        for i, config in jobs:
+            if config.get('platform') in PIPELINE_PAGES:
+                key = (config['platform'], config.get('account', {}).get('cookie_file'))
+                groups.setdefault(key, []).append((i, config))
+    groups = [items for items in groups.values() if len(items) > 1]
+    pipelined = {i for items in groups for i, _ in items}
+    
+    outcomes = {}
+    
+    async def run_item(i, config):
+        outcomes[i] = await upload_item(i, len(config_list), config, browser_pool, limiter, revalidate=revalidate,
+                                        job_store=job_store, batch_id=batch_id, supervisor=supervisor)
+    
+    async def run_group(items):
+        results = await upload_pipelined(items, len(config_list), browser_pool, limiter, pipeline_depth,
+                                         revalidate=revalidate, job_store=job_store, batch_id=batch_id)
+        outcomes.update({i: result for (i, _), result in zip(items, results)})
+    
+    await asyncio.gather(*[run_item(i, config) for i, config in jobs if i not in pipelined],
+                         *[run_group(items) for items in groups])
+    
     results = {
         'total': len(config_list),
         'success': 0,
         'failed': 0,
-        'errors': []
+        'skipped': len(config_list) - len(jobs),
+        'errors': [],
+        'items': []
     }
-    
-    for i, config in enumerate(config_list, 1):
-        print(f"\n{'='*60}")
-        print(f"Processing {i}/{len(config_list)}")
-        print(f"{'='*60}")
-        
-        try:
-            success = await upload_from_config(config)
-            if success:
-                results['success'] += 1
-            else:
-                results['failed'] += 1
-                results['errors'].append({
-                    'index': i,
-                    'platform': config.get('platform'),
-                    'error': 'Upload failed'
-                })
-        except Exception as e:
+    if batch_id:
+        results['batch_id'] = batch_id
+    
+    for i, config in jobs:
+        error, elapsed = outcomes[i]
+        results['items'].append({
+            'index': i,
+            'platform': config.get('platform'),
+            'success': error is None,
+            'error': error,
+            'elapsed_s': round(elapsed, 1)
+        })
+        if error is None:
+            results['success'] += 1
+        else:
             results['failed'] += 1
             results['errors'].append({
                 'index': i,
                 'platform': config.get('platform'),
-                'error': str(e)
+                'error': error
             })
     
     return results
@@ -275,22 +545,86 @@ async def batch_upload(config_list: list) -> dict:
 
 async def main():
     parser = argparse.ArgumentParser(description='Upload video from configuration file')
-    parser.add_argument('config', help='Path to configuration file (JSON/YAML)')
+    parser.add_argument('config', help='Path to configuration file (JSON/YAML); '
+                                       'a config with "platforms: [...]" fans out to every listed platform')
     parser.add_argument('--batch', action='store_true', 
                         help='Treat config as batch upload (array of configs)')
+    parser.add_argument('--browser-max-uses', type=int, default=20,
+                        help='Batch mode: relaunch a shared browser after N uploads (0 = never)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Ignore the cookie validation cache and re-check accounts in a browser')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Batch mode: maximum uploads in flight (one per account, capped per platform)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Batch mode: continue the previous run of this config, skipping finished jobs')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help=f'With --resume: also retry failed jobs, up to {JOB_MAX_ATTEMPTS} attempts each '
+                             f'(a job that failed after publishing is posted again)')
+    parser.add_argument('--job-db', default=JOB_DB_PATH,
+                        help='Batch mode: SQLite job store (default: scripts/jobs.db)')
+    parser.add_argument('--pipeline-depth', type=int, default=1,
+                        help='Batch mode: upload up to N videos of the same Douyin/Tencent account in parallel tabs, '
+                             'transferring the next while the current one is published (default: 1 = off)')
+    parser.add_argument('--isolate', action='store_true',
+                        help='Batch mode: run each upload in a supervised worker process '
+                             '(killed and replaced when it hangs or runs out of memory)')
+    parser.add_argument('--job-timeout', type=float, default=SUPERVISOR_JOB_TIMEOUT,
+                        help=f'With --isolate: wall-clock limit per upload in seconds '
+                             f'(default: {SUPERVISOR_JOB_TIMEOUT})')
+    parser.add_argument('--job-max-rss-mb', type=float, default=SUPERVISOR_MAX_RSS_MB,
+                        help=f'With --isolate: memory limit in MB of a worker and its browsers '
+                             f'(default: {SUPERVISOR_MAX_RSS_MB})')
+    parser.add_argument('--enqueue', action='store_true',
+                        help='Only queue the jobs in the job store for upload_worker.py processes')
     
     args = parser.parse_args()
     
     # Load configuration
     config = load_config(args.config)
     
-    if args.batch:
+    fanout = isinstance(config, dict) and 'platforms' in config
+    if fanout:
+        # Fan-out: one item per platform, all platforms in parallel
+        try:
+            config = expand_fanout(config)
+        except (ValueError, FileNotFoundError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        args.concurrency = max(args.concurrency, len(config))
+    
+    if args.enqueue:
+        # Workers (possibly on other hosts) claim the jobs from the shared store
+        config_list = config if isinstance(config, list) else [config]
+        with JobStore(args.job_db) as job_store:
+            batch_id = job_store.create_batch(config_list,
+                                              source=QUEUE_SOURCE_PREFIX + str(Path(args.config).resolve()))
+        print(f"📤 Queued batch {batch_id}: {len(config_list)} jobs for upload workers")
+        return
+    
+    if args.batch or fanout:
         # Batch upload
         if not isinstance(config, list):
             print("❌ Batch mode requires configuration to be an array")
             return
         
-        results = await batch_upload(config)
+        with JobStore(args.job_db) as job_store:
+            if args.isolate:
+                if args.pipeline_depth > 1:
+                    print("⚠️  --pipeline-depth is ignored with --isolate (one upload per worker process)")
+                async with UploadSupervisor(workers=args.concurrency, job_timeout=args.job_timeout,
+                                            max_rss_mb=args.job_max_rss_mb,
+                                            browser_max_uses=args.browser_max_uses) as supervisor:
+                    results = await batch_upload(config, revalidate=args.revalidate, concurrency=args.concurrency,
+                                                 job_store=job_store, resume=args.resume, supervisor=supervisor,
+                                                 retry_failed=args.retry_failed)
+                    replaced = supervisor.stats()['replaced']
+                if replaced:
+                    print(f"♻️  {replaced} upload worker(s) replaced after a timeout, memory limit or crash")
+            else:
+                results = await batch_upload(config, browser_max_uses=args.browser_max_uses,
+                                             revalidate=args.revalidate, concurrency=args.concurrency,
+                                             job_store=job_store, resume=args.resume,
+                                             pipeline_depth=args.pipeline_depth, retry_failed=args.retry_failed)
         
         print(f"\n{'='*60}")
         print("BATCH UPLOAD SUMMARY")
@@ -298,6 +632,23 @@ async def main():
         print(f"Total: {results['total']}")
         print(f"✅ Success: {results['success']}")
         print(f"❌ Failed: {results['failed']}")
+        if results['skipped']:
+            print(f"⏭️  Skipped (finished in an earlier run): {results['skipped']}")
+        print(f"Batch ID: {results['batch_id']}")
+        
+        if fanout:
+            print("\nPlatforms:")
+            for item in results['items']:
+                status = '✅' if item['success'] else f"❌ {item['error']}"
+                print(f"  {item['platform']:<10} {item['elapsed_s']:>7.1f}s  {status}")
+        
+        pool_stats = results.get('browser_pool')
+        if pool_stats and pool_stats['platforms']:
+            recycled = ', '.join(f"{count} by {reason}" for reason, count in pool_stats['recycled'].items() if count)
+            print(f"\nBrowsers: {pool_stats['launch_count']} launched, recycled: {recycled or 'none'}")
+            for platform, stats in pool_stats['platforms'].items():
+                print(f"  {platform:<10} {stats['uses']:>3} uses  {stats['recycled']:>2} recycled  "
+                      f"peak {stats['peak_rss_mb']}MB")
         
         if results['errors']:
             print("\nErrors:")
@@ -306,7 +657,7 @@ async def main():
     
     else:
         # Single upload
-        await upload_from_config(config)
+        await upload_from_config(config, revalidate=args.revalidate)
 
 
 if __name__ == '__main__':
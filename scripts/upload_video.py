@@ -20,15 +20,14 @@ from tencent_uploader.main import TencentVideo, weixin_setup
 from xhs_uploader.browser_uploader import XiaohongshuVideo, xhs_setup
 from xhs import XhsClient
 from xhs_uploader.main import sign_local as xhs_sign
+from utils.base_social_media import run_upload
+from utils.rate_limiter import acquire as acquire_post_token
+from generate_upload_config import generate_fanout_configs, parse_accounts
+from upload_from_config import batch_upload
 
 
-async def upload_to_douyin(title, video_path, tags, publish_date, account_file, thumbnail_path=None, product_link='', product_title=''):
+async def upload_to_douyin(title, video_path, tags, publish_date, account_file, thumbnail_path=None, product_link='', product_title='', revalidate=False):
     """Upload video to Douyin (抖音)"""
-    # Setup and verify cookie
-    if not await douyin_setup(account_file, handle=True):
-        print("Failed to setup Douyin account")
-        return False
-    
     # Create video object and upload
     video = DouYinVideo(
         title=title,
@@ -40,17 +39,15 @@ async def upload_to_douyin(title, video_path, tags, publish_date, account_file,
         productLink=product_link,
         productTitle=product_title
     )
-    await video.main()
+    # Validate cookie and upload in one browser session
+    if not await run_upload(video, douyin_setup, account_file, revalidate=revalidate):
+        print("Failed to setup Douyin account")
+        return False
     return True
 
 
-async def upload_to_kuaishou(title, video_path, tags, publish_date, account_file):
+async def upload_to_kuaishou(title, video_path, tags, publish_date, account_file, revalidate=False):
     """Upload video to Kuaishou (快手)"""
-    # Setup and verify cookie
-    if not await ks_setup(account_file, handle=True):
-        print("Failed to setup Kuaishou account")
-        return False
-    
     # Create video object and upload
     video = KSVideo(
         title=title,
@@ -59,17 +56,15 @@ async def upload_to_kuaishou(title, video_path, tags, publish_date, account_file
         publish_date=publish_date,
         account_file=account_file
     )
-    await video.main()
+    # Validate cookie and upload in one browser session
+    if not await run_upload(video, ks_setup, account_file, revalidate=revalidate):
+        print("Failed to setup Kuaishou account")
+        return False
     return True
 
 
-async def upload_to_tiktok(title, video_path, tags, publish_date, account_file):
+async def upload_to_tiktok(title, video_path, tags, publish_date, account_file, revalidate=False):
     """Upload video to TikTok"""
-    # Setup and verify cookie
-    if not await tiktok_setup(account_file, handle=True):
-        print("Failed to setup TikTok account")
-        return False
-    
     # Create video object and upload
     video = TiktokVideo(
         title=title,
@@ -78,17 +73,15 @@ async def upload_to_tiktok(title, video_path, tags, publish_date, account_file):
         publish_date=publish_date,
         account_file=account_file
     )
-    await video.main()
+    # Validate cookie and upload in one browser session
+    if not await run_upload(video, tiktok_setup, account_file, revalidate=revalidate):
+        print("Failed to setup TikTok account")
+        return False
     return True
 
 
-async def upload_to_tencent(title, video_path, tags, publish_date, account_file, category=None):
+async def upload_to_tencent(title, video_path, tags, publish_date, account_file, category=None, revalidate=False):
     """Upload video to Tencent Video / WeChat Channels (视频号)"""
-    # Setup and verify cookie
-    if not await weixin_setup(account_file, handle=True):
-        print("Failed to setup Tencent/WeChat account")
-        return False
-    
     # Create video object and upload
     video = TencentVideo(
         title=title,
@@ -98,7 +91,10 @@ async def upload_to_tencent(title, video_path, tags, publish_date, account_file,
         account_file=account_file,
         category=category
     )
-    await video.main()
+    # Validate cookie and upload in one browser session
+    if not await run_upload(video, weixin_setup, account_file, revalidate=revalidate):
+        print("Failed to setup Tencent/WeChat account")
+        return False
     return True
 
 
@@ -121,6 +117,35 @@ async def upload_to_xhs(title, video_path, tags, publish_date, account_file):
     return True
 
 
+async def upload_fanout(platforms, args, tags):
+    """Upload the same video to several platforms concurrently and print per-platform outcomes"""
+    try:
+        configs = generate_fanout_configs(
+            platforms,
+            args.video,
+            title=args.title,
+            tags=tags,
+            accounts=parse_accounts(args.account, platforms),
+            publish_date=args.publish_date if args.publish_date != '0' else None,
+            thumbnail=args.thumbnail,
+            product_link=args.product_link,
+            product_title=args.product_title,
+            category=args.category
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    results = await batch_upload(configs, revalidate=args.revalidate, concurrency=len(configs))
+    
+    print(f"\n{'='*60}")
+    print("FAN-OUT SUMMARY")
+    print(f"{'='*60}")
+    for item in results['items']:
+        status = '✅' if item['success'] else f"❌ {item['error']}"
+        print(f"  {item['platform']:<10} {item['elapsed_s']:>7.1f}s  {status}")
+    return results
+
+
 def parse_publish_date(date_str):
     """Parse publish date string to datetime object"""
     if not date_str or date_str == "0":
@@ -145,18 +170,25 @@ def parse_publish_date(date_str):
 
 async def main():
     parser = argparse.ArgumentParser(description='Upload video to social media platforms')
-    parser.add_argument('--platform', required=True, 
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--platform',
                         choices=['douyin', 'kuaishou', 'tiktok', 'tencent', 'xhs'],
                         help='Target platform')
+    target.add_argument('--platforms',
+                        help='Comma-separated platforms to publish to in parallel '
+                             '(douyin,kuaishou,tiktok,tencent); --account becomes platform=path pairs')
     parser.add_argument('--title', required=True, help='Video title')
     parser.add_argument('--video', required=True, help='Path to video file')
     parser.add_argument('--tags', required=True, help='Comma-separated tags (e.g., "tag1,tag2,tag3")')
-    parser.add_argument('--account', required=True, help='Path to account cookie file')
+    parser.add_argument('--account', required=True,
+                        help='Path to account cookie file (with --platforms: "douyin=a.json,tiktok=b.json")')
     parser.add_argument('--publish-date', default='0', help='Publish date (YYYY-MM-DD HH:MM:SS) or 0 for immediate')
     parser.add_argument('--thumbnail', help='Path to thumbnail image (Douyin only)')
     parser.add_argument('--product-link', help='Product link (Douyin only)')
     parser.add_argument('--product-title', help='Product title (Douyin only)')
     parser.add_argument('--category', help='Video category (Tencent only)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Ignore the cookie validation cache and re-check the account in a browser')
     
     args = parser.parse_args()
     
@@ -171,11 +203,19 @@ async def main():
         print(f"Error: Video file not found: {args.video}")
         return
     
+    if args.platforms:
+        platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+        await upload_fanout(platforms, args, tags)
+        return
+    
     # Verify account file exists
     if not Path(args.account).exists():
         print(f"Warning: Account file not found: {args.account}")
         print("Will attempt to create it through login process...")
     
+    # Respect the account's posting budget (shared with other runs)
+    await acquire_post_token(args.platform, args.account)
+    
     # Upload to platform
     try:
         if args.platform == 'douyin':
@@ -187,7 +227,8 @@ async def main():
                 account_file=args.account,
                 thumbnail_path=args.thumbnail,
                 product_link=args.product_link or '',
-                product_title=args.product_title or ''
+                product_title=args.product_title or '',
+                revalidate=args.revalidate
             )
         elif args.platform == 'kuaishou':
             await upload_to_kuaishou(
@@ -195,7 +236,8 @@ async def main():
                 video_path=args.video,
                 tags=tags,
                 publish_date=publish_date,
-                account_file=args.account
+                account_file=args.account,
+                revalidate=args.revalidate
             )
         elif args.platform == 'tiktok':
             await upload_to_tiktok(
@@ -203,7 +245,8 @@ async def main():
                 video_path=args.video,
                 tags=tags,
                 publish_date=publish_date,
-                account_file=args.account
+                account_file=args.account,
+                revalidate=args.revalidate
             )
         elif args.platform == 'tencent':
             await upload_to_tencent(
@@ -212,7 +255,8 @@ async def main():
                 tags=tags,
                 publish_date=publish_date,
                 account_file=args.account,
-                category=args.category
+                category=args.category,
+                revalidate=args.revalidate
             )
         elif args.platform == 'xhs':
             await upload_to_xhs(
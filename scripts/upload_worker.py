@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Upload worker for multi-host batches
+Claims queued jobs (upload_from_config.py --enqueue) from a job store that
+several hosts share, e.g. jobs.db on a network volume, and uploads them on a
+local browser pool. Every claimed job is leased for a limited time and the
+worker's heartbeat keeps extending the lease; when a worker dies its jobs are
+claimed again by another one once the lease runs out. An account lease keeps
+each account (cookie file) on one job at a time. When a heartbeat shows that
+a lease was lost (missed beats, e.g. a stalled host), the upload holding it
+is cancelled, so two workers never post from one account at once.
+"""
+import asyncio
+import argparse
+import os
+import socket
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import (JOB_DB_JOURNAL_MODE, JOB_DB_PATH, WORKER_HEARTBEAT_SECONDS, WORKER_LEASE_SECONDS,
+                  WORKER_MAX_ATTEMPTS, WORKER_POLL_INTERVAL)
+from upload_from_config import upload_from_config
+from utils.browser_pool import BrowserPool
+from utils.job_store import ClaimedJob, JobStore
+from utils.upload_limiter import UploadLimiter
+
+
+class UploadWorker:
+    """
+    Claim and run queued upload jobs until stopped (or until the queue is empty with exit_when_idle)
+
+    Args:
+        job_store: Shared JobStore
+        worker_id: Lease owner name, unique per worker process
+        concurrency: Maximum jobs claimed and running at once
+        lease_seconds: Lease duration of a claimed job
+        heartbeat_seconds: How often the leases are renewed
+        max_attempts: Attempts after which a job whose lease expired is given up
+        poll_interval: Seconds between claim attempts while nothing is runnable
+        batch_id: Only run jobs of this batch
+        browser_max_uses: Recycle a pooled browser after this many uploads (0 = never)
+        revalidate: Ignore the cookie validation cache
+        exit_when_idle: Stop once no job can be claimed and none is running
+    """
+
+    def __init__(self, job_store: JobStore, worker_id: str, concurrency: int = 1,
+                 lease_seconds: float = WORKER_LEASE_SECONDS, heartbeat_seconds: float = WORKER_HEARTBEAT_SECONDS,
+                 max_attempts: int = WORKER_MAX_ATTEMPTS, poll_interval: float = WORKER_POLL_INTERVAL,
+                 batch_id: str = None, browser_max_uses: int = 20, revalidate: bool = False,
+                 exit_when_idle: bool = False):
+        self.job_store = job_store
+        self.worker_id = worker_id
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.batch_id = batch_id
+        self.browser_max_uses = browser_max_uses
+        self.revalidate = revalidate
+        self.exit_when_idle = exit_when_idle
+        self.limiter = UploadLimiter(concurrency=self.concurrency)
+        # (batch_id, idx) -> upload task
+        self.running = {}
+        self._revoked = set()
+        self.succeeded = 0
+        self.failed = 0
+        self.lost = 0
+        self._slot_freed = asyncio.Event()
+
+    def _revoke(self, key, reason: str):
+        """Cancel the upload of a job whose lease this worker no longer holds"""
+        task = self.running.get(key)
+        if task is not None and key not in self._revoked:
+            self._revoked.add(key)
+            print(f"⚠️  {key[0]}#{key[1]}: {reason}, cancelling the upload")
+            task.cancel()
+
+    async def _heartbeat(self):
+        renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                held = self.job_store.heartbeat(self.worker_id, self.lease_seconds)
+            except Exception as e:
+                # a missed beat is fine as long as the next one lands before the lease expires
+                print(f"⚠️  Heartbeat failed: {e}")
+                if time.monotonic() - renewed >= self.lease_seconds:
+                    for key in list(self.running):
+                        self._revoke(key, "lease could not be renewed in time")
+                continue
+            renewed = time.monotonic()
+            for key in list(self.running):
+                if key not in held:
+                    self._revoke(key, "lease lost to another worker")
+
+    async def _run(self, job: ClaimedJob, browser_pool: BrowserPool):
+        config = job.config
+        platform = config.get('platform')
+        label = f"{job.batch_id}#{job.idx} ({platform}, attempt {job.attempts})"
+        print(f"\n🔧 {self.worker_id} claimed {label}")
+        details = {}
+        try:
+            async with self.limiter.slot(platform, config.get('account', {}).get('cookie_file')):
+                success = await upload_from_config(config, browser_pool=browser_pool, revalidate=self.revalidate,
+                                                   details=details)
+            error = None if success else details.get('error') or 'Upload failed'
+        except asyncio.CancelledError:
+            if (job.batch_id, job.idx) not in self._revoked:
+                # worker shutdown: release_leases returns the job to the queue
+                raise
+            # may have been published already, so it is failed rather than requeued (if still ours)
+            error = 'Cancelled: lease lost while uploading'
+        except Exception as e:
+            error = str(e)
+        self._revoked.discard((job.batch_id, job.idx))
+        if not self.job_store.finish_claim(job, self.worker_id, error, details.get('video_id')):
+            self.lost += 1
+            print(f"⚠️  Lease on {label} was lost before it finished; outcome not recorded")
+        elif error is None:
+            self.succeeded += 1
+            print(f"✅ {label}")
+        else:
+            self.failed += 1
+            print(f"❌ {label}: {error}")
+
+    def _start(self, job: ClaimedJob, browser_pool: BrowserPool):
+        key = (job.batch_id, job.idx)
+        task = asyncio.create_task(self._run(job, browser_pool))
+        self.running[key] = task
+
+        def done(finished):
+            self.running.pop(key, None)
+            self._slot_freed.set()
+
+        task.add_done_callback(done)
+
+    async def run(self):
+        print(f"👷 Worker {self.worker_id}: {self.concurrency} slot(s), lease {self.lease_seconds:.0f}s, "
+              f"store {self.job_store.db_path}")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            async with BrowserPool(max_uses=self.browser_max_uses) as browser_pool:
+                while True:
+                    job = None
+                    if len(self.running) < self.concurrency:
+                        job = self.job_store.claim_job(self.worker_id, self.lease_seconds,
+                                                       max_attempts=self.max_attempts, batch_id=self.batch_id)
+                    if job is not None:
+                        self._start(job, browser_pool)
+                        continue
+                    if self.exit_when_idle and not self.running:
+                        break
+                    # wait for a free slot, or poll the queue again
+                    self._slot_freed.clear()
+                    try:
+                        await asyncio.wait_for(self._slot_freed.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            heartbeat.cancel()
+            for task in self.running.values():
+                task.cancel()
+            await asyncio.gather(heartbeat, *self.running.values(), return_exceptions=True)
+            released = self.job_store.release_leases(self.worker_id)
+            if released:
+                print(f"↩️  Returned {released} unfinished job(s) to the queue")
+        print(f"👋 Worker {self.worker_id} stopped: ✅ {self.succeeded} succeeded, ❌ {self.failed} failed"
+              + (f", ⚠️  {self.lost} lease(s) lost" if self.lost else ''))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Claim and upload queued jobs from a shared job store')
+    parser.add_argument('--job-db', default=JOB_DB_PATH, help='Shared SQLite job store (default: scripts/jobs.db)')
+    parser.add_argument('--journal-mode', default=JOB_DB_JOURNAL_MODE, choices=['WAL', 'DELETE'],
+                        help='SQLite journal mode; DELETE when the store is on a network share used by several hosts')
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help='Lease owner name (default: host-pid)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Jobs claimed and uploading at once (one per account, capped per platform)')
+    parser.add_argument('--lease-seconds', type=float, default=WORKER_LEASE_SECONDS,
+                        help=f'Lease on a claimed job, renewed by the heartbeat (default: {WORKER_LEASE_SECONDS})')
+    parser.add_argument('--heartbeat-seconds', type=float, default=WORKER_HEARTBEAT_SECONDS,
+                        help=f'Lease renewal period (default: {WORKER_HEARTBEAT_SECONDS})')
+    parser.add_argument('--max-attempts', type=int, default=WORKER_MAX_ATTEMPTS,
+                        help=f'Give up a job after its lease expired this many times (default: {WORKER_MAX_ATTEMPTS})')
+    parser.add_argument('--poll-interval', type=float, default=WORKER_POLL_INTERVAL,
+                        help=f'Seconds between queue polls while idle (default: {WORKER_POLL_INTERVAL})')
+    parser.add_argument('--batch-id', help='Only run jobs of this batch')
+    parser.add_argument('--exit-when-idle', action='store_true', help='Stop once the queue is empty')
+    parser.add_argument('--browser-max-uses', type=int, default=20,
+                        help='Relaunch a shared browser after N uploads (0 = never)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Ignore the cookie validation cache and re-check accounts in a browser')
+    args = parser.parse_args()
+
+    if args.heartbeat_seconds >= args.lease_seconds:
+        parser.error('--heartbeat-seconds must be shorter than --lease-seconds')
+
+    with JobStore(args.job_db, journal_mode=args.journal_mode) as job_store:
+        worker = UploadWorker(job_store, args.worker_id, concurrency=args.concurrency,
+                              lease_seconds=args.lease_seconds, heartbeat_seconds=args.heartbeat_seconds,
+                              max_attempts=args.max_attempts, poll_interval=args.poll_interval,
+                              batch_id=args.batch_id, browser_max_uses=args.browser_max_uses,
+                              revalidate=args.revalidate, exit_when_idle=args.exit_when_idle)
+        await worker.run()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n👋 Worker interrupted; its unfinished jobs went back to the queue")
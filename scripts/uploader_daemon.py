@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent uploader daemon
+Keeps Playwright and warm browsers alive and accepts upload jobs over a
+local Unix socket (or TCP port on a loopback address: the daemon has no
+authentication, so anyone who can connect can post with its accounts). Each request is one line of JSON in the
+same shape upload_from_config.load_config returns: a single config object,
+a fan-out config (platforms: [...]) or an array of configs (batch). Use upload_client.py to submit jobs.
+"""
+import asyncio
+import argparse
+import ipaddress
+import json
+import os
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import UPLOADER_DAEMON_SOCKET
+from upload_from_config import upload_from_config, batch_upload, expand_fanout
+from utils.browser_factory import get_launch_options, get_launch_stats, platform_context
+from utils.browser_pool import BrowserPool
+from utils.resource_blocking import get_blocking_stats
+from utils.selector_registry import save_stats as save_selector_stats
+from utils.upload_limiter import UploadLimiter
+
+# Platforms whose uploads run on the shared browser pool
+POOLED_PLATFORMS = ['douyin', 'kuaishou', 'tencent', 'tiktok']
+
+# Requests are single JSON lines; allow large batch configs
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+def is_loopback(host: str) -> bool:
+    """Whether a bind address only accepts connections from this machine"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class UploaderDaemon:
+    """
+    Serve upload jobs from a shared browser pool
+
+    Args:
+        browser_max_uses: Recycle a pooled browser after this many uploads (0 = never)
+        concurrency: Maximum uploads in flight across all connections
+    """
+
+    def __init__(self, browser_max_uses: int = 20, concurrency: int = 4):
+        self.browser_pool = BrowserPool(max_uses=browser_max_uses)
+        # 所有连接共用一个限流器，同一账号不会被两个请求同时登录
+        self.limiter = UploadLimiter(concurrency=concurrency)
+        self.started_at = time.time()
+        self.jobs_total = 0
+        self.jobs_running = 0
+        self._server = None
+        self._stopped = asyncio.Event()
+
+    async def warm_up(self, platforms: list):
+        """Launch the browsers for the given platforms before the first job arrives"""
+        await self.browser_pool.start()
+        for platform in platforms:
+            if platform not in POOLED_PLATFORMS:
+                print(f"⚠️  Cannot warm unknown platform: {platform}")
+                continue
+            engine, launch_options = get_launch_options(platform)
+            await self.browser_pool.warm_up(engine, launch_options)
+            print(f"🔥 Warmed {engine} for {platform}")
+
+    async def probe(self, platform: str) -> dict:
+        """Open and close a blank page on the platform's pooled browser (benchmark helper)"""
+        start = time.perf_counter()
+        async with platform_context(platform, browser_pool=self.browser_pool) as context:
+            page = await context.new_page()
+            await page.goto('about:blank')
+        return {'ok': True, 'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+    async def handle_request(self, request) -> dict:
+        if isinstance(request, dict) and 'platforms' in request:
+            # Fan-out config: one job per platform, run as a batch
+            request = expand_fanout(request)
+        if isinstance(request, list):
+            self.jobs_total += 1
+            self.jobs_running += 1
+            try:
+                return await batch_upload(request, browser_pool=self.browser_pool, limiter=self.limiter)
+            finally:
+                self.jobs_running -= 1
+                save_selector_stats()
+
+        action = request.get('action')
+        if action == 'ping':
+            return {'ok': True}
+        if action == 'stats':
+            return {
+                'ok': True,
+                'uptime_s': int(time.time() - self.started_at),
+                'jobs_total': self.jobs_total,
+                'jobs_running': self.jobs_running,
+                'browser_pool': self.browser_pool.stats(),
+                'browser_launches': get_launch_stats(),
+                'resource_blocking': get_blocking_stats(),
+            }
+        if action == 'probe':
+            return await self.probe(request.get('platform', 'douyin'))
+        if action == 'shutdown':
+            self._stopped.set()
+            return {'ok': True}
+        if action:
+            return {'ok': False, 'error': f"Unknown action: {action}"}
+
+        self.jobs_total += 1
+        self.jobs_running += 1
+        start = time.perf_counter()
+        try:
+            async with self.limiter.slot(request.get('platform'), request.get('account', {}).get('cookie_file')):
+                success = await upload_from_config(request, browser_pool=self.browser_pool)
+            return {'ok': True, 'success': success, 'elapsed_ms': int((time.perf_counter() - start) * 1000)}
+        finally:
+            self.jobs_running -= 1
+            save_selector_stats()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                response = await self.handle_request(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str = None, host: str = '127.0.0.1', port: int = None):
+        await self.browser_pool.start()
+        if port:
+            self._server = await asyncio.start_server(self.handle_connection, host, port, limit=STREAM_LIMIT)
+            print(f"✅ Uploader daemon listening on {host}:{port}")
+        else:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self._server = await asyncio.start_unix_server(self.handle_connection, socket_path, limit=STREAM_LIMIT)
+            print(f"✅ Uploader daemon listening on {socket_path}")
+        try:
+            async with self._server:
+                await self._stopped.wait()
+        finally:
+            await self.browser_pool.close()
+            if not port and os.path.exists(socket_path):
+                os.unlink(socket_path)
+            print("👋 Uploader daemon stopped")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Run the persistent uploader daemon')
+    parser.add_argument('--socket', default=UPLOADER_DAEMON_SOCKET, help='Unix socket path')
+    parser.add_argument('--port', type=int, help='Listen on TCP port (localhost) instead of a Unix socket')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='TCP bind address (with --port); loopback only, the daemon has no authentication')
+    parser.add_argument('--warm', default='',
+                        help='Comma-separated platforms whose browsers are launched at startup')
+    parser.add_argument('--browser-max-uses', type=int, default=20,
+                        help='Relaunch a shared browser after N uploads (0 = never)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Maximum uploads in flight (one per account, capped per platform)')
+
+    args = parser.parse_args()
+    if args.port and not is_loopback(args.host):
+        parser.error(f"--host {args.host} is not a loopback address; the daemon accepts jobs without "
+                     f"authentication. Tunnel to it (e.g. ssh -L) instead of exposing it.")
+
+    daemon = UploaderDaemon(browser_max_uses=args.browser_max_uses, concurrency=args.concurrency)
+    warm_platforms = [p.strip() for p in args.warm.split(',') if p.strip()]
+    await daemon.warm_up(warm_platforms)
+    await daemon.serve(socket_path=args.socket, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import List
 
@@ -22,3 +23,17 @@ async def set_init_script(context):
     stealth_js_path = Path(BASE_DIR / "utils/stealth.min.js")
     await context.add_init_script(path=stealth_js_path)
     return context
+
+
+async def run_upload(video, setup, account_file, browser_pool=None, revalidate=False) -> bool:
+    """
+    Validate the cookie and upload in one browser session. Only when the cookie
+    file is missing or expired fall back to `setup(handle=True)` (login) and a
+    regular upload.
+    """
+    if os.path.exists(account_file) and await video.validate_and_upload(browser_pool=browser_pool):
+        return True
+    if not await setup(account_file, handle=True, revalidate=revalidate):
+        return False
+    await video.main(browser_pool=browser_pool)
+    return True
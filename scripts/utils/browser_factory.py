@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Single entry point for launching browsers and creating contexts
+
+Every uploader, cookie check and login goes through here, so launch
+options (utils/browser_config), headless policy, stealth injection,
+resource blocking and context defaults live in one place, and browser
+start-up cost is measured in one place.
+
+Contexts are created for a stage: 'auth' (cookie checks), 'upload' or
+'login'; the stage selects the resource blocking rules (conf.RESOURCE_BLOCKING),
+and upload contexts get the in-page popup dismisser (utils/popup_dismisser).
+"""
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from playwright.async_api import async_playwright
+
+from conf import BASE_DIR, LOCAL_CHROME_PATH
+from utils.browser_config import get_platform_specific_config, setup_browser_context
+from utils.popup_dismisser import install_popup_dismisser
+from utils.resource_blocking import blocking_mode, install_resource_blocking
+
+STEALTH_JS_PATH = Path(BASE_DIR / "utils/stealth.min.js")
+
+# 启动耗时统计：engine -> {'launches': n, 'total_ms': ms, 'max_ms': ms}
+_launch_stats: Dict[str, Dict] = {}
+
+
+def resolve_headless(platform: str, headless: Optional[bool] = None) -> bool:
+    """
+    Headless policy: explicit argument, then UPLOADER_HEADLESS env var,
+    then the platform default from browser_config
+    """
+    if headless is not None:
+        return headless
+    env_value = os.environ.get('UPLOADER_HEADLESS')
+    if env_value is not None:
+        return env_value.strip().lower() in ('1', 'true', 'yes')
+    return get_platform_specific_config(platform)['headless']
+
+
+def get_launch_options(platform: str, headless: Optional[bool] = None) -> Tuple[str, Dict]:
+    """
+    Get browser engine and launch options for a platform
+
+    Returns:
+        (engine, launch options) tuple, e.g. ('chromium', {'headless': False, ...})
+    """
+    config = get_platform_specific_config(platform)
+    options = {
+        'headless': resolve_headless(platform, headless),
+        'args': list(config['args']),
+    }
+    # 系统 Chrome 只用于 chromium 平台（视频号需要系统 Chrome 才能播放 h264）
+    if config['browser'] == 'chromium' and LOCAL_CHROME_PATH:
+        options['executable_path'] = LOCAL_CHROME_PATH
+    return config['browser'], options
+
+
+def get_context_options(platform: str, **overrides) -> Dict:
+    """Context defaults for a platform merged with per-call overrides (e.g. storage_state)"""
+    options = dict(get_platform_specific_config(platform)['context_options'])
+    options.update(overrides)
+    return options
+
+
+def record_launch(engine: str, elapsed_ms: float):
+    stats = _launch_stats.setdefault(engine, {'launches': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    stats['launches'] += 1
+    stats['total_ms'] += elapsed_ms
+    stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+
+def get_launch_stats() -> Dict:
+    """Browser launch counts and timings per engine"""
+    return {
+        engine: dict(stats, avg_ms=stats['total_ms'] / stats['launches'])
+        for engine, stats in _launch_stats.items()
+    }
+
+
+async def launch_browser(playwright, engine: str, launch_options: Dict):
+    """Launch a browser and record how long start-up took"""
+    start = time.perf_counter()
+    browser = await getattr(playwright, engine).launch(**launch_options)
+    record_launch(engine, (time.perf_counter() - start) * 1000)
+    return browser
+
+
+async def prepare_context(context, platform: str, stage: str = 'upload'):
+    """Inject stealth and anti-detection scripts, the upload popup dismisser and the stage's resource blocking"""
+    context = await setup_browser_context(context, STEALTH_JS_PATH)
+    if stage == 'upload':
+        await install_popup_dismisser(context, platform)
+    mode = blocking_mode(stage)
+    if mode:
+        await install_resource_blocking(context, platform, mode)
+    return context
+
+
+async def new_platform_context(browser, platform: str, stage: str = 'upload', **context_options):
+    """Create a prepared context on an already-launched browser"""
+    context = await browser.new_context(**get_context_options(platform, **context_options))
+    return await prepare_context(context, platform, stage)
+
+
+async def launch_persistent_context(playwright, platform: str, user_data_dir, headless: Optional[bool] = None,
+                                    stage: str = 'upload'):
+    """Launch a persistent (user data dir) context with the platform's options"""
+    engine, launch_options = get_launch_options(platform, headless)
+    start = time.perf_counter()
+    context = await getattr(playwright, engine).launch_persistent_context(
+        user_data_dir, **launch_options, **get_context_options(platform))
+    record_launch(engine, (time.perf_counter() - start) * 1000)
+    return await prepare_context(context, platform, stage)
+
+
+@asynccontextmanager
+async def platform_context(platform: str, headless: Optional[bool] = None, browser_pool=None,
+                           stage: str = 'upload', **context_options):
+    """
+    Yield a prepared BrowserContext for a platform
+
+    Args:
+        platform: Platform name (douyin, kuaishou, tiktok, tencent, xhs)
+        headless: Override the headless policy (True for cookie checks, False for login)
+        browser_pool: Optional BrowserPool; without it a browser is launched for this context
+        stage: 'auth', 'upload' or 'login'; selects resource blocking
+        **context_options: Per-call context options (e.g. storage_state)
+    """
+    engine, launch_options = get_launch_options(platform, headless)
+    options = get_context_options(platform, **context_options)
+    if browser_pool is not None:
+        async with browser_pool.new_context(engine, launch_options, platform=platform, **options) as context:
+            yield await prepare_context(context, platform, stage)
+        return
+    async with async_playwright() as playwright:
+        browser = await launch_browser(playwright, engine, launch_options)
+        try:
+            context = await browser.new_context(**options)
+            try:
+                yield await prepare_context(context, platform, stage)
+            finally:
+                await context.close()
+        finally:
+            await browser.close()
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Shared browser pool for batch uploads
+
+Launching Chromium/Firefox is the most expensive part of an upload that does
+not touch the network. The pool keeps one browser per (engine, launch
+options) key alive across uploads and hands every upload a fresh
+BrowserContext, so cookies and storage never leak between items.
+Launch options come from utils.browser_factory.
+
+Long-lived browsers leak (renderer heap grows with every cover dialog,
+Draft.js editor and injected script), so a browser is recycled after
+max_uses contexts, after max_age seconds, or once its process tree passes
+max_rss_mb. Recycling drains: the browser takes no new contexts and closes
+when the last in-flight upload releases it. RSS is read from the process
+table (utils/process_tree) every sample_interval seconds; recycle counts
+and peak memory are reported per platform in stats().
+
+A Chromium browser reports its own pid over CDP. Other engines are told
+apart by diffing the driver's children around the launch, one launch at a
+time. Launches run outside the pool lock, so a slow launch for one key does
+not hold up acquires for the others.
+"""
+import asyncio
+import json
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Tuple
+
+from playwright.async_api import async_playwright, Browser
+
+from conf import BROWSER_MAX_AGE_SECONDS, BROWSER_MAX_RSS_MB, BROWSER_RSS_SAMPLE_INTERVAL
+from utils.browser_factory import launch_browser
+from utils.log import browser_pool_logger
+from utils.process_tree import browser_rss
+
+MB = 1048576
+
+# Why a browser was recycled
+RECYCLE_REASONS = ('uses', 'age', 'rss', 'disconnected')
+
+
+def _browser_rss() -> Dict[int, int]:
+    """Browser pid -> RSS of its process tree; empty where `ps` is unavailable"""
+    try:
+        return browser_rss()
+    except (OSError, subprocess.SubprocessError):
+        return {}
+
+
+class PooledBrowser:
+    """A launched browser plus its bookkeeping inside the pool"""
+
+    def __init__(self, key: Tuple, browser: Browser, pid: Optional[int] = None):
+        self.key = key
+        self.browser = browser
+        self.pid = pid
+        self.launch_options = {}
+        self.launched_at = time.monotonic()
+        self.uses = 0
+        self.in_use = 0
+        self.retired = False
+        self.retire_reason: Optional[str] = None
+        self.rss = 0
+        self.peak_rss = 0
+        self.platforms: Set[str] = set()
+
+
+class BrowserPool:
+    """
+    Reuse launched browsers across uploads
+
+    Args:
+        max_uses: Recycle a browser after it served this many contexts
+                  (0 disables recycling)
+        max_age: Recycle a browser this many seconds after its launch (0 = never)
+        max_rss_mb: Recycle a browser whose process tree uses more memory (0 = never)
+        sample_interval: Seconds between RSS samples (0 disables sampling and the RSS limit)
+    """
+
+    def __init__(self, max_uses: int = 20, max_age: float = BROWSER_MAX_AGE_SECONDS,
+                 max_rss_mb: float = BROWSER_MAX_RSS_MB, sample_interval: float = BROWSER_RSS_SAMPLE_INTERVAL):
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.max_rss_mb = max_rss_mb
+        self.sample_interval = sample_interval
+        self._playwright_manager = None
+        self._playwright = None
+        self._browsers: Dict[Tuple, PooledBrowser] = {}
+        # key -> future of the browser being launched for it
+        self._launching: Dict[Tuple, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._diff_lock = asyncio.Lock()
+        self._sampler = None
+        self.launch_count = 0
+        self.recycled = {reason: 0 for reason in RECYCLE_REASONS}
+        # platform -> uses, recycled, peak_rss (bytes) of the browsers it ran on
+        self.platform_stats: Dict[str, Dict[str, int]] = {}
+
+    async def start(self):
+        if self._playwright is None:
+            self._playwright_manager = async_playwright()
+            self._playwright = await self._playwright_manager.start()
+            if self.sample_interval:
+                self._sampler = asyncio.ensure_future(self._sample_loop())
+        return self
+
+    async def close(self):
+        if self._sampler is not None:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+        async with self._lock:
+            entries = list(self._browsers.values())
+            self._browsers.clear()
+        for entry in entries:
+            await self._close_browser(entry)
+        if self._playwright_manager is not None:
+            await self._playwright_manager.__aexit__(None, None, None)
+            self._playwright_manager = None
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def playwright(self):
+        return self._playwright
+
+    @staticmethod
+    async def _chromium_pid(browser: Browser) -> Optional[int]:
+        """Pid of the browser process, as reported by Chromium itself"""
+        session = await browser.new_browser_cdp_session()
+        try:
+            info = await session.send('SystemInfo.getProcessInfo')
+        finally:
+            await session.detach()
+        return next((process['id'] for process in info.get('processInfo', []) if process.get('type') == 'browser'),
+                    None)
+
+    async def _launch(self, engine: str, launch_options: Dict) -> Tuple[Browser, Optional[int]]:
+        """Launch a browser; also returns its pid when memory sampling is on"""
+        self.launch_count += 1
+        if not self.sample_interval:
+            return await launch_browser(self._playwright, engine, launch_options), None
+        if engine == 'chromium':
+            browser = await launch_browser(self._playwright, engine, launch_options)
+            try:
+                pid = await self._chromium_pid(browser)
+            except Exception as e:
+                browser_pool_logger.warning(f"Cannot read the browser pid over CDP: {e}")
+                pid = None
+        else:
+            # no CDP: the new child of the driver is this browser, as long as no other launch overlaps
+            loop = asyncio.get_running_loop()
+            async with self._diff_lock:
+                before = await loop.run_in_executor(None, _browser_rss)
+                browser = await launch_browser(self._playwright, engine, launch_options)
+                new = set(await loop.run_in_executor(None, _browser_rss)) - set(before)
+            pid = new.pop() if len(new) == 1 else None
+        if pid is None:
+            browser_pool_logger.warning(f"Pid of the new {engine} browser unknown: no memory limit for it")
+        return browser, pid
+
+    def _platform_stats(self, platform: str) -> Dict[str, int]:
+        return self.platform_stats.setdefault(platform, {'uses': 0, 'recycled': 0, 'peak_rss': 0})
+
+    def _retire(self, entry: PooledBrowser, reason: str):
+        """Stop handing out the browser; it closes once its in-flight contexts are released"""
+        if entry.retired:
+            return
+        entry.retired = True
+        entry.retire_reason = reason
+        self.recycled[reason] += 1
+        for platform in entry.platforms:
+            self._platform_stats(platform)['recycled'] += 1
+
+    def _check_limits(self, entry: PooledBrowser):
+        if self.max_uses and entry.uses >= self.max_uses:
+            self._retire(entry, 'uses')
+        elif self.max_age and time.monotonic() - entry.launched_at >= self.max_age:
+            self._retire(entry, 'age')
+        elif self.max_rss_mb and entry.rss > self.max_rss_mb * MB:
+            self._retire(entry, 'rss')
+
+    async def sample(self):
+        """Read the RSS of every pooled browser, update the peaks and recycle the ones over their limits"""
+        rss = await asyncio.get_running_loop().run_in_executor(None, _browser_rss)
+        idle = []
+        async with self._lock:
+            for entry in list(self._browsers.values()):
+                if entry.pid in rss:
+                    entry.rss = rss[entry.pid]
+                    entry.peak_rss = max(entry.peak_rss, entry.rss)
+                    for platform in entry.platforms:
+                        stats = self._platform_stats(platform)
+                        stats['peak_rss'] = max(stats['peak_rss'], entry.rss)
+                self._check_limits(entry)
+                if entry.retired and entry.in_use == 0:
+                    # nothing to drain: close now instead of at the next acquire
+                    del self._browsers[entry.key]
+                    idle.append(entry)
+        for entry in idle:
+            await self._close_browser(entry)
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            try:
+                await self.sample()
+            except Exception as e:
+                browser_pool_logger.warning(f"Browser memory sampling failed: {e}")
+
+    async def _close_browser(self, entry: PooledBrowser):
+        try:
+            await entry.browser.close()
+        except Exception:
+            pass
+
+    async def _acquire(self, engine: str, launch_options: Dict, platform: str = None,
+                       count_use: bool = True) -> PooledBrowser:
+        """
+        Hand out the browser for a key, launching it when there is none or it is being recycled
+
+        Args:
+            count_use: Count this as a use towards max_uses and the platform stats (False for warm-up)
+        """
+        await self.start()
+        key = (engine, json.dumps(launch_options, sort_keys=True))
+        while True:
+            stale = None
+            async with self._lock:
+                entry = self._browsers.get(key)
+                if entry is not None and not entry.browser.is_connected():
+                    self._retire(entry, 'disconnected')
+                elif entry is not None:
+                    self._check_limits(entry)
+                if entry is not None and not entry.retired:
+                    entry.in_use += 1
+                    if count_use:
+                        entry.uses += 1
+                        if platform:
+                            entry.platforms.add(platform)
+                            self._platform_stats(platform)['uses'] += 1
+                        if self.max_uses and entry.uses >= self.max_uses:
+                            # 达到使用上限：不再分配新任务，等现有任务结束后关闭
+                            self._retire(entry, 'uses')
+                    return entry
+                launching = self._launching.get(key)
+                if launching is None:
+                    launching = self._launching[key] = asyncio.get_running_loop().create_future()
+                    launcher = True
+                    if entry is not None and entry.in_use == 0:
+                        del self._browsers[key]
+                        stale = entry
+                else:
+                    launcher = False
+            if not launcher:
+                # someone else is launching this key: wait for it, then take it like any other entry
+                try:
+                    await asyncio.shield(launching)
+                except asyncio.CancelledError:
+                    if not launching.cancelled():
+                        raise
+                    # the launcher was cancelled, not this acquire: launch again
+                continue
+            try:
+                if stale is not None:
+                    await self._close_browser(stale)
+                browser, pid = await self._launch(engine, launch_options)
+            except BaseException as e:
+                self._launching.pop(key, None)
+                if isinstance(e, asyncio.CancelledError):
+                    launching.cancel()
+                else:
+                    launching.set_exception(e)
+                    # retrieved here so that a launch nobody waited for does not log "exception never retrieved"
+                    launching.exception()
+                raise
+            # no await between the launch and the hand-over, so a cancellation cannot strand the waiters
+            entry = PooledBrowser(key, browser, pid)
+            entry.launch_options = launch_options
+            self._browsers[key] = entry
+            self._launching.pop(key, None)
+            launching.set_result(entry)
+
+    async def _release(self, entry: PooledBrowser):
+        async with self._lock:
+            entry.in_use -= 1
+            should_close = entry.retired and entry.in_use == 0
+            if should_close and self._browsers.get(entry.key) is entry:
+                del self._browsers[entry.key]
+        if should_close:
+            await self._close_browser(entry)
+
+    async def warm_up(self, engine: str, launch_options: Dict):
+        """Launch the browser for a key ahead of the first upload (not counted as a use)"""
+        entry = await self._acquire(engine, launch_options, count_use=False)
+        await self._release(entry)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            'launch_count': self.launch_count,
+            'recycled': dict(self.recycled),
+            'platforms': {
+                platform: {'uses': stats['uses'], 'recycled': stats['recycled'],
+                           'peak_rss_mb': round(stats['peak_rss'] / MB, 1)}
+                for platform, stats in sorted(self.platform_stats.items())
+            },
+            'browsers': [
+                {'engine': entry.key[0],
+                 'executable_path': entry.launch_options.get('executable_path', ''),
+                 'headless': entry.launch_options.get('headless'),
+                 'uses': entry.uses, 'in_use': entry.in_use,
+                 'pid': entry.pid, 'age_s': int(now - entry.launched_at),
+                 'rss_mb': round(entry.rss / MB, 1), 'peak_rss_mb': round(entry.peak_rss / MB, 1),
+                 'platforms': sorted(entry.platforms), 'draining': entry.retired}
+                for entry in self._browsers.values()
+            ],
+        }
+
+    @asynccontextmanager
+    async def new_context(self, engine: str, launch_options: Dict, platform: str = None, **context_options):
+        """
+        Yield a fresh BrowserContext on a pooled browser
+
+        Args:
+            engine: Playwright browser type (chromium, firefox, webkit)
+            launch_options: Launch options from browser_factory.get_launch_options
+            platform: Platform the context is for (per-platform statistics)
+            **context_options: Passed to browser.new_context (e.g. storage_state)
+        """
+        entry = await self._acquire(engine, launch_options, platform)
+        context = None
+        try:
+            context = await entry.browser.new_context(**context_options)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._release(entry)
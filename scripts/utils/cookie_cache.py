@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of cookie validation verdicts
+
+`cookie_auth` needs a full browser round-trip. The verdict is stored in a
+small JSON index next to the cookie directory, keyed by the cookie file's
+absolute path and guarded by its mtime and content hash, so any change to
+the cookie file (login, storage_state refresh) invalidates the entry.
+
+Batches, upload workers and the daemon update the index from several
+processes, so every read-modify-write holds an exclusive file lock and
+writes through its own temporary file.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from conf import BASE_DIR, COOKIE_VALIDATION_TTL
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+CACHE_FILE = Path(BASE_DIR / "cookies" / "validation_cache.json")
+LOCK_FILE = CACHE_FILE.with_suffix('.lock')
+
+
+@contextmanager
+def _index_lock():
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _file_fingerprint(account_file: str):
+    stat = os.stat(account_file)
+    digest = hashlib.sha256(Path(account_file).read_bytes()).hexdigest()
+    return stat.st_mtime, digest
+
+
+def _load_index() -> dict:
+    try:
+        return json.loads(CACHE_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_index(index: dict):
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # a temporary file per writer: a shared name can be replaced away under another process
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=CACHE_FILE.parent, prefix=CACHE_FILE.stem + '.',
+                                     suffix='.tmp', delete=False) as tmp_file:
+        json.dump(index, tmp_file, ensure_ascii=False, indent=2)
+    try:
+        os.replace(tmp_file.name, CACHE_FILE)
+    except OSError:
+        os.unlink(tmp_file.name)
+        raise
+
+
+def get_cached_verdict(platform: str, account_file: str) -> Optional[bool]:
+    """
+    Return the cached verdict for a cookie file, or None on a miss
+
+    Args:
+        platform: Platform name (douyin, kuaishou, tencent, tiktok)
+        account_file: Path to cookie file
+    """
+    ttl = COOKIE_VALIDATION_TTL.get(platform, 0)
+    if not ttl or not os.path.exists(account_file):
+        return None
+    entry = _load_index().get(os.path.abspath(account_file))
+    if not entry or entry.get('platform') != platform:
+        return None
+    if time.time() - entry.get('checked_at', 0) > ttl:
+        return None
+    mtime, digest = _file_fingerprint(account_file)
+    if entry.get('mtime') != mtime or entry.get('sha256') != digest:
+        return None
+    return entry.get('valid')
+
+
+def record_verdict(platform: str, account_file: str, valid: bool):
+    """
+    Store the latest validation verdict for a cookie file
+
+    The cache is only an optimization: a failed write is reported and
+    dropped, never raised, since it often runs right after a publish.
+    """
+    try:
+        if not os.path.exists(account_file):
+            return
+        mtime, digest = _file_fingerprint(account_file)
+        with _index_lock():
+            index = _load_index()
+            index[os.path.abspath(account_file)] = {
+                'platform': platform,
+                'valid': bool(valid),
+                'checked_at': time.time(),
+                'mtime': mtime,
+                'sha256': digest,
+            }
+            _save_index(index)
+    except OSError as e:
+        print(f"⚠️  Could not update the cookie validation cache: {e}")
+
+
+async def check_cookie(platform: str, account_file: str, auth, revalidate: bool = False) -> bool:
+    """
+    Validate a cookie file, answering from the cache when possible
+
+    Args:
+        platform: Platform name
+        account_file: Path to cookie file
+        auth: Async browser check, e.g. the platform's cookie_auth
+        revalidate: Ignore the cache and always run the browser check
+
+    Returns:
+        True if cookie is valid
+    """
+    if not revalidate:
+        cached = get_cached_verdict(platform, account_file)
+        if cached is not None:
+            print(f"[+] cookie 校验命中缓存: {'有效' if cached else '失效'}")
+            return cached
+    valid = await auth(account_file)
+    record_verdict(platform, account_file, valid)
+    return valid
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Drop-folder watcher for watch mode
+
+Yields each .mp4 that lands in the watched directories once it is complete:
+the video and its .txt sidecar (title on the first line, #tags on the
+second, see files_times.get_title_and_hashtags) must both exist and keep the
+same size and mtime for settle_seconds, so half-copied files and videos
+whose sidecar is still being written are not picked up.
+
+On Linux the directories are watched with inotify (through ctypes, no extra
+dependency): nothing is scanned while the inbox is idle. Elsewhere, or when
+inotify cannot be set up, the directories are rescanned every poll_interval
+seconds. Paths in `seen` are skipped without being stat'ed, so a restart
+with a large, already-handled inbox only lists the directories once.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from conf import WATCH_POLL_INTERVAL, WATCH_SETTLE_SECONDS
+from utils.files_times import get_title_and_hashtags
+
+VIDEO_SUFFIX = '.mp4'
+SIDECAR_SUFFIX = '.txt'
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class ReadyVideo(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+    title: Optional[str]
+    tags: List[str]
+
+
+def sidecar_path(video_path: str) -> str:
+    return video_path[:-len(VIDEO_SUFFIX)] + SIDECAR_SUFFIX
+
+
+def _signature(path: str):
+    """(size, mtime) of the video and its sidecar; sidecar entries are None while it is missing"""
+    video = os.stat(path)
+    try:
+        sidecar = os.stat(sidecar_path(path))
+        return video.st_size, video.st_mtime, sidecar.st_size, sidecar.st_mtime
+    except FileNotFoundError:
+        return video.st_size, video.st_mtime, None, None
+
+
+class _Inotify:
+    """Minimal inotify binding: file names of create/write/move events per watched directory"""
+
+    def __init__(self, directories: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+            self.directories[wd] = directory
+
+    def read(self):
+        """
+        Drain pending events
+
+        Returns:
+            (changed paths, overflow flag: events were lost and the directories need a rescan)
+        """
+        paths, overflow = set(), False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return paths, overflow
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif name and wd in self.directories:
+                    paths.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class InboxWatcher:
+    """
+    Async iterator over completed videos in one or more drop folders
+
+    Args:
+        directories: Folders to watch (not recursive)
+        seen: Video paths already handled; they are never yielded
+        settle_seconds: How long video and sidecar must stay unchanged
+        poll_interval: Rescan period without inotify
+        use_inotify: Set to False to force mtime polling
+        require_sidecar: Wait for the .txt sidecar; otherwise a video without one is yielded with title None
+        once: Only handle the files present at start, then stop once none of them is pending
+    """
+
+    def __init__(self, directories: Iterable[str], seen: Set[str] = None,
+                 settle_seconds: float = WATCH_SETTLE_SECONDS, poll_interval: float = WATCH_POLL_INTERVAL,
+                 use_inotify: bool = True, require_sidecar: bool = True, once: bool = False):
+        self.directories = [str(Path(directory).resolve()) for directory in directories]
+        self.seen = seen if seen is not None else set()
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.require_sidecar = require_sidecar
+        self.once = once
+        self.use_inotify = use_inotify and sys.platform.startswith('linux') and not once
+        # path -> (last signature, monotonic time it was first seen with that signature)
+        self._pending: Dict[str, tuple] = {}
+        # sidecar signatures already reported as unreadable, to warn once per version
+        self._bad_sidecars: Dict[str, tuple] = {}
+        self._inotify: Optional[_Inotify] = None
+        self._wakeup = asyncio.Event()
+        self._last_scan = 0.0
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self._inotify is not None else 'polling'
+
+    def _candidate(self, path: str) -> Optional[str]:
+        """Video path a changed file belongs to, or None when it is not a new video or sidecar"""
+        name = os.path.basename(path)
+        if name.startswith('.'):
+            # editors and rsync write to hidden temporary files first
+            return None
+        if name.endswith(SIDECAR_SUFFIX):
+            path = path[:-len(SIDECAR_SUFFIX)] + VIDEO_SUFFIX
+        elif not name.endswith(VIDEO_SUFFIX):
+            return None
+        return None if path in self.seen else path
+
+    def _scan(self):
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                print(f"⚠️  Watch folder missing: {directory}")
+                continue
+            for entry in entries:
+                path = self._candidate(entry.path)
+                if path is not None and path not in self._pending and os.path.exists(path):
+                    self._pending[path] = (None, 0.0)
+        self._last_scan = time.monotonic()
+
+    def _start(self):
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify(self.directories)
+                asyncio.get_running_loop().add_reader(self._inotify.fd, self._on_inotify)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️  inotify unavailable ({e}), polling every {self.poll_interval}s")
+                self._inotify = None
+        # inotify only reports what happens from now on; files already in the inbox come from one scan
+        self._scan()
+
+    def _on_inotify(self):
+        paths, overflow = self._inotify.read()
+        if overflow:
+            self._scan()
+        for changed in paths:
+            path = self._candidate(changed)
+            if path is not None and path not in self._pending:
+                self._pending[path] = (None, 0.0)
+        self._wakeup.set()
+
+    def close(self):
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+
+    def _read_sidecar(self, path: str, signature: tuple):
+        """(title, tags) from the sidecar, or None while it is missing or unreadable"""
+        if signature[2] is None:
+            return None
+        try:
+            title, tags = get_title_and_hashtags(path)
+        except (OSError, UnicodeDecodeError, IndexError) as e:
+            if self._bad_sidecars.get(path) != signature:
+                self._bad_sidecars[path] = signature
+                print(f"⚠️  Cannot read {sidecar_path(path)} (expected title line and #tags line): {e}")
+            return None
+        self._bad_sidecars.pop(path, None)
+        return title.strip(), [tag for tag in tags if tag]
+
+    def _check_pending(self) -> List[ReadyVideo]:
+        """Videos whose files have settled; they leave the pending set"""
+        ready, now = [], time.monotonic()
+        for path, (last, since) in list(self._pending.items()):
+            try:
+                signature = _signature(path)
+            except FileNotFoundError:
+                # moved away or deleted before it settled
+                del self._pending[path]
+                continue
+            if signature != last:
+                self._pending[path] = (signature, now)
+                continue
+            if now - since < self.settle_seconds:
+                continue
+            metadata = self._read_sidecar(path, signature)
+            if metadata is None and self.require_sidecar:
+                if self.once:
+                    print(f"⏭️  No usable sidecar for {path}, skipped")
+                    del self._pending[path]
+                continue
+            title, tags = metadata or (None, [])
+            del self._pending[path]
+            self.seen.add(path)
+            ready.append(ReadyVideo(path, signature[0], signature[1], title, tags))
+        return ready
+
+    def _next_wait(self) -> Optional[float]:
+        """Seconds until the next check; None = only an inotify event can change anything"""
+        check = min(self.settle_seconds / 2, self.poll_interval) if self._pending else None
+        if self._inotify is not None:
+            return check
+        scan = max(0.0, self._last_scan + self.poll_interval - time.monotonic())
+        return scan if check is None else min(scan, check)
+
+    async def __aiter__(self):
+        self._start()
+        try:
+            while True:
+                for video in self._check_pending():
+                    yield video
+                if self.once and not self._pending:
+                    return
+                wait = self._next_wait()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                if self._inotify is None and not self.once and \
+                        time.monotonic() - self._last_scan >= self.poll_interval:
+                    self._scan()
+        finally:
+            self.close()
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Crash-safe job store for batch uploads
+
+Every batch item becomes a row in a local SQLite database before any browser
+is started, and its state is committed on every transition
+(pending -> running -> succeeded/failed). A batch that dies halfway can be
+resumed: succeeded jobs are skipped, jobs left in running by the crashed
+process go back to pending. Failed jobs are only retried on request and up
+to an attempts limit, since many failures happen after publish was clicked.
+
+Watch mode (watch_inbox.py) appends jobs to one long-lived batch as videos
+arrive and records every enqueued file in seen_files, so a restart neither
+re-posts nor re-examines files it has already handled.
+
+Worker mode (upload_worker.py) lets several hosts share one store: a worker
+claims a job under a time-bounded lease that its heartbeat keeps extending,
+a job whose lease ran out (dead or partitioned worker) is claimed again, and
+an account lease keeps each account (cookie file) on one job at a time. The
+heartbeat reports which jobs are still held, so a worker that missed its
+lease stops the upload instead of racing the worker that took it over.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from conf import JOB_DB_JOURNAL_MODE, JOB_DB_PATH, JOB_MAX_ATTEMPTS
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Source prefix of batches queued for upload workers; other batches run in the process that created them
+QUEUE_SOURCE_PREFIX = 'queue:'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    config_digest TEXT NOT NULL,
+    source TEXT,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    batch_id TEXT NOT NULL REFERENCES batches(id),
+    idx INTEGER NOT NULL,
+    platform TEXT,
+    account_file TEXT,
+    config TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    video_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    PRIMARY KEY (batch_id, idx)
+);
+CREATE TABLE IF NOT EXISTS seen_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    batch_id TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account_leases (
+    account_file TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_batches_digest ON batches(config_digest, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(batch_id, state);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(state, created_at);
+"""
+
+# Columns added after the first release: name -> definition, added to older databases on open
+JOB_COLUMNS = {
+    'lease_owner': 'TEXT',
+    'lease_expires': 'REAL',
+}
+
+
+class ClaimedJob(NamedTuple):
+    batch_id: str
+    idx: int
+    config: dict
+    attempts: int
+
+
+def config_digest(config_list: list) -> str:
+    """Stable hash of a batch configuration, used to find the batch to resume"""
+    canonical = json.dumps(config_list, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def account_key(config: dict) -> Optional[str]:
+    """Absolute path of the item's cookie file, so one account leases the same row however it was spelled"""
+    account_file = config.get('account', {}).get('cookie_file')
+    return os.path.abspath(account_file) if account_file else None
+
+
+class JobStore:
+    """
+    SQLite-backed batch job states
+
+    Args:
+        db_path: Database file (default: conf.JOB_DB_PATH)
+        journal_mode: SQLite journal mode (default: conf.JOB_DB_JOURNAL_MODE)
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH, journal_mode: str = JOB_DB_JOURNAL_MODE):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f'PRAGMA journal_mode={journal_mode}')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(jobs)')}
+        for name, definition in JOB_COLUMNS.items():
+            if name not in columns:
+                self.conn.execute(f'ALTER TABLE jobs ADD COLUMN {name} {definition}')
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def create_batch(self, config_list: list, source: str = None) -> str:
+        """Insert a batch and one pending job per config item; returns the batch id"""
+        batch_id = time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                'INSERT INTO batches (id, config_digest, source, total, created_at) VALUES (?, ?, ?, ?, ?)',
+                (batch_id, config_digest(config_list), source, len(config_list), now))
+            self.conn.executemany(
+                'INSERT INTO jobs (batch_id, idx, platform, account_file, config, state, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(batch_id, idx, config.get('platform'), account_key(config),
+                  json.dumps(config, ensure_ascii=False, default=str), PENDING, now, now)
+                 for idx, config in enumerate(config_list, 1)])
+        return batch_id
+
+    def latest_batch(self, source: str) -> Optional[str]:
+        """Latest batch created with the given source, or None"""
+        row = self.conn.execute(
+            'SELECT id FROM batches WHERE source = ? ORDER BY created_at DESC LIMIT 1', (source,)).fetchone()
+        return row['id'] if row else None
+
+    def add_file_jobs(self, batch_id: str, path: str, size: int, mtime: float, config_list: list) -> List[int]:
+        """
+        Append one pending job per config item to a batch and mark the file as seen, in one transaction
+
+        Returns:
+            Indexes of the new jobs
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            last = self.conn.execute('SELECT COALESCE(MAX(idx), 0) FROM jobs WHERE batch_id = ?',
+                                     (batch_id,)).fetchone()[0]
+            indexes = list(range(last + 1, last + 1 + len(config_list)))
+            self.conn.executemany(
+                'INSERT INTO jobs (batch_id, idx, platform, account_file, config, state, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(batch_id, idx, config.get('platform'), account_key(config),
+                  json.dumps(config, ensure_ascii=False, default=str), PENDING, now, now)
+                 for idx, config in zip(indexes, config_list)])
+            self.conn.execute('UPDATE batches SET total = total + ? WHERE id = ?', (len(config_list), batch_id))
+            self.conn.execute(
+                'INSERT OR REPLACE INTO seen_files (path, size, mtime, batch_id, seen_at) VALUES (?, ?, ?, ?, ?)',
+                (path, size, mtime, batch_id, now))
+        return indexes
+
+    def seen_paths(self) -> Set[str]:
+        """Paths of all files already handled by watch mode"""
+        return {row['path'] for row in self.conn.execute('SELECT path FROM seen_files')}
+
+    def find_batch(self, config_list: list) -> Optional[str]:
+        """Latest batch created from the same configuration, or None"""
+        row = self.conn.execute(
+            'SELECT id FROM batches WHERE config_digest = ? ORDER BY created_at DESC LIMIT 1',
+            (config_digest(config_list),)).fetchone()
+        return row['id'] if row else None
+
+    def requeue_stale(self, batch_id: str) -> int:
+        """Move jobs left in running (crashed process) back to pending; returns how many"""
+        now = time.time()
+        # jobs under a live worker lease are still running somewhere else
+        cursor = self.conn.execute(
+            'UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+            'WHERE batch_id = ? AND state = ? AND (lease_expires IS NULL OR lease_expires < ?)',
+            (PENDING, now, batch_id, RUNNING, now))
+        return cursor.rowcount
+
+    def claim_job(self, owner: str, lease_seconds: float, max_attempts: int = 3,
+                  batch_id: str = None) -> Optional[ClaimedJob]:
+        """
+        Lease the oldest runnable job to a worker
+
+        Runnable are pending jobs of queued batches (source starting with
+        QUEUE_SOURCE_PREFIX) and running jobs whose lease expired, skipping
+        accounts under a live lease, including the owner's own: a worker does
+        not stack jobs of an account it is already uploading. The job and its
+        account are leased to owner for lease_seconds; expired jobs that
+        already used max_attempts are failed instead of being claimed again.
+
+        Args:
+            owner: Worker id
+            lease_seconds: Lease duration; extend it with heartbeat()
+            max_attempts: Attempts after which an expired job is given up
+            batch_id: Only claim jobs of this batch
+
+        Returns:
+            ClaimedJob or None when nothing can be claimed right now
+        """
+        now = time.time()
+        batch_filter, batch_args = ('AND j.batch_id = ?', (batch_id,)) if batch_id else ('', ())
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.execute(
+                'UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, lease_expires = NULL, '
+                'finished_at = ?, updated_at = ? WHERE state = ? AND lease_expires < ? AND attempts >= ?',
+                (FAILED, f'Lease expired after {max_attempts} attempt(s)', now, now, RUNNING, now, max_attempts))
+            row = self.conn.execute(
+                'SELECT j.batch_id, j.idx, j.account_file, j.config, j.attempts FROM jobs j '
+                'LEFT JOIN account_leases a ON a.account_file = j.account_file AND a.expires >= ? '
+                'WHERE (j.state = ? OR (j.state = ? AND j.lease_expires < ?)) AND a.account_file IS NULL '
+                "AND j.batch_id IN (SELECT id FROM batches WHERE source LIKE ? || '%') "
+                f'{batch_filter} ORDER BY j.created_at, j.batch_id, j.idx LIMIT 1',
+                (now, PENDING, RUNNING, now, QUEUE_SOURCE_PREFIX) + batch_args).fetchone()
+            if row is None:
+                return None
+            expires = now + lease_seconds
+            self.conn.execute(
+                'UPDATE jobs SET state = ?, attempts = attempts + 1, error = NULL, lease_owner = ?, '
+                'lease_expires = ?, started_at = ?, updated_at = ? WHERE batch_id = ? AND idx = ?',
+                (RUNNING, owner, expires, now, now, row['batch_id'], row['idx']))
+            if row['account_file']:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO account_leases (account_file, owner, expires) VALUES (?, ?, ?)',
+                    (row['account_file'], owner, expires))
+        return ClaimedJob(row['batch_id'], row['idx'], json.loads(row['config']), row['attempts'] + 1)
+
+    def heartbeat(self, owner: str, lease_seconds: float) -> Set[Tuple[str, int]]:
+        """
+        Extend the leases owner still holds
+
+        A job is still held while owner holds both its lease and its account's
+        lease. A job whose lease or account lease expired and was claimed by
+        another worker is not extended.
+
+        Returns:
+            (batch_id, idx) of the jobs still held; the owner must stop any other job it runs
+        """
+        now = time.time()
+        expires = now + lease_seconds
+        held = ('lease_owner = ? AND state = ? AND (account_file IS NULL OR account_file IN '
+                '(SELECT account_file FROM account_leases WHERE owner = ?))')
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.execute('UPDATE account_leases SET expires = ? WHERE owner = ?', (expires, owner))
+            self.conn.execute(f'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE {held}',
+                              (expires, now, owner, RUNNING, owner))
+            rows = self.conn.execute(f'SELECT batch_id, idx FROM jobs WHERE {held}',
+                                     (owner, RUNNING, owner)).fetchall()
+        return {(row['batch_id'], row['idx']) for row in rows}
+
+    def finish_claim(self, job: ClaimedJob, owner: str, error: str = None, video_id: str = None) -> bool:
+        """
+        Record the outcome of a claimed job and release its leases
+
+        Returns:
+            False when the lease was lost (expired and claimed by another worker); nothing is written then
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            cursor = self.conn.execute(
+                'UPDATE jobs SET state = ?, error = ?, video_id = ?, lease_owner = NULL, lease_expires = NULL, '
+                'finished_at = ?, updated_at = ? WHERE batch_id = ? AND idx = ? AND lease_owner = ?',
+                (FAILED if error else SUCCEEDED, error, video_id, now, now, job.batch_id, job.idx, owner))
+            # keep the account while this worker still runs another job on it
+            self.conn.execute(
+                'DELETE FROM account_leases WHERE owner = ? AND account_file NOT IN '
+                '(SELECT account_file FROM jobs WHERE lease_owner = ? AND state = ? AND account_file IS NOT NULL)',
+                (owner, owner, RUNNING))
+        return cursor.rowcount == 1
+
+    def release_leases(self, owner: str) -> int:
+        """Put the jobs still leased by owner back to pending (clean worker shutdown); returns how many"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            cursor = self.conn.execute(
+                'UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+                'WHERE lease_owner = ? AND state = ?', (PENDING, now, owner, RUNNING))
+            self.conn.execute('DELETE FROM account_leases WHERE owner = ?', (owner,))
+        return cursor.rowcount
+
+    def runnable_jobs(self, batch_id: str, retry_failed: bool = False,
+                      max_attempts: int = JOB_MAX_ATTEMPTS) -> List[Tuple[int, dict]]:
+        """
+        (index, config) of jobs that still need to run
+
+        Pending jobs always run (call requeue_stale first to include jobs left
+        in running). Failed jobs may have been published before they failed,
+        so they only run again with retry_failed and while they have used
+        fewer than max_attempts attempts.
+        """
+        rows = self.conn.execute(
+            'SELECT idx, config FROM jobs WHERE batch_id = ? AND (state = ? OR (? AND state = ? AND attempts < ?)) '
+            'ORDER BY idx', (batch_id, PENDING, retry_failed, FAILED, max_attempts)).fetchall()
+        return [(row['idx'], json.loads(row['config'])) for row in rows]
+
+    def mark_running(self, batch_id: str, idx: int):
+        now = time.time()
+        self.conn.execute(
+            'UPDATE jobs SET state = ?, attempts = attempts + 1, error = NULL, started_at = ?, updated_at = ? '
+            'WHERE batch_id = ? AND idx = ?',
+            (RUNNING, now, now, batch_id, idx))
+
+    def mark_succeeded(self, batch_id: str, idx: int, video_id: str = None):
+        now = time.time()
+        self.conn.execute(
+            'UPDATE jobs SET state = ?, video_id = ?, finished_at = ?, updated_at = ? WHERE batch_id = ? AND idx = ?',
+            (SUCCEEDED, video_id, now, now, batch_id, idx))
+
+    def mark_failed(self, batch_id: str, idx: int, error: str):
+        now = time.time()
+        self.conn.execute(
+            'UPDATE jobs SET state = ?, error = ?, finished_at = ?, updated_at = ? WHERE batch_id = ? AND idx = ?',
+            (FAILED, error, now, now, batch_id, idx))
+
+    def jobs(self, batch_id: str) -> List[Dict]:
+        """All jobs of a batch as dictionaries, in index order"""
+        rows = self.conn.execute(
+            'SELECT idx, platform, account_file, state, attempts, error, video_id, created_at, updated_at, '
+            'started_at, finished_at, lease_owner, lease_expires FROM jobs WHERE batch_id = ? ORDER BY idx',
+            (batch_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self, batch_id: str) -> Dict[str, int]:
+        """Job counts per state"""
+        rows = self.conn.execute(
+            'SELECT state, COUNT(*) AS n FROM jobs WHERE batch_id = ? GROUP BY state', (batch_id,)).fetchall()
+        return {row['state']: row['n'] for row in rows}
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Shared locator helpers for the uploaders
+
+locate_first_visible() races all candidate selectors at once instead of
+giving each one its full timeout in turn, so a layout change costs at most
+one timeout rather than one per stale selector. Every lookup with a key is
+recorded in utils/selector_registry, winner and per-candidate match alike,
+and candidates that won before (in this or earlier runs) are preferred when
+several match at the same time.
+locate() takes its candidates straight from the registry.
+"""
+import asyncio
+from typing import List, Optional, Sequence
+
+from playwright.async_api import Error as PlaywrightError
+
+from utils import selector_registry
+
+
+def order_candidates(key: Optional[str], selectors: Sequence[str]) -> List[str]:
+    """Selectors sorted by past wins for the key; ties keep the caller's order"""
+    wins = selector_registry.get_wins(key) if key else {}
+    return sorted(selectors, key=lambda selector: -wins.get(selector, 0))
+
+
+async def locate_first_visible(root, selectors: Sequence[str], timeout: float = 5000, key: str = None):
+    """
+    Return the first candidate that becomes visible, trying all of them concurrently
+
+    Args:
+        root: Page, Frame or Locator to search in
+        selectors: Candidate selectors, most likely first
+        timeout: Milliseconds to wait for any candidate
+        key: Name under which the winning selector is recorded (e.g. 'douyin.title')
+
+    Returns:
+        Locator of the winning selector, or None when nothing became visible in time
+    """
+    candidates = order_candidates(key, selectors)
+    if not candidates:
+        return None
+    tasks = {asyncio.ensure_future(root.locator(selector).first.wait_for(state="visible", timeout=timeout)): selector
+             for selector in candidates}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # several candidates can match the same element; prefer the earliest in the candidate order
+            winners = [tasks[task] for task in done if not task.cancelled() and task.exception() is None]
+            if winners:
+                selector = min(winners, key=candidates.index)
+                if key:
+                    selector_registry.record_lookup(key, selector, await _match_results(root, tasks))
+                return root.locator(selector).first
+            for task in done:
+                if not isinstance(task.exception(), PlaywrightError):
+                    raise task.exception()
+        if key:
+            selector_registry.record_lookup(key, None, {selector: False for selector in candidates})
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # collect the cancelled waits so they do not log "exception was never retrieved"
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _match_results(root, tasks) -> dict:
+    """
+    Whether each raced candidate matched: finished waits count as they ended,
+    the ones still waiting when the winner was found are checked once
+    """
+    matched, unsettled = {}, []
+    for task, selector in tasks.items():
+        if task.done() and not task.cancelled():
+            matched[selector] = task.exception() is None
+        else:
+            task.cancel()
+            unsettled.append(selector)
+    checks = await asyncio.gather(*(root.locator(selector).first.is_visible() for selector in unsettled),
+                                  return_exceptions=True)
+    matched.update({selector: visible is True for selector, visible in zip(unsettled, checks)})
+    return matched
+
+
+async def locate(root, platform: str, name: str, timeout: float = 5000):
+    """locate_first_visible() over the registry's candidates for platform/name"""
+    return await locate_first_visible(root, selector_registry.get_selectors(platform, name), timeout=timeout,
+                                      key=f"{platform}.{name}")
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+Creator platform URLs with a base-URL override
+
+The uploaders build every page URL with platform_url(), so the whole flow can
+be pointed at another origin (the local stand-in from mock_platform_server.py,
+a staging proxy) through UPLOADER_BASE_URL or UPLOADER_BASE_URL_<PLATFORM>
+without editing conf.PLATFORM_BASE_URLS.
+"""
+import os
+
+from conf import PLATFORM_BASE_URLS
+
+
+def base_url(platform: str) -> str:
+    """Origin for a platform: per-platform env override, then UPLOADER_BASE_URL, then conf"""
+    override = (os.environ.get(f'UPLOADER_BASE_URL_{platform.upper()}')
+                or os.environ.get('UPLOADER_BASE_URL'))
+    return (override or PLATFORM_BASE_URLS[platform]).rstrip('/')
+
+
+def platform_url(platform: str, path: str = '/') -> str:
+    """Absolute URL of a page on a platform, e.g. platform_url('douyin', '/creator-micro/content/upload')"""
+    return base_url(platform) + path
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+In-page popup dismissal
+
+A small script, installed once per context with add_init_script, watches the
+DOM with a MutationObserver and closes known guide tours, overlays and modals
+the moment they appear, using per-platform rules. Python never polls for
+popups: dismiss_popups() runs one full sweep (including the sweep-only rules
+that are too broad to run on every mutation) and get_dismiss_counts() reads
+the counters, each a single round trip per frame.
+
+Rule fields:
+    name        counter name
+    selector    CSS of the popup container
+    text        strings the container text must all contain (case-insensitive)
+    click       CSS of the element to click inside the container
+    click_text  accepted texts of that element (case-insensitive, exact)
+    action      'click' (default when click is set), 'hide' or 'remove'
+    fallback    'hide' or 'remove' when the click target is missing
+    auto        False: only applied by dismiss_popups(), not on every mutation
+"""
+import json
+from typing import Dict, List
+
+POPUP_RULES: Dict[str, List[dict]] = {
+    'douyin': [
+        {'name': 'guide', 'selector': '.semi-modal, .semi-popover, [class*="guide"]', 'text': ['我知道'],
+         'click': 'button, span', 'click_text': ['我知道了', '我知道啦']},
+        {'name': 'modal_close', 'selector': '.semi-modal',
+         'click': '.semi-modal-close, button[aria-label="关闭"], button[aria-label="Close"]', 'auto': False},
+        {'name': 'cover_recommend', 'selector': 'div', 'text': ['封面推荐', '换一换'],
+         'click': 'button, span, div', 'click_text': ['×', '✕'], 'fallback': 'hide', 'auto': False},
+        {'name': 'portal', 'selector': '.dy-creator-content-portal', 'action': 'hide', 'auto': False},
+        {'name': 'close_button', 'selector': 'body',
+         'click': 'button[class*="close"], button[aria-label="关闭"], button[aria-label="Close"]', 'auto': False},
+        {'name': 'cancel_button', 'selector': 'body', 'click': 'button', 'click_text': ['关闭', '取消'],
+         'auto': False},
+    ],
+    'tiktok': [
+        {'name': 'joyride_overlay', 'selector': 'div.react-joyride__overlay', 'action': 'remove'},
+        {'name': 'test_overlay', 'selector': '[data-test-id="overlay"]', 'action': 'remove'},
+        {'name': 'joyride_tooltip', 'selector': '.react-joyride__tooltip', 'click': 'button',
+         'click_text': ['skip', 'got it', 'ok', 'close']},
+        {'name': 'auto_check', 'selector': 'div.common-modal, [role="dialog"]', 'text': ['automatic content checks'],
+         'click': 'button', 'click_text': ['cancel']},
+        {'name': 'auto_check_close', 'selector': 'div.common-modal', 'text': ['automatic content checks'],
+         'click': '.common-modal-close-icon'},
+        {'name': 'continue_post', 'selector': 'div.common-modal, [role="dialog"]', 'text': ['continue to post'],
+         'click': 'button', 'click_text': ['cancel'], 'auto': False},
+        {'name': 'cancelable_modal', 'selector': 'div.common-modal', 'click': 'button',
+         'click_text': ['cancel'], 'auto': False},
+        {'name': 'overlay', 'selector': 'div[class*="overlay"]', 'action': 'remove', 'auto': False},
+        {'name': 'close_button', 'selector': 'body', 'click': 'button',
+         'click_text': ['skip', 'got it', 'ok', 'close'], 'auto': False},
+    ],
+}
+
+# (rules) => installs window.__popupDismisser once per document
+DISMISSER_JS = """(rules) => {
+    if (window.__popupDismisser) return;
+    const state = {counts: {}, total: 0, sweeps: 0};
+    const clicked = new WeakSet();
+    const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const textOf = el => (el.textContent || '').toLowerCase();
+    const discard = (el, action) => action === 'remove' ? el.remove() : (el.style.display = 'none');
+
+    function apply(rule) {
+        let found = Array.from(document.querySelectorAll(rule.selector)).filter(el =>
+            visible(el) && (rule.text || []).every(t => textOf(el).includes(t)));
+        // innermost containers only, so a page wrapper that happens to contain the text is left alone
+        found = found.filter(el => !found.some(other => other !== el && el.contains(other)));
+        let handled = 0;
+        for (const el of found) {
+            if (rule.click) {
+                const target = Array.from(el.querySelectorAll(rule.click)).find(c =>
+                    visible(c) && !clicked.has(c) &&
+                    (!rule.click_text || rule.click_text.includes(textOf(c).trim())));
+                if (target) {
+                    clicked.add(target);
+                    target.click();
+                } else if (rule.fallback) {
+                    discard(el, rule.fallback);
+                } else {
+                    continue;
+                }
+            } else {
+                discard(el, rule.action);
+            }
+            handled++;
+        }
+        if (handled) {
+            state.counts[rule.name] = (state.counts[rule.name] || 0) + handled;
+            state.total += handled;
+        }
+    }
+
+    function run(all) {
+        for (const rule of rules) {
+            if (all || rule.auto !== false) {
+                try { apply(rule); } catch (e) {}
+            }
+        }
+    }
+
+    let scheduled = false;
+    const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(() => { scheduled = false; run(false); }, 50);
+    });
+    const start = () => {
+        observer.observe(document.documentElement, {childList: true, subtree: true});
+        run(false);
+    };
+    if (document.documentElement) start();
+    else document.addEventListener('DOMContentLoaded', start);
+
+    window.__popupDismisser = {
+        sweep: () => { state.sweeps++; run(true); return state; },
+        stats: () => state,
+    };
+}"""
+
+
+def get_rules(platform: str) -> List[dict]:
+    """Platform rules with the texts lower-cased for the in-page matcher"""
+    rules = []
+    for rule in POPUP_RULES.get(platform, []):
+        rule = dict(rule)
+        rule['text'] = [t.lower() for t in rule.get('text', [])]
+        if 'click_text' in rule:
+            rule['click_text'] = [t.lower() for t in rule['click_text']]
+        rules.append(rule)
+    return rules
+
+
+async def install_popup_dismisser(context, platform: str):
+    """Install the observer in every page and frame of the context"""
+    rules = get_rules(platform)
+    if rules:
+        await context.add_init_script(f"({DISMISSER_JS})({json.dumps(rules, ensure_ascii=False)})")
+    return context
+
+
+async def dismiss_popups(page, platform: str) -> Dict[str, int]:
+    """
+    Apply all rules (including sweep-only ones) once in every frame
+
+    Installs the observer on the fly when the page was opened without it.
+
+    Returns:
+        Dismissed popup counts per rule name, summed over frames
+    """
+    rules = get_rules(platform)
+    if not rules:
+        return {}
+    counts: Dict[str, int] = {}
+    for frame in page.frames:
+        try:
+            state = await frame.evaluate(
+                f"(rules) => {{ ({DISMISSER_JS})(rules); return window.__popupDismisser.sweep(); }}", rules)
+        except Exception:
+            continue  # frame detached or navigating
+        for name, count in state['counts'].items():
+            counts[name] = counts.get(name, 0) + count
+    return counts
+
+
+async def get_dismiss_counts(page) -> Dict[str, int]:
+    """Counters of the page's main frame without running a sweep"""
+    try:
+        state = await page.evaluate("() => window.__popupDismisser ? window.__popupDismisser.stats() : null")
+    except Exception:
+        return {}
+    return state['counts'] if state else {}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Process tree and memory inspection
+
+Playwright starts its driver (node) as a child of the Python process and the
+browsers as children of the driver, so the memory an uploader really costs is
+the RSS of its whole process tree. Read through `ps`, which behaves the same
+on Linux and macOS and needs no extra dependency.
+"""
+import os
+import signal
+import subprocess
+from typing import Dict, List, NamedTuple, Optional
+
+# Executable names of the Playwright driver; its children are the launched browsers
+DRIVER_COMMANDS = ('node', 'node.exe')
+
+
+class ProcessInfo(NamedTuple):
+    pid: int
+    ppid: int
+    rss_bytes: int
+    command: str
+
+
+def list_processes() -> Dict[int, ProcessInfo]:
+    """Snapshot of all processes: pid -> ProcessInfo"""
+    output = subprocess.run(['ps', '-A', '-o', 'pid=,ppid=,rss=,comm='],
+                            capture_output=True, text=True, check=True).stdout
+    processes = {}
+    for line in output.splitlines():
+        parts = line.split(None, 3)
+        if len(parts) < 4:
+            continue
+        pid, ppid, rss_kb, command = parts
+        processes[int(pid)] = ProcessInfo(int(pid), int(ppid), int(rss_kb) * 1024, command)
+    return processes
+
+
+def descendants(pid: int, processes: Optional[Dict[int, ProcessInfo]] = None) -> List[ProcessInfo]:
+    """All processes below pid (children, grandchildren, ...)"""
+    processes = processes if processes is not None else list_processes()
+    children: Dict[int, List[ProcessInfo]] = {}
+    for info in processes.values():
+        children.setdefault(info.ppid, []).append(info)
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child.pid)
+    return found
+
+
+def tree_rss(pid: int, processes: Optional[Dict[int, ProcessInfo]] = None, include_self: bool = True) -> int:
+    """Resident memory of pid and everything below it, in bytes"""
+    processes = processes if processes is not None else list_processes()
+    total = sum(info.rss_bytes for info in descendants(pid, processes))
+    if include_self and pid in processes:
+        total += processes[pid].rss_bytes
+    return total
+
+
+def browser_rss(pid: int = None, processes: Optional[Dict[int, ProcessInfo]] = None) -> Dict[int, int]:
+    """
+    Memory of each browser launched from this process
+
+    Returns:
+        Browser main process pid -> RSS of that browser's tree (renderers, GPU, ...) in bytes
+    """
+    pid = pid or os.getpid()
+    processes = processes if processes is not None else list_processes()
+    tree = descendants(pid, processes)
+    drivers = {info.pid for info in tree if os.path.basename(info.command) in DRIVER_COMMANDS}
+    return {info.pid: tree_rss(info.pid, processes)
+            for info in tree if info.ppid in drivers}
+
+
+def kill_tree(pid: int, sig: int = getattr(signal, 'SIGKILL', signal.SIGTERM)) -> int:
+    """
+    Signal pid and everything below it; returns how many processes were signalled
+
+    The tree is read before the first signal: once a parent is gone its
+    children are reparented and can no longer be found through it.
+    """
+    targets = [info.pid for info in descendants(pid)] + [pid]
+    killed = 0
+    for target in targets:
+        try:
+            os.kill(target, sig)
+            killed += 1
+        except (ProcessLookupError, PermissionError):
+            pass
+    return killed
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Token-bucket posting limits per account and per platform
+
+Policies come from conf.UPLOAD_RATE_LIMITS / conf.ACCOUNT_RATE_LIMITS. Bucket
+state lives in a small JSON file guarded by an exclusive file lock, so
+separate CLI invocations, the daemon and concurrent batch workers all draw
+from the same buckets.
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+
+from conf import BASE_DIR, UPLOAD_RATE_LIMITS, ACCOUNT_RATE_LIMITS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+STATE_FILE = Path(BASE_DIR / "cookies" / "rate_limits.json")
+LOCK_FILE = STATE_FILE.with_suffix('.lock')
+
+
+@contextmanager
+def _state_lock():
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(STATE_FILE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state: dict):
+    tmp_file = STATE_FILE.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(state, indent=2), encoding='utf-8')
+    os.replace(tmp_file, STATE_FILE)
+
+
+def get_policies(platform: str, account_file: str) -> List[Tuple[str, int, float]]:
+    """
+    Buckets an upload has to draw from
+
+    Returns:
+        List of (bucket key, capacity, period seconds)
+    """
+    account_path = os.path.abspath(account_file or '')
+    policy = UPLOAD_RATE_LIMITS.get(platform, {})
+    buckets = []
+    account_limit = next((limit for path, limit in ACCOUNT_RATE_LIMITS.items()
+                          if os.path.abspath(path) == account_path), policy.get('account'))
+    if account_limit:
+        buckets.append((f"account:{platform}:{account_path}",) + tuple(account_limit))
+    if policy.get('platform'):
+        buckets.append((f"platform:{platform}",) + tuple(policy['platform']))
+    return buckets
+
+
+def _refill(bucket: dict, capacity: int, period: float, now: float) -> float:
+    elapsed = max(0.0, now - bucket.get('updated_at', now))
+    return min(capacity, bucket.get('tokens', capacity) + elapsed * capacity / period)
+
+
+def try_acquire(platform: str, account_file: str) -> float:
+    """
+    Take one post token from every bucket of the upload, atomically
+
+    Returns:
+        0 when the tokens were taken, otherwise seconds until they will be available
+    """
+    policies = get_policies(platform, account_file)
+    if not policies:
+        return 0
+    with _state_lock():
+        state = _load_state()
+        now = time.time()
+        levels = {key: _refill(state.get(key, {}), capacity, period, now)
+                  for key, capacity, period in policies}
+        wait = max([(1 - levels[key]) * period / capacity
+                    for key, capacity, period in policies if levels[key] < 1], default=0)
+        if wait:
+            return wait
+        for key, _, _ in policies:
+            state[key] = {'tokens': levels[key] - 1, 'updated_at': now}
+        _save_state(state)
+        return 0
+
+
+async def acquire(platform: str, account_file: str):
+    """Wait until the account and platform budgets allow another post, then take it"""
+    while True:
+        wait = try_acquire(platform, account_file)
+        if not wait:
+            return
+        print(f"⏳ {platform} rate limit for {account_file}: next post in {wait / 60:.1f} min")
+        await asyncio.sleep(wait)
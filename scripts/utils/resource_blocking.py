@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Request interception for stages that do not need images, fonts or media
+
+Cookie checks only look at the URL and a few text nodes, and most of the
+upload form never needs the creator pages' thumbnails, web fonts, preview
+videos or analytics beacons. A context-level route aborts those requests
+according to per-platform rule sets and counts what was skipped.
+
+Only request counts are reported: an aborted request never reaches the
+server, so its size is unknown.
+"""
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from conf import RESOURCE_BLOCKING
+
+# Analytics / monitoring hosts shared by every platform
+COMMON_TELEMETRY_DOMAINS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'sentry.io',
+    'hm.baidu.com',
+]
+
+# platform -> {'deny_domains': [...], 'allow_patterns': [...]}
+# allow_patterns are URL substrings that are never blocked (e.g. captcha / login widgets)
+PLATFORM_RULES = {
+    'douyin': {
+        'deny_domains': ['mon.zijieapi.com', 'mcs.zijieapi.com', 'mon.snssdk.com', 'mcs.snssdk.com'],
+        'allow_patterns': ['verify.zijieapi.com', 'verifycenter', 'captcha'],
+    },
+    'tiktok': {
+        'deny_domains': ['mon.tiktokv.com', 'mcs.tiktokv.com', 'analytics.tiktok.com'],
+        'allow_patterns': ['captcha', 'verification'],
+    },
+    'kuaishou': {
+        'deny_domains': ['wlog.kuaishou.com', 'log-sdk.ksapisrv.com', 'report.kuaishou.com'],
+        'allow_patterns': ['captcha'],
+    },
+    'tencent': {
+        'deny_domains': ['badjs.weixinbridge.com', 'report.qqweb.qq.com', 'beacon.qq.com'],
+        'allow_patterns': ['login', 'qrcode'],
+    },
+    'xhs': {
+        'deny_domains': ['apm-fe.xiaohongshu.com'],
+        'allow_patterns': ['captcha'],
+    },
+}
+
+# mode -> resource types to abort; telemetry domains are aborted in every mode
+BLOCKED_TYPES = {
+    'auth': {'image', 'font', 'media'},
+    # 上传流程会读取封面/预览，只拦截字体
+    'upload': {'font'},
+}
+
+_totals_lock = threading.Lock()
+_totals: Dict[str, Dict] = {}
+
+
+def blocking_mode(stage: str) -> Optional[str]:
+    """
+    Blocking mode for a stage ('auth' or 'upload'), or None when disabled
+
+    UPLOADER_BLOCK_RESOURCES=1/0 overrides conf.RESOURCE_BLOCKING for uploads.
+    """
+    enabled = RESOURCE_BLOCKING.get(stage, False)
+    if stage == 'upload':
+        env_value = os.environ.get('UPLOADER_BLOCK_RESOURCES')
+        if env_value is not None:
+            enabled = env_value.strip().lower() in ('1', 'true', 'yes')
+    return stage if enabled else None
+
+
+def _matches_domain(host: str, domains) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class BlockingStats:
+    """Per-context counters of aborted requests"""
+
+    def __init__(self, platform: str, mode: str):
+        self.platform = platform
+        self.mode = mode
+        self.blocked = {}
+        self.allowed = 0
+
+    def record(self, resource_type: str):
+        self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    def summary(self) -> Dict:
+        return {
+            'platform': self.platform,
+            'mode': self.mode,
+            'blocked_requests': self.blocked_requests,
+            'allowed_requests': self.allowed,
+            'blocked_by_type': dict(self.blocked),
+        }
+
+
+class ResourceBlocker:
+    """
+    Route handler applying a platform's rule set
+
+    Args:
+        platform: Platform name (douyin, kuaishou, tiktok, tencent, xhs)
+        mode: 'auth' (images, fonts, media, telemetry) or 'upload' (fonts, telemetry)
+    """
+
+    def __init__(self, platform: str, mode: str = 'auth'):
+        rules = PLATFORM_RULES.get(platform, {})
+        self.blocked_types = BLOCKED_TYPES[mode]
+        self.deny_domains = COMMON_TELEMETRY_DOMAINS + rules.get('deny_domains', [])
+        self.allow_patterns = rules.get('allow_patterns', [])
+        self.stats = BlockingStats(platform, mode)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if url.startswith('data:') or any(pattern in url for pattern in self.allow_patterns):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return _matches_domain(urlparse(url).hostname or '', self.deny_domains)
+
+    async def handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats.record(request.resource_type)
+            await route.abort()
+        else:
+            self.stats.allowed += 1
+            await route.continue_()
+
+
+async def install_resource_blocking(context, platform: str, mode: str = 'auth') -> ResourceBlocker:
+    """Abort unneeded requests on every page of the context; the summary is reported when it closes"""
+    blocker = ResourceBlocker(platform, mode)
+    await context.route('**/*', blocker.handle)
+    context.on('close', lambda _: report_blocking(blocker))
+    return blocker
+
+
+def report_blocking(blocker: ResourceBlocker):
+    """Print the per-run summary and add it to the process totals"""
+    stats = blocker.stats
+    if not stats.blocked_requests:
+        return
+    print(f"[+] 资源拦截({stats.platform}/{stats.mode}): 拦截 {stats.blocked_requests} 个请求 {stats.blocked}")
+    with _totals_lock:
+        totals = _totals.setdefault(stats.platform, {'runs': 0, 'blocked_requests': 0, 'blocked_by_type': {}})
+        totals['runs'] += 1
+        totals['blocked_requests'] += stats.blocked_requests
+        for resource_type, count in stats.blocked.items():
+            totals['blocked_by_type'][resource_type] = totals['blocked_by_type'].get(resource_type, 0) + count
+
+
+def get_blocking_stats() -> Dict:
+    """Blocked request counts (total and per resource type) per platform since process start"""
+    with _totals_lock:
+        return {platform: dict(totals, blocked_by_type=dict(totals['blocked_by_type']))
+                for platform, totals in _totals.items()}
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded retries for upload stages
+
+Each stage (open the publish page, wait for the video upload, click publish)
+gets a time budget from conf.UPLOAD_STAGE_BUDGETS. poll_until() repeats a
+check with exponential backoff and jitter until it succeeds, a terminal error
+is raised, or the budget runs out, so a stuck page frees its browser slot
+instead of looping forever.
+
+Errors are classified:
+    transient     DOM not ready, element detached, navigation timeout: retried
+    auth_expired  redirected to login: terminal
+    rejected      the platform refused the video: terminal
+    crashed       page / browser closed: terminal
+    timeout       stage budget exhausted: terminal
+"""
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+from conf import UPLOAD_STAGE_BUDGETS
+
+TRANSIENT = 'transient'
+AUTH_EXPIRED = 'auth_expired'
+REJECTED = 'rejected'
+CRASHED = 'crashed'
+TIMEOUT = 'timeout'
+
+
+class UploadError(Exception):
+    """Upload failure with a category and the stage it happened in"""
+    category = TRANSIENT
+
+    def __init__(self, message: str, stage: str = None):
+        super().__init__(message)
+        self.stage = stage
+
+    def __str__(self):
+        message = super().__str__()
+        return f"[{self.category}] {self.stage}: {message}" if self.stage else f"[{self.category}] {message}"
+
+
+class TransientDomError(UploadError):
+    category = TRANSIENT
+
+
+class AuthExpiredError(UploadError):
+    category = AUTH_EXPIRED
+
+
+class PlatformRejectedError(UploadError):
+    category = REJECTED
+
+
+class PageCrashedError(UploadError):
+    category = CRASHED
+
+
+class StageTimeoutError(UploadError):
+    category = TIMEOUT
+
+
+# Playwright messages meaning the page is gone and retrying cannot help
+_CRASH_MARKERS = ('Target closed', 'Target page, context or browser has been closed',
+                  'Browser has been closed', 'Page crashed')
+
+
+def classify(error: BaseException) -> str:
+    """Category of an exception raised inside an upload stage"""
+    if isinstance(error, UploadError):
+        return error.category
+    if any(marker in str(error) for marker in _CRASH_MARKERS):
+        return CRASHED
+    return TRANSIENT
+
+
+def get_budget(stage: str, platform: str = None) -> float:
+    """Seconds allowed for a stage, with an optional per-platform override"""
+    if platform and f"{platform}.{stage}" in UPLOAD_STAGE_BUDGETS:
+        return UPLOAD_STAGE_BUDGETS[f"{platform}.{stage}"]
+    return UPLOAD_STAGE_BUDGETS.get(stage, 120)
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float, jitter: float) -> float:
+    """Exponential backoff for the given attempt (1-based) with +/- jitter fraction"""
+    delay = min(max_delay, base * (2 ** (attempt - 1)))
+    return max(0.0, delay * (1 + random.uniform(-jitter, jitter)))
+
+
+async def poll_until(check: Callable[[], Awaitable], stage: str, platform: str = None,
+                     budget: Optional[float] = None, interval: float = 0.5, max_interval: float = 5,
+                     jitter: float = 0.2, logger=None):
+    """
+    Run check() until it returns a truthy value
+
+    Args:
+        check: Async callable; a falsy result or a transient exception means "not yet"
+        stage: Stage name (budget lookup and error reporting)
+        platform: Platform name for per-platform budgets
+        budget: Seconds allowed (default: get_budget(stage, platform))
+        interval: First retry delay in seconds
+        max_interval: Upper bound of the backoff delay
+        jitter: Random +/- fraction applied to each delay
+        logger: Optional platform logger for retry messages
+
+    Returns:
+        The first truthy value returned by check()
+
+    Raises:
+        UploadError: Terminal error from check(), or StageTimeoutError when the budget runs out
+    """
+    budget = get_budget(stage, platform) if budget is None else budget
+    deadline = time.monotonic() + budget
+    attempt = 0
+    last_error = None
+    while True:
+        attempt += 1
+        try:
+            result = await check()
+            if result:
+                return result
+        except Exception as e:
+            category = classify(e)
+            if category != TRANSIENT:
+                if isinstance(e, UploadError):
+                    e.stage = e.stage or stage
+                    raise
+                raise PageCrashedError(str(e), stage) from e
+            last_error = e
+            if logger is not None:
+                logger.info(f"  [-] {stage}: {e}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            reason = f"no success within {budget:.0f}s after {attempt} attempts"
+            if last_error is not None:
+                reason += f" (last error: {last_error})"
+            raise StageTimeoutError(reason, stage) from last_error
+        delay = min(remaining, backoff_delay(attempt, interval, max_interval, jitter))
+        if logger is not None and attempt % 5 == 0:
+            logger.info(f"  [-] {stage}: 第 {attempt} 次尝试未完成，剩余 {remaining:.0f}s")
+        await asyncio.sleep(delay)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Per-platform selector registry with persisted hit statistics
+
+All fallback selector lists of the uploaders live in SELECTORS, keyed by
+platform and element name. utils.locators records every lookup here: the
+winner, and for each candidate it checked whether it matched. The counts are
+merged into conf.SELECTOR_STATS_PATH (file-locked, like the rate limiter's
+state) when the process exits, and lookups try the historically winning
+selectors first. selector_report.py lists the selectors that have stopped
+matching; a fallback that matches the same element as the winner is alive
+even though it never wins.
+"""
+import atexit
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from conf import SELECTOR_STATS_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+SELECTORS: Dict[str, Dict[str, List[str]]] = {
+    'douyin': {
+        'title': [
+            "input.semi-input[placeholder*='作品标题']",
+            "input.semi-input[placeholder*='填写作品标题']",
+            "input[placeholder*='作品标题']",
+            ".editor-comp-publish-container-d4oeQI input.semi-input",
+        ],
+        'description': [
+            ".editor-kit-editor-container .zone-container.editor[contenteditable='true']",
+            ".zone-container.editor[contenteditable='true']",
+            ".editor-kit-editor-container [contenteditable='true']",
+            ".editor-comp-publish-container-d4oeQI [contenteditable='true']",
+            "[contenteditable='true'][data-placeholder*='作品简介']",
+            "[contenteditable='true'][data-placeholder*='正文']",
+        ],
+        'publish_button': [
+            'role=button[name="发布"s]',
+            'button:has-text("发布")',
+            '//button[contains(text(),"发布")]',
+        ],
+        'preview_close': [
+            'div.dy-creator-content-modal .semi-modal-close',
+            'div.dy-creator-content-modal button[aria-label="close"]',
+        ],
+        'ai_cover': [
+            '[class*="recommendCover"] [class*="item"]',
+            '[class*="recommend-cover"] [class*="item"]',
+            ':text("智能推荐封面") >> xpath=ancestor::div[1]/following-sibling::div[1] >> img',
+        ],
+    },
+    'tiktok': {
+        'upload_surface': [
+            'iframe[data-tt="Upload_index_iframe"]',
+            'div.upload-container',
+            '[data-e2e="upload_drag_area"], [data-e2e="upload_card"]',
+            'div:has-text("Select video to upload")',
+            r'role=button[name=/select\s+video/i]',
+            r'role=button[name=/select\s+file/i]',
+            r'role=button[name=/upload\s+(video|files?)/i]',
+        ],
+    },
+    'xhs': {
+        'title': [
+            'input[placeholder*="标题"]',
+            'textarea[placeholder*="标题"]',
+        ],
+        'description': [
+            'textarea[placeholder*="正文"]',
+            'textarea[placeholder*="描述"]',
+            'textarea[placeholder*="内容"]',
+            'div[contenteditable="true"]',
+            'textarea',
+        ],
+    },
+}
+
+# Unsaved counts of this process: key ('platform.name') ->
+# {'lookups': n, 'misses': n, 'wins': {selector: n}, 'checks': {selector: n}, 'matches': {selector: n}}
+_pending: Dict[str, Dict] = {}
+# Persisted counts, loaded on first use
+_loaded: Optional[Dict[str, Dict]] = None
+_last_win: Dict[str, Dict[str, float]] = {}
+
+
+def get_selectors(platform: str, name: str) -> List[str]:
+    """Registered candidates for an element, in registry order"""
+    return list(SELECTORS.get(platform, {}).get(name, []))
+
+
+def _stats_lock_path() -> Path:
+    return Path(SELECTOR_STATS_PATH).with_suffix('.lock')
+
+
+@contextmanager
+def _stats_lock():
+    lock_path = _stats_lock_path()
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_stats() -> Dict[str, Dict]:
+    """
+    Persisted statistics: key -> {'lookups', 'misses', 'wins': {selector: n}, 'last_win': {selector: ts},
+    'checks': {selector: n}, 'matches': {selector: n}}
+    """
+    try:
+        return json.loads(Path(SELECTOR_STATS_PATH).read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _persisted() -> Dict[str, Dict]:
+    global _loaded
+    if _loaded is None:
+        _loaded = load_stats()
+    return _loaded
+
+
+def get_wins(key: str) -> Dict[str, int]:
+    """Wins per selector for a key, persisted plus this process's unsaved counts"""
+    wins = dict(_persisted().get(key, {}).get('wins', {}))
+    for selector, count in _pending.get(key, {}).get('wins', {}).items():
+        wins[selector] = wins.get(selector, 0) + count
+    return wins
+
+
+def record_lookup(key: str, winner: Optional[str], matched: Dict[str, bool] = None):
+    """
+    Count one lookup for the key
+
+    Args:
+        key: 'platform.name'
+        winner: Selector that was used (None: nothing matched)
+        matched: selector -> whether it matched, for every candidate that was checked
+    """
+    stats = _pending.setdefault(key, {'lookups': 0, 'misses': 0, 'wins': {}, 'checks': {}, 'matches': {}})
+    stats['lookups'] += 1
+    if winner is None:
+        stats['misses'] += 1
+    else:
+        stats['wins'][winner] = stats['wins'].get(winner, 0) + 1
+        _last_win.setdefault(key, {})[winner] = time.time()
+    for selector, hit in (matched or {}).items():
+        stats['checks'][selector] = stats['checks'].get(selector, 0) + 1
+        if hit:
+            stats['matches'][selector] = stats['matches'].get(selector, 0) + 1
+
+
+def save_stats():
+    """Merge this process's counts into the stats file"""
+    global _loaded
+    if not _pending:
+        return
+    with _stats_lock():
+        state = load_stats()
+        for key, stats in _pending.items():
+            entry = state.setdefault(key, {'lookups': 0, 'misses': 0, 'wins': {}, 'last_win': {}})
+            entry['lookups'] = entry.get('lookups', 0) + stats['lookups']
+            entry['misses'] = entry.get('misses', 0) + stats['misses']
+            for field in ('wins', 'checks', 'matches'):
+                counts = entry.setdefault(field, {})
+                for selector, count in stats[field].items():
+                    counts[selector] = counts.get(selector, 0) + count
+            entry.setdefault('last_win', {}).update(_last_win.get(key, {}))
+        tmp_file = Path(SELECTOR_STATS_PATH).with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_file, SELECTOR_STATS_PATH)
+    _pending.clear()
+    _last_win.clear()
+    _loaded = state
+
+
+def selector_report(min_lookups: int = 5) -> List[Dict]:
+    """
+    One row per registered selector with its hit statistics
+
+    A selector is 'dead' when it was checked in at least min_lookups lookups
+    and never matched, 'unused' when there is not enough data yet. Wins only
+    show which candidate was used: a fallback matching the same element as
+    an earlier candidate never wins but is not dead.
+    """
+    stats = load_stats()
+    rows = []
+    for platform, elements in SELECTORS.items():
+        for name, selectors in elements.items():
+            key = f"{platform}.{name}"
+            entry = stats.get(key, {})
+            lookups = entry.get('lookups', 0)
+            for selector in selectors:
+                wins = entry.get('wins', {}).get(selector, 0)
+                checks = entry.get('checks', {}).get(selector, 0)
+                matches = entry.get('matches', {}).get(selector, 0)
+                if matches or wins:
+                    status = 'ok'
+                elif checks >= min_lookups:
+                    status = 'dead'
+                else:
+                    status = 'unused'
+                rows.append({
+                    'key': key,
+                    'selector': selector,
+                    'wins': wins,
+                    'checks': checks,
+                    'matches': matches,
+                    'lookups': lookups,
+                    'misses': entry.get('misses', 0),
+                    'hit_rate': wins / lookups if lookups else 0.0,
+                    'last_win': entry.get('last_win', {}).get(selector),
+                    'status': status,
+                })
+    return rows
+
+
+def _save_at_exit():
+    try:
+        save_stats()
+    except OSError as e:
+        print(f"⚠️  Could not save selector stats: {e}")
+
+
+atexit.register(_save_at_exit)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Per-stage upload timing
+
+Each upload run gets a StageTimer. The uploader switches stages with
+timer.stage('file_transfer'); every finished stage is written as one JSON
+line (run id, platform, account, file size, stage, duration) to
+conf.STAGE_TIMINGS_PATH and logged through the platform logger, followed by a
+'total' line with the outcome. timing_report.py summarizes the file into
+p50/p95 per stage.
+
+    @timed_upload('douyin', douyin_logger)
+    async def upload_in_context(self, context, page=None):
+        self.stage_timer.stage('navigate')
+        ...
+"""
+import functools
+import json
+import math
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from conf import STAGE_TIMINGS_PATH
+
+TOTAL = 'total'
+
+
+def account_name(account_file: str) -> Optional[str]:
+    """cookies/<platform>_uploader/<account>/cookie.json -> <account>; flat layout -> file stem"""
+    if not account_file:
+        return None
+    path = Path(account_file)
+    return path.parent.name if path.stem == 'cookie' else path.stem
+
+
+class StageTimer:
+    """
+    Wall-clock durations of the stages of one upload
+
+    Args:
+        platform: Platform name
+        account_file: Cookie file of the account
+        file_path: Uploaded video (for the file size)
+        logger: Optional platform logger
+        run_id: Identifier shared by all records of the run (default: random)
+    """
+
+    def __init__(self, platform: str, account_file: str = None, file_path: str = None, logger=None,
+                 run_id: str = None):
+        self.platform = platform
+        self.account = account_name(account_file)
+        self.account_file = account_file
+        self.file_size = os.path.getsize(file_path) if file_path and os.path.exists(file_path) else None
+        self.logger = logger
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self._current: Optional[str] = None
+        self._current_start = self.started_at
+        self._finished = False
+
+    def stage(self, name: str):
+        """End the current stage (if any) and start the named one"""
+        self._end_current()
+        self._current = name
+        self._current_start = time.perf_counter()
+
+    def _end_current(self, ok: bool = True, error: str = None):
+        if self._current is None:
+            return
+        duration = time.perf_counter() - self._current_start
+        # a stage entered twice (e.g. retried) accumulates
+        self.durations[self._current] = self.durations.get(self._current, 0.0) + duration
+        self._emit(self._current, duration, ok, error)
+        self._current = None
+
+    def finish(self, ok: bool = True, error: str = None):
+        """End the last stage and write the run total; the failing stage is marked not ok"""
+        if self._finished:
+            return
+        self._finished = True
+        failed_stage = self._current
+        self._end_current(ok, error)
+        total = time.perf_counter() - self.started_at
+        self._emit(TOTAL, total, ok, error, failed_stage=None if ok else failed_stage)
+
+    def _emit(self, stage: str, duration: float, ok: bool, error: str = None, **extra):
+        record = {
+            'ts': round(time.time(), 3),
+            'run_id': self.run_id,
+            'platform': self.platform,
+            'account': self.account,
+            'account_file': self.account_file,
+            'file_size': self.file_size,
+            'stage': stage,
+            'duration_s': round(duration, 3),
+            'ok': ok,
+        }
+        if error:
+            record['error'] = error
+        record.update({key: value for key, value in extra.items() if value is not None})
+        if self.logger is not None:
+            status = '' if ok else ' (failed)'
+            self.logger.info(f"  [timing] {self.run_id} {stage}: {duration:.2f}s{status}")
+        try:
+            path = Path(STAGE_TIMINGS_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError:
+            pass  # timing must never break an upload
+
+
+def timed_upload(platform: str, logger=None):
+    """
+    Decorator for an uploader method: creates self.stage_timer for the call
+    and finishes it with the outcome (exceptions are recorded and re-raised)
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            self.stage_timer = StageTimer(platform, getattr(self, 'account_file', None),
+                                          getattr(self, 'file_path', None), logger)
+            try:
+                result = await method(self, *args, **kwargs)
+            except BaseException as e:
+                self.stage_timer.finish(ok=False, error=str(e) or type(e).__name__)
+                raise
+            self.stage_timer.finish(ok=result is not False)
+            return result
+        return wrapper
+    return decorator
+
+
+def load_timings(path: str = STAGE_TIMINGS_PATH, since: float = None) -> List[dict]:
+    """Records from the timings file, optionally only those newer than a timestamp"""
+    records = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or record.get('ts', 0) >= since:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1
+    return ordered[index]
+
+
+def summarize(records: List[dict]) -> List[dict]:
+    """
+    p50/p95 per platform and stage
+
+    Returns:
+        Rows with platform, stage, runs, failures, p50_s, p95_s, max_s, in first-seen stage order
+    """
+    groups: Dict[tuple, List[dict]] = {}
+    for record in records:
+        groups.setdefault((record.get('platform'), record.get('stage')), []).append(record)
+    rows = []
+    for (platform, stage), items in groups.items():
+        durations = [item['duration_s'] for item in items]
+        rows.append({
+            'platform': platform,
+            'stage': stage,
+            'runs': len(items),
+            'failures': sum(1 for item in items if not item.get('ok', True)),
+            'p50_s': round(percentile(durations, 0.5), 2),
+            'p95_s': round(percentile(durations, 0.95), 2),
+            'max_s': round(max(durations), 2),
+        })
+    # keep stages in pipeline order per platform, total last
+    rows.sort(key=lambda row: (row['platform'] or '', row['stage'] == TOTAL))
+    return rows
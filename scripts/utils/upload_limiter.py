@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrency limits for parallel uploads
+
+An upload slot is taken per account first, then a posting token from the
+account's rate budget (utils/rate_limiter), then per platform, then from the
+global limit. An item waiting for its account or its budget never holds a
+slot another account could use, so throttled accounts fall behind while the
+rest of the batch keeps going. The same login never runs twice at once.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from conf import PLATFORM_UPLOAD_CONCURRENCY
+from utils import rate_limiter
+
+
+class UploadLimiter:
+    """
+    Global, per-platform and per-account upload semaphores
+
+    Args:
+        concurrency: Maximum uploads in flight overall
+        per_account: Maximum uploads in flight per account (cookie file)
+        platform_limits: platform -> maximum in flight (default: conf.PLATFORM_UPLOAD_CONCURRENCY)
+        rate_limit: Draw a token from the on-disk posting budgets before each upload
+    """
+
+    def __init__(self, concurrency: int = 1, per_account: int = 1,
+                 platform_limits: Optional[Dict[str, int]] = None, rate_limit: bool = True):
+        self.rate_limit = rate_limit
+        self.concurrency = max(1, concurrency)
+        self.per_account = max(1, per_account)
+        self.platform_limits = PLATFORM_UPLOAD_CONCURRENCY if platform_limits is None else platform_limits
+        self._total = asyncio.Semaphore(self.concurrency)
+        self._platforms: Dict[str, asyncio.Semaphore] = {}
+        self._accounts: Dict[tuple, asyncio.Semaphore] = {}
+
+    def _platform_semaphore(self, platform: str) -> asyncio.Semaphore:
+        if platform not in self._platforms:
+            limit = self.platform_limits.get(platform) or self.concurrency
+            self._platforms[platform] = asyncio.Semaphore(min(limit, self.concurrency))
+        return self._platforms[platform]
+
+    def _account_semaphore(self, platform: str, account_file: str) -> asyncio.Semaphore:
+        key = (platform, os.path.abspath(account_file or ''))
+        if key not in self._accounts:
+            self._accounts[key] = asyncio.Semaphore(self.per_account)
+        return self._accounts[key]
+
+    @asynccontextmanager
+    async def slot(self, platform: str, account_file: str, take_token: bool = True):
+        """
+        Hold one upload slot for the account, its platform and the global limit
+
+        Args:
+            take_token: Draw the posting token here; False when the caller draws one per post itself
+        """
+        async with self._account_semaphore(platform, account_file):
+            if self.rate_limit and take_token:
+                await rate_limiter.acquire(platform, account_file)
+            async with self._platform_semaphore(platform):
+                async with self._total:
+                    yield
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Network-observed upload progress
+
+The platforms upload the video in chunks over XHR/fetch and then send a
+"commit"/"finish" request. UploadMonitor listens to the page's
+requestfinished / response events, adds up the bytes of every chunk the
+server acknowledged, and completes the moment the commit request succeeds.
+wait_until_uploaded() races that signal against the uploader's DOM check, so
+the upload step ends as soon as either one sees the transfer done and the DOM
+check still works when a platform changes its upload endpoints.
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from utils.retry import poll_until
+
+# URL fragments of the chunk upload requests and of the request that commits the upload
+UPLOAD_ENDPOINTS: Dict[str, Dict[str, List[str]]] = {
+    'douyin': {
+        'chunk': ['partNumber=', 'phase=transfer'],
+        'complete': ['CommitUploadInner', 'phase=finish'],
+    },
+    'tiktok': {
+        'chunk': ['partNumber=', 'phase=transfer'],
+        'complete': ['CommitUploadInner', 'phase=finish'],
+    },
+    'kuaishou': {
+        'chunk': ['/api/upload/fragment', '/api/upload/chunk'],
+        'complete': ['/api/upload/complete', '/video/pc/upload/finish'],
+    },
+    'tencent': {
+        'chunk': ['uploadpartdfs'],
+        'complete': ['completepartuploaddfs'],
+    },
+}
+
+# Log a progress line each time this fraction of the file has been acknowledged
+PROGRESS_STEP = 0.1
+
+
+class UploadMonitor:
+    """
+    Upload progress of one video, observed from the page's network traffic
+
+    Args:
+        page: Playwright page that uploads the file
+        platform: Platform name (key of UPLOAD_ENDPOINTS)
+        file_path: Uploaded file, used for the total size
+        logger: Optional platform logger for progress messages
+    """
+
+    def __init__(self, page, platform: str, file_path: str = None, logger=None):
+        self.page = page
+        self.platform = platform
+        self.logger = logger
+        self.endpoints = UPLOAD_ENDPOINTS.get(platform, {})
+        self.total_bytes = os.path.getsize(file_path) if file_path and os.path.exists(file_path) else 0
+        self.sent_bytes = 0
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.started_at = time.monotonic()
+        self.completed_at = None
+        self.completed = asyncio.Event()
+        self._logged_step = 0
+        self._attached = False
+
+    def _matches(self, kind: str, url: str) -> bool:
+        return any(fragment in url for fragment in self.endpoints.get(kind, []))
+
+    def start(self) -> 'UploadMonitor':
+        """Attach the network listeners; call before the file is handed to the page"""
+        if self.endpoints and not self._attached:
+            self.page.on('requestfinished', self._on_request_finished)
+            self.page.on('requestfailed', self._on_request_failed)
+            self._attached = True
+        return self
+
+    def stop(self):
+        if self._attached:
+            self.page.remove_listener('requestfinished', self._on_request_finished)
+            self.page.remove_listener('requestfailed', self._on_request_failed)
+            self._attached = False
+
+    def reset(self):
+        """Forget progress after the uploader re-selected the file"""
+        self.sent_bytes = 0
+        self.chunks = 0
+        self._logged_step = 0
+        self.started_at = time.monotonic()
+        self.completed_at = None
+        self.completed.clear()
+
+    @property
+    def progress(self) -> float:
+        """Acknowledged fraction of the file (0 when the size is unknown)"""
+        return min(1.0, self.sent_bytes / self.total_bytes) if self.total_bytes else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.completed_at or time.monotonic()) - self.started_at
+
+    def stats(self) -> dict:
+        return {
+            'platform': self.platform,
+            'sent_bytes': self.sent_bytes,
+            'total_bytes': self.total_bytes,
+            'chunks': self.chunks,
+            'failed_chunks': self.failed_chunks,
+            'completed': self.completed.is_set(),
+            'elapsed_s': round(self.elapsed, 2),
+        }
+
+    async def _on_request_finished(self, request):
+        url = request.url
+        if self._matches('complete', url):
+            response = await request.response()
+            if response is not None and response.ok:
+                self.completed_at = time.monotonic()
+                self.completed.set()
+                if self.logger is not None:
+                    self.logger.info(f"  [-] 上传完成(网络确认) {self.sent_bytes / 1048576:.1f}MB, "
+                                     f"{self.chunks} 个分片, 耗时 {self.elapsed:.1f}s")
+        elif self._matches('chunk', url):
+            response = await request.response()
+            if response is None or not response.ok:
+                self.failed_chunks += 1
+                return
+            try:
+                sizes = await request.sizes()
+                self.sent_bytes += sizes.get('requestBodySize', 0)
+            except Exception:
+                self.sent_bytes += len(request.post_data_buffer or b'')
+            self.chunks += 1
+            self._log_progress()
+
+    def _on_request_failed(self, request):
+        if self._matches('chunk', request.url):
+            self.failed_chunks += 1
+
+    def _log_progress(self):
+        if self.logger is None or not self.total_bytes:
+            return
+        step = int(self.progress / PROGRESS_STEP)
+        if step > self._logged_step:
+            self._logged_step = step
+            rate = self.sent_bytes / max(self.elapsed, 0.001) / 1048576
+            self.logger.info(f"  [-] 上传进度 {self.progress:.0%} "
+                             f"({self.sent_bytes / 1048576:.1f}/{self.total_bytes / 1048576:.1f}MB, {rate:.1f}MB/s)")
+
+    async def wait_until_uploaded(self, dom_check: Callable[[], Awaitable], stage: str = 'video_upload',
+                                  **poll_kwargs):
+        """
+        Wait until the network commit succeeds or dom_check() reports the upload done
+
+        Args:
+            dom_check: Uploader's DOM check (also handles upload errors), polled with poll_until
+            stage: Stage name for the budget
+            **poll_kwargs: Passed to poll_until (interval, max_interval, logger, ...)
+
+        Returns:
+            'network' or 'dom', whichever saw the upload finish first
+        """
+        network = asyncio.ensure_future(self.completed.wait())
+        dom = asyncio.ensure_future(poll_until(dom_check, stage, self.platform, **poll_kwargs))
+        try:
+            done, _ = await asyncio.wait({network, dom}, return_when=asyncio.FIRST_COMPLETED)
+            if dom in done:
+                dom.result()  # re-raise timeouts and terminal errors
+                return 'dom'
+            return 'network'
+        finally:
+            for task in (network, dom):
+                if not task.done():
+                    task.cancel()
+            self.stop()
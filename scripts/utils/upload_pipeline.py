@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-tab upload pipelining for one account
+
+A single upload spends most of its time either transferring the file or
+driving the form (metadata, cover, schedule, publish), one after the other.
+In a pipeline, up to `depth` uploads of the same account share one
+BrowserContext, each in its own tab: a tab opens the upload page and sets
+its file right away, so the transfer runs in the background, then waits for
+its publish turn before it touches the form. Turns are handed out in
+submission order, so the account's posts still publish in order and only
+one tab drives the UI at a time.
+
+An uploader takes part by calling `await self.publish_turn(page)` (when set)
+right before its form-filling stages, and leaves saving the context's
+storage state to the caller, which does it once for the whole group;
+uploads not run through a pipeline leave publish_turn as None.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from utils.retry import AuthExpiredError
+
+
+class PublishTurns:
+    """Lets pipelined uploads into their UI phase one at a time, in ticket order"""
+
+    def __init__(self):
+        self._next = 0
+        self._finished = set()
+        self._changed = asyncio.Condition()
+
+    async def wait(self, ticket: int):
+        """Return once every earlier ticket is done"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._next == ticket)
+
+    async def done(self, ticket: int):
+        """Mark a ticket finished (published or failed) and let the next one in"""
+        async with self._changed:
+            self._finished.add(ticket)
+            while self._next in self._finished:
+                self._finished.discard(self._next)
+                self._next += 1
+            self._changed.notify_all()
+
+
+async def run_pipeline(context, videos: list, open_page: Callable[..., Awaitable], depth: int = 2,
+                       on_start: Callable[[int], Awaitable] = None,
+                       before_publish: Callable[[int], Awaitable] = None,
+                       on_finish: Callable[[int, Optional[str], object], Awaitable] = None
+                       ) -> List[Tuple[Optional[str], float]]:
+    """
+    Upload videos of one account through tabs of one context
+
+    Args:
+        context: Prepared BrowserContext logged in as the account
+        videos: Uploader objects with upload_in_context(context, page=...) and a publish_turn attribute
+        open_page: Coroutine function (context) -> loaded upload page, or None when the cookie is invalid
+        depth: Maximum tabs in flight
+        on_start: Awaited with the video's position before its tab opens (e.g. job state)
+        before_publish: Awaited with the position once the tab has its turn, before the form is touched
+                        (e.g. the posting token, so a tab that fails to open spends none)
+        on_finish: Awaited with position, error (None on success) and video after its tab closed
+
+    Returns:
+        (error message or None on success, seconds) per video, in input order
+    """
+    turns = PublishTurns()
+    tabs = asyncio.Semaphore(max(1, depth))
+
+    async def run(ticket: int, video) -> Tuple[Optional[str], float]:
+        async with tabs:
+            if on_start is not None:
+                await on_start(ticket)
+            start = time.perf_counter()
+            error, page = None, None
+            try:
+                page = await open_page(context)
+                if page is None:
+                    raise AuthExpiredError("Cookie invalid or expired")
+
+                async def publish_turn(current_page):
+                    await turns.wait(ticket)
+                    if before_publish is not None:
+                        await before_publish(ticket)
+                    # 前台标签页才能稳定接收键盘输入和点击
+                    await current_page.bring_to_front()
+
+                video.publish_turn = publish_turn
+                await video.upload_in_context(context, page=page)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            finally:
+                await turns.done(ticket)
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+            elapsed = time.perf_counter() - start
+        if on_finish is not None:
+            await on_finish(ticket, error, video)
+        return error, elapsed
+
+    # tasks queue on the semaphore in creation order, so tabs open in ticket order
+    return await asyncio.gather(*(run(ticket, video) for ticket, video in enumerate(videos)))
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Process-isolated uploads
+
+In-process batches share one event loop, one Playwright driver and one
+browser pool, so a wedged page or a crashed driver stalls every upload in
+flight. The supervisor runs uploads in a pool of worker processes instead,
+each with its own Playwright and browser pool that stay warm between jobs.
+A job that exceeds its wall-clock limit, or whose worker's process tree
+(the worker, its Playwright driver and browsers) grows past the RSS limit,
+gets its whole tree killed; the worker is replaced and the other slots keep
+running. Results come back to the parent as dictionaries.
+"""
+import asyncio
+import multiprocessing
+import time
+from typing import Dict, Optional
+
+from conf import SUPERVISOR_JOB_TIMEOUT, SUPERVISOR_MAX_RSS_MB, SUPERVISOR_SAMPLE_INTERVAL
+from utils.process_tree import kill_tree, list_processes, tree_rss
+
+MB = 1048576
+
+
+def _worker_main(conn, browser_max_uses: int):
+    asyncio.run(_serve(conn, browser_max_uses))
+
+
+async def _serve(conn, browser_max_uses: int):
+    """Worker process: run the jobs sent by the supervisor on a local browser pool until told to stop"""
+    # imported here: the parent imports this module from upload_from_config
+    from upload_from_config import upload_from_config
+    from utils.browser_pool import BrowserPool
+
+    loop = asyncio.get_running_loop()
+    async with BrowserPool(max_uses=browser_max_uses) as browser_pool:
+        while True:
+            try:
+                message = await loop.run_in_executor(None, conn.recv)
+            except EOFError:
+                # supervisor gone
+                return
+            if message is None:
+                return
+            config, revalidate = message
+            details = {}
+            try:
+                success = await upload_from_config(config, browser_pool=browser_pool, revalidate=revalidate,
+                                                   details=details)
+            except Exception as e:
+                success = False
+                details['error'] = str(e)
+            if not success:
+                details.setdefault('error', 'Upload failed')
+            conn.send(details)
+
+
+class WorkerProcess:
+    """One upload worker process and the pipe to it"""
+
+    def __init__(self, context, browser_max_uses: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, browser_max_uses), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.busy_since: Optional[float] = None
+        self.kill_reason: Optional[str] = None
+        self.peak_rss = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def kill(self, reason: str):
+        if self.kill_reason is None:
+            self.kill_reason = reason
+        kill_tree(self.pid)
+
+    def stop(self, timeout: float = 10):
+        """Ask the worker to close its browsers and exit; kill its tree if it does not"""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            kill_tree(self.pid)
+            self.process.join(5)
+        self.conn.close()
+
+
+class UploadSupervisor:
+    """
+    Run uploads in a pool of worker processes with per-job limits
+
+    Args:
+        workers: Number of worker processes (upload slots)
+        job_timeout: Wall-clock limit per job in seconds (0 = none)
+        max_rss_mb: RSS limit of a worker's process tree while it runs a job (0 = none)
+        browser_max_uses: Recycle a worker's pooled browser after this many uploads (0 = never)
+        sample_interval: Seconds between RSS samples
+    """
+
+    def __init__(self, workers: int = 1, job_timeout: float = SUPERVISOR_JOB_TIMEOUT,
+                 max_rss_mb: float = SUPERVISOR_MAX_RSS_MB, browser_max_uses: int = 20,
+                 sample_interval: float = SUPERVISOR_SAMPLE_INTERVAL):
+        self.workers = max(1, workers)
+        self.job_timeout = job_timeout
+        self.max_rss_mb = max_rss_mb
+        self.browser_max_uses = browser_max_uses
+        self.sample_interval = sample_interval
+        # spawn: a forked child would inherit the parent's event loop and Playwright state
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: Optional[asyncio.Queue] = None
+        self._all: Dict[int, WorkerProcess] = {}
+        self._monitor = None
+        self.replaced = 0
+        self.killed = {'timeout': 0, 'rss': 0, 'crash': 0}
+
+    def _spawn(self) -> WorkerProcess:
+        worker = WorkerProcess(self._context, self.browser_max_uses)
+        self._all[worker.pid] = worker
+        return worker
+
+    async def start(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.workers):
+                self._idle.put_nowait(self._spawn())
+            if self.max_rss_mb:
+                self._monitor = asyncio.ensure_future(self._watch_memory())
+        return self
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+        workers, self._all = list(self._all.values()), {}
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, worker.stop) for worker in workers))
+        self._idle = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _watch_memory(self):
+        limit = self.max_rss_mb * MB
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            busy = [worker for worker in self._all.values() if worker.busy_since is not None]
+            if not busy:
+                continue
+            processes = await asyncio.get_running_loop().run_in_executor(None, list_processes)
+            for worker in busy:
+                rss = tree_rss(worker.pid, processes)
+                worker.peak_rss = max(worker.peak_rss, rss)
+                if rss > limit and worker.kill_reason is None:
+                    print(f"⚠️  Worker {worker.pid} uses {rss / MB:.0f}MB "
+                          f"(limit {self.max_rss_mb:.0f}MB), killing it")
+                    self.killed['rss'] += 1
+                    worker.kill(f"Killed: worker memory {rss / MB:.0f}MB exceeded the {self.max_rss_mb:.0f}MB limit")
+
+    async def _execute(self, worker: WorkerProcess, config: dict, revalidate: bool) -> Optional[dict]:
+        """The worker's reply, or None when it was killed or died before replying"""
+        try:
+            worker.conn.send((config, revalidate))
+        except (BrokenPipeError, OSError):
+            return None
+        reply = asyncio.get_running_loop().run_in_executor(None, worker.conn.recv)
+        try:
+            return await asyncio.wait_for(asyncio.shield(reply), timeout=self.job_timeout or None)
+        except asyncio.TimeoutError:
+            self.killed['timeout'] += 1
+            worker.kill(f"Killed: job exceeded the {self.job_timeout:.0f}s wall-clock limit")
+        except (EOFError, OSError):
+            # killed by the memory monitor, or crashed
+            pass
+        await asyncio.gather(reply, return_exceptions=True)
+        return None
+
+    async def _replace(self, worker: WorkerProcess):
+        """Make sure a worker that did not reply is dead, browsers included, and start a new one in its place"""
+        # joins block; keep them off the event loop so other jobs' replies and the memory monitor keep running
+        loop = asyncio.get_running_loop()
+        if worker.kill_reason is None:
+            await loop.run_in_executor(None, worker.process.join, 1)
+            if worker.process.is_alive():
+                # the job was cancelled while the worker was still busy with it
+                worker.kill_reason = 'Cancelled'
+            else:
+                self.killed['crash'] += 1
+                worker.kill_reason = f"Worker crashed (exit code {worker.process.exitcode})"
+        worker.kill(worker.kill_reason)
+        self._all.pop(worker.pid, None)
+        if self._idle is not None:
+            replacement = self._spawn()
+            self.replaced += 1
+            print(f"♻️  Replaced upload worker {worker.pid} with {replacement.pid}: {worker.kill_reason}")
+            self._idle.put_nowait(replacement)
+        await loop.run_in_executor(None, worker.stop, 0)
+
+    async def run(self, config: dict, revalidate: bool = False) -> dict:
+        """
+        Run one upload in a worker process
+
+        Returns:
+            The upload details (error: None on success, video_id, upload stats) plus
+            worker_pid, elapsed_s, peak_rss_mb and killed (the worker was killed or died)
+        """
+        worker = await self._idle.get()
+        worker.busy_since, worker.kill_reason, worker.peak_rss = time.monotonic(), None, 0
+        reply = None
+        try:
+            reply = await self._execute(worker, config, revalidate)
+        finally:
+            elapsed = time.monotonic() - worker.busy_since
+            worker.busy_since = None
+            worker.jobs += 1
+            if reply is None:
+                # shielded: a cancelled job must still hand its slot to a replacement worker
+                await asyncio.shield(self._replace(worker))
+            elif self._idle is not None:
+                self._idle.put_nowait(worker)
+        result = dict(reply) if reply is not None else {'error': worker.kill_reason}
+        result.setdefault('error', None)
+        result.update({
+            'worker_pid': worker.pid,
+            'elapsed_s': round(elapsed, 1),
+            'peak_rss_mb': round(worker.peak_rss / MB, 1),
+            'killed': reply is None,
+        })
+        return result
+
+    def stats(self) -> Dict:
+        """Worker pids, jobs served, replacements and kills by cause"""
+        return {
+            'workers': [{'pid': worker.pid, 'jobs': worker.jobs, 'busy': worker.busy_since is not None}
+                        for worker in self._all.values()],
+            'replaced': self.replaced,
+            'killed': dict(self.killed),
+        }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validate every stored account cookie concurrently
+Discovers cookies/<platform>_uploader/<account>/cookie.json and writes a
+machine-readable health report (account, platform, status, latency)
+"""
+import asyncio
+import argparse
+import json
+import time
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import BASE_DIR
+from douyin_uploader.main import open_upload_page as douyin_open_upload_page
+from ks_uploader.main import open_upload_page as ks_open_upload_page
+from tk_uploader.main import open_upload_page as tiktok_open_upload_page
+from tencent_uploader.main import open_upload_page as tencent_open_upload_page
+from utils.browser_factory import platform_context
+from utils.browser_pool import BrowserPool
+from utils.cookie_cache import record_verdict
+from utils.resource_blocking import get_blocking_stats
+
+# platform -> (cookie directory, upload page check)
+PLATFORMS = {
+    'douyin': ('douyin_uploader', douyin_open_upload_page),
+    'kuaishou': ('ks_uploader', ks_open_upload_page),
+    'tencent': ('tencent_uploader', tencent_open_upload_page),
+    'tiktok': ('tk_uploader', tiktok_open_upload_page),
+}
+
+
+def discover_accounts(cookies_dir: Path, platforms: list = None) -> list:
+    """
+    Find cookie files in the multi-account layout
+
+    Both cookies/<platform>_uploader/<account>/cookie.json and the single
+    account form cookies/<platform>_uploader/<name>.json are recognised.
+
+    Args:
+        cookies_dir: Root cookie directory
+        platforms: Optional platform names to restrict discovery to
+
+    Returns:
+        List of account dictionaries (platform, account, cookie_file)
+    """
+    accounts = []
+    for platform, (dir_name, _) in PLATFORMS.items():
+        if platforms and platform not in platforms:
+            continue
+        platform_dir = cookies_dir / dir_name
+        if not platform_dir.is_dir():
+            continue
+        for cookie_file in sorted(platform_dir.glob('*/cookie.json')):
+            accounts.append({
+                'platform': platform,
+                'account': cookie_file.parent.name,
+                'cookie_file': str(cookie_file),
+            })
+        for cookie_file in sorted(platform_dir.glob('*.json')):
+            accounts.append({
+                'platform': platform,
+                'account': 'default' if cookie_file.stem == 'cookie' else cookie_file.stem,
+                'cookie_file': str(cookie_file),
+            })
+    return accounts
+
+
+async def check_account(account: dict, browser_pool: BrowserPool, semaphore: asyncio.Semaphore,
+                        timeout: float) -> dict:
+    """Validate one account inside a fresh context on the platform's shared browser"""
+    _, open_page = PLATFORMS[account['platform']]
+    result = dict(account)
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with platform_context(account['platform'], headless=True, stage='auth',
+                                        browser_pool=browser_pool,
+                                        storage_state=account['cookie_file']) as context:
+                page = await asyncio.wait_for(open_page(context), timeout=timeout)
+            valid = page is not None
+            result['status'] = 'valid' if valid else 'expired'
+            record_verdict(account['platform'], account['cookie_file'], valid)
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+        result['latency_ms'] = int((time.perf_counter() - start) * 1000)
+    return result
+
+
+async def validate_accounts(accounts: list, max_contexts: int = 4, timeout: float = 60) -> list:
+    """
+    Validate accounts concurrently, one shared browser per platform
+
+    Args:
+        accounts: Accounts from discover_accounts()
+        max_contexts: Maximum concurrent browser contexts per platform
+        timeout: Per-account timeout in seconds
+
+    Returns:
+        List of result dictionaries in the same order as accounts
+    """
+    semaphores = {platform: asyncio.Semaphore(max_contexts) for platform in PLATFORMS}
+    async with BrowserPool(max_uses=0) as browser_pool:
+        return await asyncio.gather(*[
+            check_account(account, browser_pool, semaphores[account['platform']], timeout)
+            for account in accounts
+        ])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Validate all stored account cookies')
+    parser.add_argument('--cookies-dir', default=str(BASE_DIR / 'cookies'),
+                        help='Root cookie directory (default: scripts/cookies)')
+    parser.add_argument('--platform', action='append',
+                        choices=list(PLATFORMS),
+                        help='Only check this platform (repeatable)')
+    parser.add_argument('--max-contexts', type=int, default=4,
+                        help='Concurrent browser contexts per platform')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='Per-account timeout in seconds')
+    parser.add_argument('--output', help='Write JSON report to file instead of stdout')
+
+    args = parser.parse_args()
+
+    accounts = discover_accounts(Path(args.cookies_dir), args.platform)
+    if not accounts:
+        print(f"❌ No cookie files found under {args.cookies_dir}", file=sys.stderr)
+        return
+
+    start = time.perf_counter()
+    results = await validate_accounts(accounts, max_contexts=args.max_contexts, timeout=args.timeout)
+    report = {
+        'checked_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'duration_ms': int((time.perf_counter() - start) * 1000),
+        'total': len(results),
+        'valid': sum(1 for r in results if r['status'] == 'valid'),
+        'expired': sum(1 for r in results if r['status'] == 'expired'),
+        'error': sum(1 for r in results if r['status'] == 'error'),
+        'resource_blocking': get_blocking_stats(),
+        'accounts': results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"✅ Report saved to: {args.output} "
+              f"({report['valid']} valid, {report['expired']} expired, {report['error']} error)")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watch mode: upload videos as they arrive in drop folders
+Each finished .mp4 in a watched folder is paired with its .txt sidecar
+(title on the first line, #tags on the second), fanned out to the target
+platforms and uploaded right away on a shared browser pool, while the folder
+keeps being watched.
+
+Jobs go into one long-lived batch of the job store and every enqueued video
+is recorded there, so after a restart already-handled files are neither
+re-posted nor re-examined, and jobs interrupted by the restart run again.
+Failed jobs stay failed unless --retry-failed is given.
+"""
+import asyncio
+import argparse
+from pathlib import Path
+import sys
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from conf import JOB_DB_PATH, JOB_MAX_ATTEMPTS, WATCH_POLL_INTERVAL, WATCH_SETTLE_SECONDS
+from generate_upload_config import generate_fanout_configs, parse_accounts
+from upload_from_config import upload_item
+from utils.base_social_media import get_supported_social_media
+from utils.browser_pool import BrowserPool
+from utils.inbox_watcher import InboxWatcher
+from utils.job_store import JobStore
+from utils.upload_limiter import UploadLimiter
+
+
+class InboxUploader:
+    """
+    Turn ready videos into jobs and run them while the watcher keeps going
+
+    Args:
+        job_store: JobStore holding the watch batch and the seen-index
+        batch_id: Watch batch the jobs are appended to
+        platforms: Target platforms of every video
+        accounts: platform -> cookie file
+        browser_pool: Shared, started BrowserPool
+        limiter: UploadLimiter shared by all jobs
+        revalidate: Ignore the cookie validation cache
+        publish_date: Schedule time for every video, or None for immediate
+    """
+
+    def __init__(self, job_store: JobStore, batch_id: str, platforms: list, accounts: dict,
+                 browser_pool: BrowserPool, limiter: UploadLimiter, revalidate: bool = False,
+                 publish_date: str = None):
+        self.job_store = job_store
+        self.batch_id = batch_id
+        self.platforms = platforms
+        self.accounts = accounts
+        self.browser_pool = browser_pool
+        self.limiter = limiter
+        self.revalidate = revalidate
+        self.publish_date = publish_date
+        self.tasks = set()
+        self.succeeded = 0
+        self.failed = 0
+        self.last_index = 0
+
+    def submit(self, index: int, config: dict):
+        self.last_index = max(self.last_index, index)
+        task = asyncio.create_task(self._run(index, config))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, index: int, config: dict):
+        error, elapsed = await upload_item(index, self.last_index, config, self.browser_pool, self.limiter,
+                                           revalidate=self.revalidate, job_store=self.job_store,
+                                           batch_id=self.batch_id)
+        video = config.get('video', {}).get('path')
+        if error is None:
+            self.succeeded += 1
+            print(f"✅ [{index}] {config.get('platform')} {video} ({elapsed:.1f}s)")
+        else:
+            self.failed += 1
+            print(f"❌ [{index}] {config.get('platform')} {video}: {error}")
+
+    def enqueue(self, video) -> int:
+        """Create the video's jobs (one per platform), mark it seen and start them; returns the job count"""
+        configs = generate_fanout_configs(self.platforms, video.path, title=video.title, tags=video.tags,
+                                          accounts=self.accounts, publish_date=self.publish_date)
+        indexes = self.job_store.add_file_jobs(self.batch_id, video.path, video.size, video.mtime, configs)
+        for index, config in zip(indexes, configs):
+            self.submit(index, config)
+        return len(indexes)
+
+    async def drain(self):
+        """Wait for every submitted upload to finish"""
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+
+
+def open_watch_batch(job_store: JobStore, source: str) -> str:
+    """The batch this set of folders appends to, created on the first run"""
+    batch_id = job_store.latest_batch(source)
+    if batch_id is None:
+        batch_id = job_store.create_batch([], source=source)
+        print(f"🗂️  Watch batch {batch_id}")
+    return batch_id
+
+
+async def watch(args):
+    directories = [str(Path(directory).resolve()) for directory in args.dir]
+    source = 'watch:' + ','.join(sorted(directories))
+
+    with JobStore(args.job_db) as job_store:
+        batch_id = open_watch_batch(job_store, source)
+        requeued = job_store.requeue_stale(batch_id)
+        leftover = job_store.runnable_jobs(batch_id, retry_failed=args.retry_failed)
+        seen = job_store.seen_paths()
+        print(f"📂 Watching {', '.join(directories)} -> {', '.join(args.platforms)} "
+              f"({len(seen)} file(s) already handled)")
+
+        async with BrowserPool(max_uses=args.browser_max_uses) as browser_pool:
+            uploader = InboxUploader(job_store, batch_id, args.platforms, args.accounts, browser_pool,
+                                     UploadLimiter(concurrency=args.concurrency), revalidate=args.revalidate,
+                                     publish_date=args.publish_date)
+            if leftover:
+                print(f"🔁 Resuming {len(leftover)} unfinished job(s) ({requeued} requeued from running)")
+            for index, config in leftover:
+                uploader.submit(index, config)
+
+            watcher = InboxWatcher(directories, seen=seen, settle_seconds=args.settle_seconds,
+                                   poll_interval=args.poll_interval, use_inotify=not args.polling,
+                                   require_sidecar=not args.allow_missing_sidecar, once=args.once)
+            try:
+                async for video in watcher:
+                    try:
+                        jobs = uploader.enqueue(video)
+                    except (FileNotFoundError, ValueError) as e:
+                        print(f"❌ Cannot enqueue {video.path}: {e}")
+                        continue
+                    print(f"📥 {video.path}: {jobs} job(s) queued ({watcher.mode})")
+                await uploader.drain()
+            finally:
+                for task in uploader.tasks:
+                    task.cancel()
+
+    print(f"\n👋 Watch stopped: ✅ {uploader.succeeded} succeeded, ❌ {uploader.failed} failed "
+          f"(batch {batch_id})")
+
+
+def main():
+    supported = get_supported_social_media()
+    parser = argparse.ArgumentParser(description='Watch drop folders and upload new videos as they arrive')
+    parser.add_argument('--dir', action='append', required=True, help='Folder to watch (repeatable)')
+    parser.add_argument('--platforms', required=True,
+                        help=f"Comma-separated target platforms ({', '.join(supported)})")
+    parser.add_argument('--account', required=True,
+                        help='Cookie file per platform: "douyin=cookies/douyin.json,tiktok=cookies/tk.json"')
+    parser.add_argument('--publish-date', help='Schedule every video (YYYY-MM-DD HH:MM), default: immediate')
+    parser.add_argument('--settle-seconds', type=float, default=WATCH_SETTLE_SECONDS,
+                        help=f'Seconds a video and its sidecar must stay unchanged (default: {WATCH_SETTLE_SECONDS})')
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_INTERVAL,
+                        help=f'Rescan period without inotify (default: {WATCH_POLL_INTERVAL})')
+    parser.add_argument('--polling', action='store_true', help='Poll mtimes instead of using inotify')
+    parser.add_argument('--allow-missing-sidecar', action='store_true',
+                        help='Upload videos without a .txt sidecar, with a title made from the file name')
+    parser.add_argument('--once', action='store_true',
+                        help='Handle the videos already in the folders, then exit when they are uploaded')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Maximum uploads in flight (one per account, capped per platform)')
+    parser.add_argument('--browser-max-uses', type=int, default=20,
+                        help='Relaunch a shared browser after N uploads (0 = never)')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Ignore the cookie validation cache and re-check accounts in a browser')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help=f'On start, also retry failed jobs, up to {JOB_MAX_ATTEMPTS} attempts each')
+    parser.add_argument('--job-db', default=JOB_DB_PATH, help='SQLite job store (default: scripts/jobs.db)')
+    args = parser.parse_args()
+
+    args.platforms = [platform.strip() for platform in args.platforms.split(',') if platform.strip()]
+    unknown = [platform for platform in args.platforms if platform not in supported]
+    if unknown:
+        parser.error(f"Unsupported platform(s): {', '.join(unknown)}")
+    try:
+        args.accounts = parse_accounts(args.account, args.platforms)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(watch(args))
+    except KeyboardInterrupt:
+        print("\n👋 Watch interrupted; unfinished jobs resume on the next start")
+
+
+if __name__ == '__main__':
+    main()
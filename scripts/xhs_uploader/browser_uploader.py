@@ -8,7 +8,13 @@ import json
 import os
 from pathlib import Path
 from playwright.async_api import async_playwright
-from conf import LOCAL_CHROME_PATH, BASE_DIR
+from conf import BASE_DIR
+from utils.browser_factory import launch_persistent_context
+from utils import selector_registry
+from utils.locators import locate, order_candidates
+from utils.log import xhs_logger
+from utils.platform_urls import platform_url
+from utils.stage_timer import timed_upload
 
 
 class XiaohongshuVideo:
@@ -18,44 +24,29 @@ class XiaohongshuVideo:
         self.tags = tags
         self.publish_date = publish_date
         self.account_file = account_file
-        self.local_executable_path = LOCAL_CHROME_PATH
         
     async def setup_browser(self, playwright):
         """Setup browser with stealth - use persistent context to save login state"""
-        stealth_js_path = BASE_DIR / "utils/stealth.min.js"
-        
         # Use persistent user data dir to save login state
         user_data_dir = BASE_DIR / "cookies/xhs_uploader/browser_data"
         
-        if self.local_executable_path:
-            # Launch with persistent context - this keeps cookies and login state
-            context = await playwright.chromium.launch_persistent_context(
-                user_data_dir,
-                headless=False,
-                executable_path=self.local_executable_path,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-        else:
-            context = await playwright.chromium.launch_persistent_context(
-                user_data_dir,
-                headless=False,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-        
-        # Add stealth script
-        await context.add_init_script(path=stealth_js_path)
+        # Launch with persistent context - this keeps cookies and login state
+        context = await launch_persistent_context(playwright, 'xhs', user_data_dir)
         
         # Get the default page
         page = context.pages[0] if context.pages else await context.new_page()
         
         return context, page
     
+    @timed_upload('xhs', xhs_logger)
     async def upload(self, playwright):
         """Upload video using browser"""
+        self.stage_timer.stage('browser')
         context, page = await self.setup_browser(playwright)
         
         # Go to creator upload page
-        await page.goto('https://creator.xiaohongshu.com/publish/publish?source=official')
+        self.stage_timer.stage('navigate')
+        await page.goto(platform_url('xhs', '/publish/publish?source=official'))
         await page.wait_for_timeout(5000)
         
         # Check if login required
@@ -68,6 +59,7 @@ class XiaohongshuVideo:
         await page.wait_for_timeout(3000)
         
         # Find file input - it might be hidden so we can't use wait_for_selector
+        self.stage_timer.stage('file_select')
         print("查找文件上传输入框...")
         file_input = await page.query_selector('input[type="file"]')
         
@@ -96,38 +88,18 @@ class XiaohongshuVideo:
                 await browser.close()
                 return False
         
-        # Wait for video to upload - look for title input which appears after upload
+        # Wait for video to upload - the title input appears after upload
+        self.stage_timer.stage('file_transfer')
         print("等待视频上传完成...")
-        await page.wait_for_timeout(15000)
-        
+        title_input = await locate(page, 'xhs', 'title', timeout=30000)
+
         # Now fill in title and description - they should appear after upload
+        self.stage_timer.stage('metadata')
         print("填写标题...")
-        
-        # Try multiple selectors for title
-        title_filled = False
-        title_selectors = [
-            'input[placeholder*="标题"]',
-            'input[placeholder*="标题"]',
-            'input[class*="title"]',
-            'input[class*="Title"]',
-            'input'
-        ]
-        
-        for selector in title_selectors:
-            try:
-                inputs = await page.query_selector_all(selector)
-                for inp in inputs:
-                    placeholder = await inp.get_attribute('placeholder') or ''
-                    if '标题' in placeholder:
-                        await inp.fill(self.title)
-                        print(f"标题已填写: {self.title}")
-                        title_filled = True
-                        break
-                if title_filled:
-                    break
-            except:
-                pass
-        
+        if title_input is not None:
+            await title_input.fill(self.title)
+            print(f"标题已填写: {self.title}")
+
         # Fill description - look for textareas or editable divs
         print("填写正文和话题...")
         desc = self.title
@@ -136,15 +108,12 @@ class XiaohongshuVideo:
                 desc += f" #{tag}"
         
         desc_filled = False
-        desc_selectors = [
-            'textarea[placeholder*="正文"]',
-            'textarea[placeholder*="描述"]',
-            'textarea[placeholder*="内容"]',
-            'div[contenteditable="true"]',
-            'textarea'
-        ]
-        
+        desc_key = 'xhs.description'
+        desc_selectors = order_candidates(desc_key, selector_registry.get_selectors('xhs', 'description'))
+        # candidates tried before the one that worked did not match; later ones are not checked
+        desc_matched = {}
         for selector in desc_selectors:
+            desc_matched[selector] = False
             try:
                 elements = await page.query_selector_all(selector)
                 for el in elements:
@@ -159,9 +128,13 @@ class XiaohongshuVideo:
                         desc_filled = True
                         break
                 if desc_filled:
+                    desc_matched[selector] = True
+                    selector_registry.record_lookup(desc_key, selector, desc_matched)
                     break
             except:
                 pass
+        if not desc_filled:
+            selector_registry.record_lookup(desc_key, None, desc_matched)
         
         # Wait a bit for fields to settle
         await page.wait_for_timeout(2000)
@@ -175,6 +148,7 @@ class XiaohongshuVideo:
         print("Cookie saved!")
         
         # Click publish button
+        self.stage_timer.stage('publish')
         print("点击发布按钮...")
         publish_buttons = await page.query_selector_all('button')
         for btn in publish_buttons:
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent Xiaohongshu (小红书) signing service
+
+Keeps one headless browser with a pool of warm xiaohongshu.com pages and
+calls window._webmsxyw on them. A page is only reloaded when the a1 /
+web_session cookies of a request differ from the ones it already carries.
+
+Usable in-process (SignService.sign / sign_local) or as the local HTTP
+`/sign` endpoint that xhs_uploader.main.sign() talks to (XHS_SERVER).
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.async_api import async_playwright
+
+from conf import XHS_SERVER
+from utils.browser_factory import get_launch_options, launch_browser, new_platform_context
+
+XHS_HOME_URL = "https://www.xiaohongshu.com"
+
+
+class SignPage:
+    """A warm page plus the (a1, web_session) cookies currently applied to it"""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.cookies = None
+
+
+class SignService:
+    """
+    Warm page pool serving signature requests concurrently
+
+    Args:
+        pool_size: Number of pages (one browser context each)
+        max_attempts: Attempts per signature before giving up
+    """
+
+    def __init__(self, pool_size: int = 2, max_attempts: int = 3):
+        self.pool_size = pool_size
+        self.max_attempts = max_attempts
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._idle = []
+        self._cond = None
+
+    def start(self):
+        """Start the background event loop and warm up the page pool"""
+        if self._loop is not None:
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="xhs-sign", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    async def _start(self):
+        self._cond = asyncio.Condition()
+        self._playwright = await async_playwright().start()
+        engine, launch_options = get_launch_options('xhs', headless=True)
+        self._browser = await launch_browser(self._playwright, engine, launch_options)
+        self._idle = list(await asyncio.gather(*[self._new_page() for _ in range(self.pool_size)]))
+
+    async def _new_page(self) -> SignPage:
+        context = await new_platform_context(self._browser, 'xhs', stage='auth')
+        page = await context.new_page()
+        await page.goto(XHS_HOME_URL)
+        await self._wait_sign_ready(page)
+        return SignPage(context, page)
+
+    async def _wait_sign_ready(self, page):
+        await page.wait_for_function("() => typeof window._webmsxyw === 'function'", timeout=15000)
+
+    async def _acquire(self, cookies) -> SignPage:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._idle)
+            # 优先复用已经带着相同 cookie 的页面，避免刷新
+            for index, sign_page in enumerate(self._idle):
+                if sign_page.cookies == cookies:
+                    return self._idle.pop(index)
+            return self._idle.pop(0)
+
+    async def _release(self, sign_page: SignPage):
+        async with self._cond:
+            self._idle.append(sign_page)
+            self._cond.notify()
+
+    async def _apply_cookies(self, sign_page: SignPage, a1: str, web_session: str):
+        if sign_page.cookies == (a1, web_session):
+            return
+        cookies = []
+        if a1:
+            cookies.append({'name': 'a1', 'value': a1, 'domain': ".xiaohongshu.com", 'path': "/"})
+        if web_session:
+            cookies.append({'name': 'web_session', 'value': web_session, 'domain': ".xiaohongshu.com", 'path': "/"})
+        await sign_page.context.clear_cookies()
+        if cookies:
+            await sign_page.context.add_cookies(cookies)
+        await sign_page.page.reload()
+        await self._wait_sign_ready(sign_page.page)
+        sign_page.cookies = (a1, web_session)
+
+    async def _replace_page(self, sign_page: SignPage) -> SignPage:
+        try:
+            await sign_page.context.close()
+        except Exception:
+            pass
+        return await self._new_page()
+
+    async def sign_async(self, uri, data=None, a1="", web_session=""):
+        """Sign one request on a pooled page (runs on the service loop)"""
+        last_error = None
+        for _ in range(self.max_attempts):
+            sign_page = await self._acquire((a1, web_session))
+            try:
+                await self._apply_cookies(sign_page, a1, web_session)
+                encrypt_params = await sign_page.page.evaluate(
+                    "([url, data]) => window._webmsxyw(url, data)", [uri, data])
+                return {
+                    "x-s": encrypt_params["X-s"],
+                    "x-t": str(encrypt_params["X-t"])
+                }
+            except Exception as e:
+                print(f"Sign attempt failed: {e}")
+                last_error = e
+                try:
+                    sign_page = await self._replace_page(sign_page)
+                except Exception as replace_error:
+                    print(f"Sign page refresh failed: {replace_error}")
+            finally:
+                await self._release(sign_page)
+        raise Exception("重试了这么多次还是无法签名成功，寄寄寄") from last_error
+
+    def sign(self, uri, data=None, a1="", web_session=""):
+        """Thread-safe blocking signature call"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self.sign_async(uri, data, a1, web_session), self._loop)
+        return future.result()
+
+    async def _close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=10)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_sign_service() -> SignService:
+    """Process-wide signing service, started on first use"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = SignService().start()
+            atexit.register(_default_service.close)
+        return _default_service
+
+
+class SignRequestHandler(BaseHTTPRequestHandler):
+    """POST /sign {"uri", "data", "a1", "web_session"} -> {"x-s", "x-t"}"""
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/sign':
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            result = self.server.sign_service.sign(
+                payload.get("uri"), payload.get("data"),
+                payload.get("a1", ""), payload.get("web_session", ""))
+            self._send_json(200, result)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status, body):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def serve(host: str, port: int, pool_size: int = 2):
+    """Run the HTTP signing endpoint until interrupted"""
+    service = SignService(pool_size=pool_size).start()
+    server = ThreadingHTTPServer((host, port), SignRequestHandler)
+    server.sign_service = service
+    print(f"✅ XHS sign server listening on http://{host}:{port}/sign ({pool_size} pages)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main():
+    default_port = int(XHS_SERVER.rsplit(':', 1)[-1].strip('/')) if XHS_SERVER.count(':') > 1 else 5005
+    parser = argparse.ArgumentParser(description='Xiaohongshu signing server')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=default_port, help='Listen port (default: from XHS_SERVER)')
+    parser.add_argument('--pages', type=int, default=2, help='Number of warm signing pages')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.pages)
+
+
+if __name__ == '__main__':
+    main()